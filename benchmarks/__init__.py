@@ -0,0 +1 @@
+"""Reproducible benchmarks for git_ops and the GUI refresh paths."""
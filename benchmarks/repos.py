@@ -0,0 +1,107 @@
+"""Synthetic repository generators for the benchmark suite.
+
+Repos are built with `git fast-import`, so thousands of commits and refs take
+well under a second each. Every generator takes a `scale` factor; 1.0 is the
+size the stored baseline was recorded at.
+"""
+
+import os
+import subprocess
+
+AUTHOR = "Bench <bench@example.com> 1700000000 +0000"
+
+
+def _git(repo, *args, stdin=None):
+    subprocess.run(
+        ["git", *args],
+        cwd=repo,
+        input=stdin,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+def _init(path):
+    os.makedirs(path)
+    _git(path, "init", "-q", "-b", "main")
+    _git(path, "config", "user.name", "Bench")
+    _git(path, "config", "user.email", "bench@example.com")
+    return path
+
+
+def _blob(data: bytes) -> bytes:
+    return b"data %d\n%s\n" % (len(data), data)
+
+
+def many_commits(path, scale=1.0):
+    """Linear history; each commit touches one of 50 files."""
+    repo = _init(path)
+    count = max(10, int(5000 * scale))
+    stream = []
+    for index in range(count):
+        message = f"Commit {index}: update module {index % 50}".encode()
+        stream.append(b"commit refs/heads/main\n")
+        stream.append(f"author {AUTHOR}\ncommitter {AUTHOR}\n".encode())
+        stream.append(_blob(message))
+        content = f"module {index % 50} revision {index}\n".encode()
+        stream.append(b"M 100644 inline src/module_%d.py\n" % (index % 50))
+        stream.append(_blob(content))
+    _git(repo, "fast-import", "--quiet", stdin=b"".join(stream))
+    _git(repo, "reset", "-q", "--hard", "main")
+    return repo
+
+
+def many_refs(path, scale=1.0):
+    """A short history with thousands of local branches and remote-tracking refs."""
+    repo = many_commits(path, scale=0.02)
+    count = max(10, int(2000 * scale))
+    lines = []
+    for index in range(count):
+        lines.append(f"create refs/heads/feature/topic-{index} HEAD\n")
+        lines.append(f"create refs/remotes/origin/feature/topic-{index} HEAD\n")
+    _git(repo, "update-ref", "--stdin", stdin="".join(lines).encode())
+    return repo
+
+
+def huge_worktree(path, scale=1.0):
+    """Many tracked files with a slice of them modified and some untracked."""
+    repo = _init(path)
+    count = max(20, int(20000 * scale))
+    stream = [b"commit refs/heads/main\n", f"author {AUTHOR}\ncommitter {AUTHOR}\n".encode()]
+    stream.append(_blob(b"Initial tree"))
+    for index in range(count):
+        stream.append(b"M 100644 inline dir_%d/file_%d.txt\n" % (index % 200, index))
+        stream.append(_blob(b"line %d\n" % index))
+    _git(repo, "fast-import", "--quiet", stdin=b"".join(stream))
+    _git(repo, "reset", "-q", "--hard", "main")
+    for index in range(0, count, 100):
+        with open(os.path.join(repo, f"dir_{index % 200}", f"file_{index}.txt"), "a") as handle:
+            handle.write("changed\n")
+    for index in range(max(1, count // 1000)):
+        with open(os.path.join(repo, f"untracked_{index}.txt"), "w") as handle:
+            handle.write("new\n")
+    return repo
+
+
+def large_diff(path, scale=1.0):
+    """One large file rewritten in the worktree and staged."""
+    repo = _init(path)
+    lines = max(100, int(50000 * scale))
+    target = os.path.join(repo, "data.txt")
+    with open(target, "w") as handle:
+        handle.writelines(f"original line {index}\n" for index in range(lines))
+    _git(repo, "add", "data.txt")
+    _git(repo, "commit", "-q", "-m", "Add data")
+    with open(target, "w") as handle:
+        handle.writelines(f"rewritten line {index} {index * 7}\n" for index in range(lines))
+    _git(repo, "add", "data.txt")
+    return repo
+
+
+GENERATORS = {
+    "many_commits": many_commits,
+    "many_refs": many_refs,
+    "huge_worktree": huge_worktree,
+    "large_diff": large_diff,
+}
@@ -0,0 +1,195 @@
+"""Run the benchmark suite and compare against a stored baseline.
+
+    python -m benchmarks.run                   # run, write results JSON
+    python -m benchmarks.run --save-baseline   # run and store as the new baseline
+    python -m benchmarks.run --check           # exit 1 if a path regressed
+
+Timings are medians over `--repeat` runs after one warm-up. A case regresses
+when its median exceeds baseline * (1 + threshold) + slack_ms; the slack
+keeps millisecond-scale cases from flapping. Baselines are machine-specific,
+so record one per machine before using --check.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.repos import GENERATORS
+from git_ops import (
+    branch_tracking,
+    commit_context,
+    diff_summary,
+    history_text,
+    list_remote_branches,
+    run_git,
+)
+from prompt_builder import build_commit_prompt
+from storage import StateStore, load_list, load_profiles, save_list, save_profiles
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+RESULTS_PATH = os.path.join(HERE, "results.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_SLACK_MS = 5.0
+
+
+def refresh_history(repo):
+    history_text(repo)
+
+
+def refresh_branches(repo):
+    branch_tracking(repo, use_cache=False)
+    list_remote_branches(repo)
+
+
+def refresh_diff(repo):
+    diff_summary(repo)
+
+
+def collect_commit_context(repo):
+    build_commit_prompt(*commit_context(repo))
+
+
+GIT_CASES = {
+    "refresh_history": refresh_history,
+    "refresh_branches": refresh_branches,
+    "refresh_diff": refresh_diff,
+    "collect_commit_context": collect_commit_context,
+}
+
+
+def _storage_cases(workdir, scale):
+    count = max(10, int(1000 * scale))
+    favorites = [f"/home/user/src/repo-{index}" for index in range(count)]
+    profiles = {
+        f"profile-{index}": {"path": favorites[index], "remote": "origin", "branch": "main"}
+        for index in range(count)
+    }
+    json_dir = os.path.join(workdir, "storage")
+    os.makedirs(json_dir, exist_ok=True)
+
+    def json_roundtrip():
+        save_list(os.path.join(json_dir, "favorites.json"), favorites)
+        save_profiles(os.path.join(json_dir, "profiles.json"), profiles)
+        load_list(os.path.join(json_dir, "favorites.json"))
+        load_profiles(os.path.join(json_dir, "profiles.json"))
+
+    store = StateStore(os.path.join(json_dir, "state.sqlite3"))
+
+    def sqlite_roundtrip():
+        for name, profile in profiles.items():
+            store.save_profile(name, profile)
+        store.profiles()
+        store.profiles_for_path(favorites[-1])
+
+    cases = {"storage_json_roundtrip": json_roundtrip, "storage_sqlite_roundtrip": sqlite_roundtrip}
+    return cases, store.close
+
+
+def _time(func, repeat):
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "runs": repeat}
+
+
+def run_suite(scale=1.0, repeat=5, only=None, log=print):
+    """Generate repos under a temp dir, time every case, return the results dict."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="cindergrace-bench-") as workdir:
+        for repo_name, generate in GENERATORS.items():
+            started = time.perf_counter()
+            repo = generate(os.path.join(workdir, repo_name), scale)
+            log(f"generated {repo_name} in {time.perf_counter() - started:.1f} s")
+            for case_name, func in GIT_CASES.items():
+                key = f"{case_name}[{repo_name}]"
+                if only and only not in key:
+                    continue
+                results[key] = _time(lambda func=func, repo=repo: func(repo), repeat)
+                log(f"  {key:<48} {results[key]['median_ms']:9.2f} ms")
+        storage_cases, close_storage = _storage_cases(workdir, scale)
+        try:
+            for key, func in storage_cases.items():
+                if only and only not in key:
+                    continue
+                results[key] = _time(func, repeat)
+                log(f"  {key:<48} {results[key]['median_ms']:9.2f} ms")
+        finally:
+            close_storage()
+    _, git_version, _ = run_git(["--version"], os.getcwd())
+    return {
+        "meta": {
+            "scale": scale,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git": git_version,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, slack_ms=DEFAULT_SLACK_MS):
+    """Return a list of (case, baseline_ms, current_ms) for regressed cases."""
+    regressions = []
+    for key, base in baseline.get("results", {}).items():
+        now = current.get("results", {}).get(key)
+        if now is None:
+            continue
+        limit = base["median_ms"] * (1 + threshold) + slack_ms
+        if now["median_ms"] > limit:
+            regressions.append((key, base["median_ms"], now["median_ms"]))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--scale", type=float, default=1.0, help="repo size factor")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--slack-ms", type=float, default=DEFAULT_SLACK_MS)
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.scale, args.repeat, args.only)
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(current, handle, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(current, handle, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not args.check:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 2
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    if baseline.get("meta", {}).get("scale") != args.scale:
+        print("Baseline was recorded at a different --scale; results are not comparable.")
+        return 2
+    regressions = compare(current, baseline, args.threshold, args.slack_ms)
+    for key, before, after in regressions:
+        print(f"REGRESSION {key}: {before:.2f} ms -> {after:.2f} ms")
+    if regressions:
+        return 1
+    print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Incremental `git blame` with results cached per (path, blob, revision).
+
+`git blame --incremental` reports hunks as soon as each one is attributed,
+walking history from the newest commit backwards, so the most recently
+changed lines arrive first and a caller can annotate them while older
+lines are still being resolved. Finished results are stored in the state
+cache keyed by the resolved commit and blob id, so reopening the same file
+at the same revision skips git entirely.
+"""
+
+from dataclasses import asdict, dataclass, field
+
+from git_ops import run_git, stream_git
+
+CACHE_NAMESPACE = "blame"
+COMMIT_FIELDS = ("author", "author-time", "summary")
+
+
+@dataclass
+class BlameHunk:
+    commit: str
+    orig_line: int
+    final_line: int
+    count: int
+
+
+@dataclass
+class BlameResult:
+    commits: dict = field(default_factory=dict)
+    hunks: list = field(default_factory=list)
+
+    def to_json(self) -> dict:
+        return {"commits": self.commits, "hunks": [asdict(hunk) for hunk in self.hunks]}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "BlameResult":
+        return cls(dict(data["commits"]), [BlameHunk(**hunk) for hunk in data["hunks"]])
+
+
+class IncrementalParser:
+    """Turn `--incremental --porcelain` lines into hunks and commit metadata.
+
+    A hunk header is followed by commit headers (only the first time a
+    commit appears) and always ends with a "filename" line.
+    """
+
+    def __init__(self, result: BlameResult):
+        self.result = result
+        self._current = None
+
+    def feed(self, line: str) -> BlameHunk | None:
+        """Consume one line; return the hunk it completes, if any."""
+        if self._current is None:
+            parts = line.split()
+            if len(parts) != 4:
+                return None
+            commit, orig, final, count = parts
+            self._current = BlameHunk(commit, int(orig), int(final), int(count))
+            self.result.commits.setdefault(commit, {})
+            return None
+        key, _, value = line.partition(" ")
+        if key == "filename":
+            hunk, self._current = self._current, None
+            self.result.hunks.append(hunk)
+            return hunk
+        if key in COMMIT_FIELDS:
+            self.result.commits[self._current.commit][key] = value
+        return None
+
+
+def blame_target(repo, path, rev="HEAD"):
+    """Resolve (commit id, blob id, top-level dir) for `path` at `rev`, or None.
+
+    Paths are relative to the top level, as with `:(top)` in file_history.
+    """
+    args = ["rev-parse", "--show-toplevel", f"{rev}^{{commit}}", f"{rev}:{path}"]
+    code, out, _ = run_git(args, repo)
+    if code != 0:
+        return None
+    lines = out.splitlines()
+    return (lines[1], lines[2], lines[0]) if len(lines) == 3 else None
+
+
+def blame(repo, path, rev="HEAD", on_hunk=None, cancel=None, cache=None):
+    """Blame `path` at `rev`, calling `on_hunk(hunk, result)` as hunks arrive.
+
+    `cache` is a StateStore (or None). Returns (code, BlameResult, stderr);
+    on a cache hit every hunk is replayed through `on_hunk` without git.
+    """
+    target = blame_target(repo, path, rev)
+    if target is None:
+        return 128, BlameResult(), f"{path} does not exist at {rev}"
+    commit, blob, top = target
+    key = f"{commit}:{blob}:{path}"
+    if cache is not None:
+        cached = cache.cache_get(CACHE_NAMESPACE, repo, key)
+        if cached:
+            result = BlameResult.from_json(cached)
+            if on_hunk is not None:
+                for hunk in result.hunks:
+                    on_hunk(hunk, result)
+            return 0, result, ""
+
+    result = BlameResult()
+    parser = IncrementalParser(result)
+
+    def on_line(line):
+        hunk = parser.feed(line)
+        if hunk is not None and on_hunk is not None:
+            on_hunk(hunk, result)
+
+    # blame takes a plain file name, not a pathspec, so run it from the top level.
+    code, _, err = stream_git(
+        ["blame", "--incremental", "--porcelain", commit, "--", path], top, on_line, cancel
+    )
+    if code == 0 and cache is not None:
+        cache.cache_put(CACHE_NAMESPACE, repo, key, result.to_json())
+    return code, result, err
+
+
+def file_lines(repo, path, rev="HEAD"):
+    """Return (code, lines of `path` at `rev`, stderr)."""
+    lines = []
+    # Streamed rather than run_git, which strips leading blank lines.
+    code, _, err = stream_git(["show", f"{rev}:{path}"], repo, lines.append)
+    return code, lines if code == 0 else [], err
+
+
+__all__ = [
+    "BlameHunk",
+    "BlameResult",
+    "IncrementalParser",
+    "blame",
+    "blame_target",
+    "file_lines",
+]
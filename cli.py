@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Headless command-line entry point (no Tkinter) for scripts and CI.
+
+Every result is printed as one JSON object per line. Exit codes: 0 when all
+repositories succeeded, 1 when at least one failed, 2 for usage errors.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from commit_draft import draft_commit_message, parse_raw_numstat
+from git_ops import change_stats, commit_context, is_git_repo, repo_status, run_git
+from prompt_builder import build_commit_prompt
+from storage import OPENROUTER_KEY_SETTING, STATE_DB_PATH, open_state_store
+
+DEFAULT_MODEL = "openai/gpt-4o-mini"
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def emit(record: dict) -> None:
+    sys.stdout.write(json.dumps(record, sort_keys=True) + "\n")
+    sys.stdout.flush()
+
+
+def resolve_repos(args) -> list[str]:
+    """Collect repo paths from arguments, favorites and profiles, keeping order."""
+    repos = list(args.repos)
+    if args.favorites or args.profile or args.all_profiles:
+        state = open_state_store(args.state)
+        try:
+            if args.favorites:
+                repos.extend(state.favorites())
+            profiles = state.profiles()
+            names = sorted(profiles) if args.all_profiles else args.profile
+            for name in names:
+                if name not in profiles:
+                    raise SystemExit(f"Unknown profile: {name}")
+                repos.append(profiles[name].get("path", ""))
+        finally:
+            state.close()
+    seen = set()
+    unique = []
+    for repo in repos:
+        path = os.path.abspath(repo)
+        if repo and path not in seen:
+            seen.add(path)
+            unique.append(path)
+    return unique
+
+
+def status_one(repo: str) -> dict:
+    if not is_git_repo(repo):
+        return {"command": "status", "repo": repo, "ok": False, "error": "not a git repository"}
+    code, info, err = repo_status(repo)
+    record = {"command": "status", "repo": repo, "ok": code == 0, **info}
+    if code != 0:
+        record["error"] = err
+    return record
+
+
+def fetch_one(repo: str, remote: str | None) -> dict:
+    if not is_git_repo(repo):
+        return {"command": "fetch", "repo": repo, "ok": False, "error": "not a git repository"}
+    args = ["fetch", "--prune", remote] if remote else ["fetch", "--all", "--prune"]
+    code, out, err = run_git(args, repo)
+    record = {"command": "fetch", "repo": repo, "ok": code == 0, "exit_code": code}
+    if code != 0:
+        record["error"] = err
+    return record
+
+
+def _api_key(args) -> str | None:
+    env_key = os.environ.get("OPENROUTER_API_KEY")
+    if env_key:
+        return env_key
+    password = os.environ.get(args.password_env) if args.password_env else None
+    if not password:
+        return None
+    # Crypto is only imported when a stored key has to be unlocked.
+    from openrouter import decrypt_api_key
+
+    state = open_state_store(args.state)
+    try:
+        payload = state.get_setting(OPENROUTER_KEY_SETTING)
+    finally:
+        state.close()
+    if not isinstance(payload, dict):
+        return None
+    return decrypt_api_key(payload, password)
+
+
+def suggest_one(repo: str, args, api_key: str | None) -> dict:
+    if not is_git_repo(repo):
+        return {"command": "suggest", "repo": repo, "ok": False, "error": "not a git repository"}
+    if args.draft:
+        code, out, err = change_stats(repo)
+        if code != 0:
+            return {"command": "suggest", "repo": repo, "ok": False, "error": err}
+        message = draft_commit_message(parse_raw_numstat(out))
+        return {"command": "suggest", "repo": repo, "ok": True, "message": message}
+    prompt = build_commit_prompt(*commit_context(repo))
+    if args.prompt_only:
+        return {"command": "suggest", "repo": repo, "ok": True, "prompt": prompt}
+    from openrouter import openrouter_request
+
+    try:
+        message = openrouter_request(api_key, args.model, prompt)
+    except Exception as exc:
+        return {"command": "suggest", "repo": repo, "ok": False, "error": str(exc)}
+    return {"command": "suggest", "repo": repo, "ok": True, "message": message}
+
+
+def _run_all(func, repos: list[str], jobs: int) -> int:
+    failed = False
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for record in pool.map(func, repos):
+            failed = failed or not record.get("ok")
+            emit(record)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cindergrace-git-cli",
+        description="Headless multi-repo status, fetch and commit message suggestions.",
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("repos", nargs="*", help="repository paths")
+    common.add_argument("--favorites", action="store_true", help="include saved favorites")
+    common.add_argument(
+        "--profile", action="append", default=[], help="include a saved profile (repeatable)"
+    )
+    common.add_argument("--all-profiles", action="store_true", help="include every profile")
+    common.add_argument("--jobs", type=int, default=4, help="parallel repositories")
+    common.add_argument("--state", default=STATE_DB_PATH, help="state database path")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", parents=[common], help="branch, upstream and change counts")
+    fetch = commands.add_parser("fetch", parents=[common], help="fetch all remotes")
+    fetch.add_argument("--remote", help="fetch only this remote")
+    suggest = commands.add_parser("suggest", parents=[common], help="AI commit message")
+    suggest.add_argument("--model", default=DEFAULT_MODEL)
+    suggest.add_argument(
+        "--password-env",
+        metavar="VAR",
+        help="environment variable holding the password for the stored key "
+        "(OPENROUTER_API_KEY is used directly when set)",
+    )
+    suggest.add_argument(
+        "--prompt-only", action="store_true", help="print the prompt instead of calling the API"
+    )
+    suggest.add_argument(
+        "--draft", action="store_true", help="local draft from the diff stats, no API call"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    repos = resolve_repos(args)
+    if not repos:
+        parser.error("no repositories given (pass paths, --favorites or --profile)")
+
+    if args.command == "status":
+        return _run_all(status_one, repos, args.jobs)
+    if args.command == "fetch":
+        return _run_all(lambda repo: fetch_one(repo, args.remote), repos, args.jobs)
+
+    api_key = None
+    # --draft and --prompt-only never call the API, so they need no key.
+    if not (args.prompt_only or args.draft):
+        try:
+            api_key = _api_key(args)
+        except Exception as exc:
+            emit({"command": "suggest", "ok": False, "error": f"Failed to unlock key: {exc}"})
+            return EXIT_FAILED
+        if not api_key:
+            parser.error("set OPENROUTER_API_KEY or --password-env to unlock the stored key")
+    return _run_all(lambda repo: suggest_one(repo, args, api_key), repos, args.jobs)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
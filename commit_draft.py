@@ -0,0 +1,150 @@
+"""Local, deterministic conventional-commit drafts built from diff stats.
+
+No network and no model: the subject is derived from `git diff --raw
+--numstat` data alone, so a draft is ready in milliseconds and is the
+same for the same changes. The type comes from what kind of files changed
+(docs, tests, build/CI files, source), the scope from the paths' common
+directory (or the single file's name) and the verb from the mix of
+added, deleted, renamed and modified files.
+"""
+
+import os
+from dataclasses import dataclass
+
+SUBJECT_LIMIT = 72
+DOC_EXTENSIONS = {".md", ".rst", ".txt", ".adoc"}
+BUILD_FILES = {
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "requirements.txt",
+    "makefile",
+    "tox.ini",
+    "noxfile.py",
+    "package.json",
+    "dockerfile",
+}
+
+
+@dataclass
+class FileChange:
+    status: str
+    path: str
+    old_path: str = ""
+    added: int = 0
+    deleted: int = 0
+
+
+def parse_raw_numstat(output: str) -> list[FileChange]:
+    """Parse `git diff --raw --numstat -z` output (raw records come first)."""
+    tokens = output.split("\0")
+    changes: list[FileChange] = []
+    by_path: dict[str, FileChange] = {}
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        index += 1
+        if token.startswith(":"):
+            status = token.split()[-1][:1]
+            path = tokens[index]
+            index += 1
+            change = FileChange(status, path)
+            if status in "RC":
+                change.old_path, change.path = path, tokens[index]
+                index += 1
+            changes.append(change)
+            by_path[change.path] = change
+        elif token.count("\t") == 2:
+            added, deleted, path = token.split("\t")
+            if not path:
+                # Renames and copies: "added\tdeleted\t" then old and new path.
+                path = tokens[index + 1] if index + 1 < len(tokens) else ""
+                index += 2
+            change = by_path.get(path)
+            if change is not None:
+                change.added = int(added) if added.isdigit() else 0
+                change.deleted = int(deleted) if deleted.isdigit() else 0
+    return changes
+
+
+def _category(path: str) -> str:
+    name = os.path.basename(path).lower()
+    parts = path.lower().split("/")
+    if parts[0] == ".github" or name in {".gitlab-ci.yml", ".travis.yml", "jenkinsfile"}:
+        return "ci"
+    if name in BUILD_FILES or name.startswith("requirements"):
+        return "build"
+    if "tests" in parts[:-1] or "test" in parts[:-1] or name.startswith("test_"):
+        return "test"
+    if os.path.splitext(name)[1] in DOC_EXTENSIONS or "docs" in parts[:-1]:
+        return "docs"
+    return "src"
+
+
+def _commit_type(changes: list[FileChange]) -> str:
+    categories = {_category(change.path) for change in changes}
+    if len(categories) == 1 and "src" not in categories:
+        return categories.pop()
+    source = [change for change in changes if _category(change.path) == "src"]
+    statuses = {change.status for change in source}
+    if "A" in statuses:
+        return "feat"
+    if statuses <= {"R", "D"}:
+        return "refactor"
+    added = sum(change.added for change in source)
+    deleted = sum(change.deleted for change in source)
+    return "feat" if added > deleted * 2 else "refactor" if deleted > added else "fix"
+
+
+def _scope(changes: list[FileChange]) -> str:
+    paths = [change.path for change in changes]
+    if len(paths) == 1:
+        return os.path.splitext(os.path.basename(paths[0]))[0]
+    common = os.path.commonpath([os.path.dirname(path) or "." for path in paths])
+    return "" if common in ("", ".") else os.path.basename(common)
+
+
+def _verb(changes: list[FileChange]) -> str:
+    statuses = {change.status for change in changes}
+    if statuses == {"A"}:
+        return "add"
+    if statuses == {"D"}:
+        return "remove"
+    if statuses == {"R"}:
+        return "rename" if len({os.path.dirname(c.path) for c in changes}) == 1 else "move"
+    return "update"
+
+
+def _object(changes: list[FileChange], room: int) -> str:
+    names = [os.path.basename(change.path) for change in changes]
+    if len(names) == 1:
+        change = changes[0]
+        if change.status == "R":
+            text = f"{os.path.basename(change.old_path)} to {names[0]}"
+            return text if len(text) <= room else names[0]
+        return names[0]
+    for shown in range(min(len(names), 3), 0, -1):
+        rest = len(names) - shown
+        listed = ", ".join(names[:shown])
+        if rest:
+            text = f"{listed} and {rest} more file{'s' if rest > 1 else ''}"
+        else:
+            head, _, last = listed.rpartition(", ")
+            text = f"{head} and {last}"
+        if len(text) <= room:
+            return text
+    return f"{len(names)} files"
+
+
+def draft_commit_message(changes: list[FileChange]) -> str:
+    """Conventional-commit subject ("type(scope): verb object"), max 72 chars."""
+    if not changes:
+        return ""
+    scope = _scope(changes)
+    prefix = f"{_commit_type(changes)}({scope}): " if scope else f"{_commit_type(changes)}: "
+    verb = _verb(changes)
+    subject = f"{prefix}{verb} {_object(changes, SUBJECT_LIMIT - len(prefix) - len(verb) - 1)}"
+    return subject[:SUBJECT_LIMIT]
+
+
+__all__ = ["FileChange", "draft_commit_message", "parse_raw_numstat"]
@@ -0,0 +1,197 @@
+"""Unmerged paths and their base/ours/theirs blobs for conflict resolution.
+
+The conflict list comes from one `git ls-files -u -z` call. Blob contents
+are read on demand with one `git cat-file --batch` call per file (all of
+its stages at once) and cached by object id, so stepping through hundreds
+of conflicted files costs one git process per file instead of one per stage.
+Resolving a file only touches that path; nothing re-scans the tree.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from git_ops import run_git
+
+BLOB_CACHE_SIZE = 256
+MAX_BLOB_BYTES = 2_000_000
+STAGES = {1: "base", 2: "ours", 3: "theirs"}
+# (has base, has ours, has theirs) -> description, as `git status` words it.
+KINDS = {
+    (True, True, True): "both modified",
+    (False, True, True): "both added",
+    (True, True, False): "deleted by them",
+    (True, False, True): "deleted by us",
+    (False, True, False): "added by us",
+    (False, False, True): "added by them",
+    (True, False, False): "both deleted",
+}
+
+
+@dataclass
+class Conflict:
+    path: str
+    stages: dict = field(default_factory=dict)
+
+    @property
+    def kind(self) -> str:
+        return KINDS.get(tuple(stage in self.stages for stage in STAGES), "unmerged")
+
+
+def parse_ls_files_u(output: str) -> list[Conflict]:
+    """Parse NUL-separated `ls-files -u -z` records into conflicts, in path order."""
+    conflicts: dict[str, Conflict] = {}
+    for record in output.split("\0"):
+        info, sep, path = record.partition("\t")
+        if not sep:
+            continue
+        _mode, oid, stage = info.split()
+        conflicts.setdefault(path, Conflict(path)).stages[int(stage)] = oid
+    return list(conflicts.values())
+
+
+def unmerged_paths(repo):
+    """Return (code, [Conflict], stderr)."""
+    code, out, err = run_git(["ls-files", "-u", "-z"], repo)
+    if code != 0:
+        return code, [], err
+    return code, parse_ls_files_u(out), err
+
+
+class BlobReader:
+    """`git cat-file --batch` reads with an LRU cache keyed by object id.
+
+    Each `read_many` fetches all uncached blobs in one git call through
+    `run_git`, so reads share the app's git limits and telemetry.
+    """
+
+    def __init__(self, repo, cache_size=BLOB_CACHE_SIZE):
+        self.repo = repo
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_many(self, oids) -> dict[str, bytes | None]:
+        """Contents per object id; None where the object is missing."""
+        with self._lock:
+            found = {oid: self._cache[oid] for oid in oids if oid in self._cache}
+            for oid in found:
+                self._cache.move_to_end(oid)
+        wanted = [oid for oid in dict.fromkeys(oids) if oid not in found]
+        if wanted:
+            request = "".join(f"{oid}\n" for oid in wanted)
+            code, out, _ = run_git(["cat-file", "--batch"], self.repo, input=request, text=False)
+            fetched = _parse_batch(out) if code == 0 else {}
+            with self._lock:
+                for oid in wanted:
+                    data = found[oid] = fetched.get(oid)
+                    if data is not None:
+                        self._cache[oid] = data
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return {oid: found.get(oid) for oid in oids}
+
+    def read(self, oid: str) -> bytes | None:
+        """Blob contents, or None when the object is missing."""
+        return self.read_many([oid])[oid]
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def _parse_batch(output: bytes) -> dict[str, bytes]:
+    """Split `cat-file --batch` output into {object id: contents}; missing ones are left out."""
+    objects = {}
+    position = 0
+    while position < len(output):
+        end = output.index(b"\n", position)
+        header = output[position:end].split()
+        position = end + 1
+        if len(header) != 3:
+            continue
+        size = int(header[2])
+        objects[header[0].decode()] = output[position : position + size]
+        position += size + 1
+    return objects
+
+
+def _decode(data: bytes | None) -> tuple[str, bool]:
+    """Display text for `data` and whether writing it back as UTF-8 is lossless."""
+    if data is None:
+        return "", True
+    if b"\0" in data[:8000]:
+        return f"(binary, {len(data)} bytes)", False
+    if len(data) > MAX_BLOB_BYTES:
+        text = data[:MAX_BLOB_BYTES].decode("utf-8", errors="replace")
+        return text + "\n... (truncated)", False
+    try:
+        return data.decode("utf-8"), True
+    except UnicodeDecodeError:
+        return data.decode("utf-8", errors="replace"), False
+
+
+def three_way(reader: BlobReader, conflict: Conflict) -> dict[str, str]:
+    """Text of each stage ("base", "ours", "theirs"); "" where a side is absent."""
+    blobs = reader.read_many(list(conflict.stages.values()))
+    return {
+        name: _decode(blobs[conflict.stages[stage]])[0] if stage in conflict.stages else ""
+        for stage, name in STAGES.items()
+    }
+
+
+def working_text(repo, path) -> tuple[str, bool]:
+    """The worktree file (usually with conflict markers) and whether it is editable.
+
+    Binary, oversized and non-UTF-8 files are shown lossily, and a deleted
+    file as empty; none of them is editable, since `save_resolution` would
+    corrupt the file or bring a deletion back as an empty file.
+    """
+    try:
+        with open(os.path.join(repo, path), "rb") as handle:
+            return _decode(handle.read())
+    except OSError:
+        return "", False
+
+
+def mark_resolved(repo, path):
+    """Stage the worktree state of `path` (a deleted file is staged as deleted)."""
+    if os.path.lexists(os.path.join(repo, path)):
+        return run_git(["add", "--", path], repo)
+    return run_git(["rm", "--cached", "--quiet", "--", path], repo)
+
+
+def resolve_with(repo, conflict: Conflict, side: str):
+    """Take "ours" or "theirs" for the whole file and mark it resolved."""
+    stage = 2 if side == "ours" else 3
+    if stage not in conflict.stages:
+        # The chosen side deleted the file.
+        return run_git(["rm", "--quiet", "--force", "--", conflict.path], repo)
+    code, out, err = run_git(["checkout", f"--{side}", "--", conflict.path], repo)
+    if code != 0:
+        return code, out, err
+    return mark_resolved(repo, conflict.path)
+
+
+def save_resolution(repo, path, text):
+    """Write `text` (UTF-8) as the resolved file and mark it resolved."""
+    try:
+        with open(os.path.join(repo, path), "w", encoding="utf-8", newline="") as handle:
+            handle.write(text)
+    except OSError as exc:
+        return 1, "", str(exc)
+    return mark_resolved(repo, path)
+
+
+__all__ = [
+    "BlobReader",
+    "Conflict",
+    "mark_resolved",
+    "parse_ls_files_u",
+    "resolve_with",
+    "save_resolution",
+    "three_way",
+    "unmerged_paths",
+    "working_text",
+]
@@ -0,0 +1,249 @@
+"""Per-file history with rename tracking, answered from a cached path index.
+
+The index maps every path to the commits reachable from HEAD that touched
+it, with renames recorded, and lives in the state database. It is built
+in the background the first time a file's history is asked for (newest
+commits first, in batches) and afterwards only extended with the commits
+between the indexed tip and the new HEAD. Until a repository is indexed,
+or when HEAD moved to an unrelated history, queries fall back to git:
+`git log -- path` one rename segment at a time, which, unlike `--follow`,
+can use the commit-graph's changed-path Bloom filters when maintenance
+has written them. Nothing here writes to the repository.
+"""
+
+import codecs
+import os
+import threading
+from dataclasses import dataclass
+
+from git_ops import git_dirs, run_git, stream_git
+
+INDEX_BATCH = 2000
+LOG_FORMAT = "--format=%x01%H%x00%at%x00%an%x00%s"
+
+_building: set[str] = set()
+_building_lock = threading.Lock()
+
+
+@dataclass
+class FileCommit:
+    commit: str
+    time: int
+    author: str
+    summary: str
+    path: str
+    status: str
+
+
+def unquote_path(path: str) -> str:
+    """Undo git's C-style quoting of unusual paths ("caf\\303\\251")."""
+    if len(path) >= 2 and path[0] == path[-1] == '"':
+        return codecs.escape_decode(path[1:-1].encode())[0].decode("utf-8", errors="replace")
+    return path
+
+
+class LogParser:
+    """Collect commits from `git log LOG_FORMAT --name-status` lines.
+
+    `on_commit(commit)` gets (commit id, time, author, summary, changes)
+    with changes as (status letter, path, old path) once the commit's
+    name-status block is complete.
+    """
+
+    def __init__(self, on_commit):
+        self.on_commit = on_commit
+        self._current = None
+
+    def feed(self, line: str) -> None:
+        if line.startswith("\x01"):
+            self.close()
+            commit, when, author, summary = (line[1:].split("\x00") + ["", "", ""])[:4]
+            self._current = (commit, int(when or 0), author, summary, [])
+        elif "\t" in line and self._current is not None:
+            status, *paths = line.split("\t")
+            paths = [unquote_path(path) for path in paths]
+            if status[:1] in "RC" and len(paths) == 2:
+                self._current[4].append((status[0], paths[1], paths[0]))
+                if status[0] == "R":
+                    self._current[4].append(("D", paths[0], ""))
+            elif paths:
+                self._current[4].append((status[:1], paths[0], ""))
+
+    def close(self) -> None:
+        if self._current is not None:
+            current, self._current = self._current, None
+            self.on_commit(current)
+
+
+def _head(repo):
+    code, out, _ = run_git(["rev-parse", "--verify", "-q", "HEAD"], repo)
+    return out if code == 0 else ""
+
+
+def _index_log_args(*revs):
+    # Topological order keeps every child's seq above its parents'.
+    return ["log", "--topo-order", "-M", "--name-status", LOG_FORMAT, *revs, "--"]
+
+
+def update_index(repo, store, cancel=None, rebuild=True) -> bool:
+    """Bring the path index of `repo` up to HEAD; True when it is current.
+
+    Extends an existing index when HEAD descends from its tip; otherwise
+    rebuilds it (or gives up when `rebuild` is False). Only one update per
+    repository runs at a time; a concurrent call returns False.
+    """
+    head = _head(repo)
+    if not head:
+        return False
+    with _building_lock:
+        if repo in _building:
+            return False
+        _building.add(repo)
+    try:
+        return _update_index(repo, store, head, cancel, rebuild)
+    finally:
+        with _building_lock:
+            _building.discard(repo)
+
+
+def _update_index(repo, store, head, cancel, rebuild):
+    state = store.path_index_state(repo)
+    if state and state["complete"]:
+        if state["tip"] == head:
+            return True
+        code, _, _ = run_git(["merge-base", "--is-ancestor", state["tip"], head], repo)
+        if code == 0:
+            new = []
+            parser = LogParser(new.append)
+            code, _, _ = stream_git(
+                _index_log_args(head, f"^{state['tip']}"), repo, parser.feed, cancel
+            )
+            if code != 0:
+                return False
+            parser.close()
+            top = state["max_seq"] + len(new)
+            commits = [(top - index, *commit) for index, commit in enumerate(new)]
+            store.path_index_add(repo, commits, {**state, "tip": head, "max_seq": top})
+            return True
+    if not rebuild:
+        return False
+
+    store.path_index_reset(repo)
+    batch = []
+    seq = [0]
+    state = {"tip": head, "complete": False, "min_seq": 0, "max_seq": 0}
+
+    def on_commit(commit):
+        batch.append((seq[0], *commit))
+        state["min_seq"] = seq[0]
+        seq[0] -= 1
+        if len(batch) >= INDEX_BATCH:
+            store.path_index_add(repo, batch, state)
+            batch.clear()
+
+    parser = LogParser(on_commit)
+    code, _, _ = stream_git(_index_log_args(head), repo, parser.feed, cancel)
+    if code != 0:
+        return False
+    parser.close()
+    state["complete"] = True
+    store.path_index_add(repo, batch, state)
+    return True
+
+
+def has_changed_paths(repo) -> bool:
+    """True if the repo's commit-graph carries changed-path Bloom filters."""
+    _, common_dir = git_dirs(repo)
+    info = os.path.join(common_dir, "objects", "info")
+    graphs = [os.path.join(info, "commit-graph")]
+    chain = os.path.join(info, "commit-graphs", "commit-graph-chain")
+    try:
+        with open(chain, encoding="ascii") as handle:
+            graphs += [
+                os.path.join(info, "commit-graphs", f"graph-{line.strip()}.graph")
+                for line in handle
+                if line.strip()
+            ]
+    except OSError:
+        pass
+    for graph in graphs:
+        try:
+            with open(graph, "rb") as handle:
+                header = handle.read(8)
+                if len(header) < 8 or header[:4] != b"CGPH":
+                    continue
+                # Chunk table: (count + 1) entries of 4-byte id + 8-byte offset.
+                table = handle.read(12 * (header[6] + 1))
+        except OSError:
+            continue
+        if any(table[offset : offset + 4] == b"BDAT" for offset in range(0, len(table), 12)):
+            return True
+    return False
+
+
+def _indexed_history(store, repo, path):
+    history = []
+    below = None
+    while path:
+        current, path = path, ""
+        for seq, commit, when, author, summary, status, old_path in store.path_history(
+            repo, current, below
+        ):
+            history.append(FileCommit(commit, when, author, summary, current, status))
+            if status == "R" and old_path:
+                # Older commits belong to the file under its previous name.
+                path, below = old_path, seq
+                break
+    return history
+
+
+def _git_history(repo, path, cancel):
+    history = []
+    rev = "HEAD"
+    while path:
+        commits = []
+        parser = LogParser(commits.append)
+        args = ["log", "--name-status", LOG_FORMAT, rev, "--", f":(top){path}"]
+        code, _, err = stream_git(args, repo, parser.feed, cancel)
+        if code != 0:
+            return code, history, err
+        parser.close()
+        for commit, when, author, summary, changes in commits:
+            status = next((change[0] for change in changes if change[1] == path), "")
+            history.append(FileCommit(commit, when, author, summary, path, status))
+        if not commits or history[-1].status != "A":
+            break
+        # The path-limited log shows a rename as an add; look for its source.
+        oldest = commits[-1][0]
+        code, out, _ = run_git(["show", "-M", "--name-status", "--format=", oldest], repo, cancel)
+        renamed = [line.split("\t") for line in out.splitlines() if line.startswith("R")]
+        sources = [unquote_path(parts[1]) for parts in renamed if unquote_path(parts[2]) == path]
+        path = sources[0] if code == 0 and sources else ""
+        history[-1].status = "R" if path else "A"
+        rev = f"{oldest}^"
+    return 0, history, ""
+
+
+def file_history(repo, path, store, cancel=None):
+    """Commits touching `path` across renames, newest first.
+
+    Returns (code, source, [FileCommit], stderr) where source is "index" or
+    "git" (the fallback used until the index covers HEAD).
+    """
+    state = store.path_index_state(repo)
+    if state and state["complete"] and update_index(repo, store, cancel, rebuild=False):
+        history = _indexed_history(store, repo, path)
+        if history:
+            return 0, "index", history, ""
+    code, history, err = _git_history(repo, path, cancel)
+    return code, "git", history, err
+
+
+__all__ = [
+    "FileCommit",
+    "LogParser",
+    "file_history",
+    "has_changed_paths",
+    "unquote_path",
+    "update_index",
+]
@@ -0,0 +1,325 @@
+"""asyncio core of the git_ops API with timeouts and concurrency limits.
+
+Every call takes a slot from a per-repository semaphore and then from a
+global one (in that order, so a call queued behind its repository does not
+hold a global slot). A timeout or a cancelled task kills git, and calls are
+recorded in `TELEMETRY` under the thread that made them. Limits are kept
+per event loop.
+
+git keeps the caller's session and stdin, so SSH passphrase and credential
+prompts on the terminal work as they do for plain git.
+
+`GitLoop` runs one event loop in a background thread. `git_ops.run_git`
+and `git_ops.stream_git` are thin blocking wrappers over it, so every git
+call in the app shares the same limits.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import os
+import shutil
+import subprocess
+import threading
+import time
+import weakref
+
+from telemetry import TELEMETRY
+
+TIMED_OUT = -3
+MAX_CONCURRENT_GIT = max(4, (os.cpu_count() or 2) * 2)
+MAX_CONCURRENT_PER_REPO = 4
+KILL_GRACE_SECONDS = 0.5
+
+_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, GitLimits]" = (
+    weakref.WeakKeyDictionary()
+)
+_loop_lock = threading.Lock()
+_default_loop = None
+
+
+class GitLimits:
+    """Global and per-repository concurrency limits for one event loop."""
+
+    def __init__(self, total=MAX_CONCURRENT_GIT, per_repo=MAX_CONCURRENT_PER_REPO):
+        self.total = asyncio.Semaphore(total)
+        self.per_repo = per_repo
+        self._repos: dict[str, asyncio.Semaphore] = {}
+        self.running = 0
+        self.peak = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self, repo):
+        key = os.path.abspath(repo) if repo else ""
+        repo_limit = self._repos.setdefault(key, asyncio.Semaphore(self.per_repo))
+        async with repo_limit, self.total:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            try:
+                yield
+            finally:
+                self.running -= 1
+
+
+def default_limits() -> GitLimits:
+    loop = asyncio.get_running_loop()
+    limits = _limits.get(loop)
+    if limits is None:
+        limits = _limits[loop] = GitLimits()
+    return limits
+
+
+def _low_priority_options():
+    """Command prefix and spawn kwargs that run git at idle CPU and I/O priority."""
+    if os.name == "nt":
+        return [], {"creationflags": subprocess.IDLE_PRIORITY_CLASS}
+    prefix = []
+    if shutil.which("ionice"):
+        prefix += ["ionice", "-c3"]
+    if shutil.which("nice"):
+        prefix += ["nice", "-n19"]
+    return prefix, {}
+
+
+async def _kill(proc) -> None:
+    """Kill git and reap it, waiting at most KILL_GRACE_SECONDS.
+
+    Hooks or helpers started by git may keep its pipes open after it died;
+    the transport then finishes on its own once they exit.
+    """
+    with contextlib.suppress(ProcessLookupError):
+        proc.kill()
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(proc.wait(), KILL_GRACE_SECONDS)
+
+
+async def _spawn(args, cwd, low_priority=False, stdin=None, stdout=subprocess.PIPE):
+    prefix, options = _low_priority_options() if low_priority else ([], {})
+    return await asyncio.create_subprocess_exec(
+        *prefix,
+        "git",
+        *args,
+        cwd=cwd,
+        stdin=stdin,
+        stdout=stdout,
+        stderr=subprocess.PIPE,
+        **options,
+    )
+
+
+async def _supervise(procs, work, timeout):
+    """Await `work`; on timeout or cancellation kill the git processes and reap them."""
+    try:
+        return await asyncio.wait_for(work, timeout)
+    except asyncio.TimeoutError:
+        await asyncio.gather(*(_kill(proc) for proc in procs))
+        return None
+    except asyncio.CancelledError:
+        # Reap git before propagating so its pipes close on this loop.
+        with contextlib.suppress(asyncio.CancelledError):
+            await asyncio.shield(asyncio.gather(*(_kill(proc) for proc in procs)))
+        raise
+
+
+def _timed_out(args, timeout):
+    return TIMED_OUT, "", f"git {args[0] if args else ''} timed out after {timeout}s"
+
+
+def run_git(args, cwd, timeout=None, limits=None, low_priority=False, input=None, text=True):
+    """Coroutine: run git and return (returncode, stdout, stderr); TIMED_OUT on timeout.
+
+    `low_priority` runs git under idle CPU/I/O scheduling; `input` (str or
+    bytes) is written to git's stdin. With `text` False stdout is returned
+    as raw bytes, not decoded or stripped. Telemetry records the thread that
+    created the coroutine, not the loop thread.
+    """
+    thread = threading.get_ident()
+    return _run_git(args, cwd, timeout, limits, low_priority, input, text, thread)
+
+
+async def _run_git(args, cwd, timeout, limits, low_priority, input, text, thread):
+    async with (limits or default_limits()).slot(cwd):
+        started = time.perf_counter()
+        stdin = subprocess.PIPE if input is not None else None
+        try:
+            proc = await _spawn(args, cwd, low_priority, stdin)
+        except FileNotFoundError:
+            return 127, "", "git not found in PATH"
+        spawned = time.perf_counter()
+        data = input.encode() if isinstance(input, str) else input
+        output = await _supervise([proc], proc.communicate(data), timeout)
+        if output is None:
+            return _timed_out(args, timeout)
+        stdout, stderr = output
+        TELEMETRY.record(
+            args,
+            cwd,
+            proc.returncode,
+            started=started,
+            spawn=spawned - started,
+            runtime=time.perf_counter() - spawned,
+            bytes_out=len(stdout),
+            thread=thread,
+        )
+        return (
+            proc.returncode,
+            stdout.decode("utf-8", errors="replace").strip() if text else stdout,
+            stderr.decode("utf-8", errors="replace").strip(),
+        )
+
+
+async def _pump(proc, on_line):
+    """Feed stdout lines of `proc` to `on_line`; returns (bytes read, stderr)."""
+    bytes_out = 0
+    # Drain stderr alongside stdout so neither pipe can fill up and stall git.
+    errors = asyncio.ensure_future(proc.stderr.read())
+    try:
+        async for raw in proc.stdout:
+            bytes_out += len(raw)
+            pending = on_line(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+            if inspect.isawaitable(pending):
+                # The consumer is full: stop reading so git blocks on the pipe.
+                await pending
+        stderr = await errors
+    finally:
+        errors.cancel()
+    await proc.wait()
+    return bytes_out, stderr
+
+
+def stream_git(args, cwd, on_line, timeout=None, limits=None):
+    """Coroutine: call `on_line(text)` for each stdout line, on the loop thread.
+
+    When `on_line` returns an awaitable, reading pauses until it is done.
+    Returns (returncode, "", stderr); `timeout` bounds the whole call.
+    """
+    thread = threading.get_ident()
+    return _stream_git(args, cwd, on_line, timeout, limits, thread)
+
+
+async def _stream_git(args, cwd, on_line, timeout, limits, thread):
+    async with (limits or default_limits()).slot(cwd):
+        started = time.perf_counter()
+        try:
+            proc = await _spawn(args, cwd)
+        except FileNotFoundError:
+            return 127, "", "git not found in PATH"
+        spawned = time.perf_counter()
+        output = await _supervise([proc], _pump(proc, on_line), timeout)
+        if output is None:
+            return _timed_out(args, timeout)
+        bytes_out, stderr = output
+        TELEMETRY.record(
+            args,
+            cwd,
+            proc.returncode,
+            started=started,
+            spawn=spawned - started,
+            runtime=time.perf_counter() - spawned,
+            bytes_out=bytes_out,
+            thread=thread,
+        )
+        return proc.returncode, "", stderr.decode("utf-8", errors="replace").strip()
+
+
+def stream_pipe(first, second, cwd, on_line, timeout=None, limits=None):
+    """Coroutine: `stream_git` over `git <first> | git <second>`, as one call.
+
+    Both processes share one slot; the code is the producer's if it failed,
+    else the consumer's, and stderr is the consumer's.
+    """
+    thread = threading.get_ident()
+    return _stream_pipe(first, second, cwd, on_line, timeout, limits, thread)
+
+
+async def _stream_pipe(first, second, cwd, on_line, timeout, limits, thread):
+    async with (limits or default_limits()).slot(cwd):
+        started = time.perf_counter()
+        read_end, write_end = os.pipe()
+        procs = []
+        try:
+            procs.append(await _spawn(first, cwd, stdout=write_end))
+            procs.append(await _spawn(second, cwd, stdin=read_end))
+        except BaseException as exc:
+            # Never leave the producer running when the consumer could not start.
+            await asyncio.gather(*(_kill(proc) for proc in procs))
+            if isinstance(exc, FileNotFoundError):
+                return 127, "", "git not found in PATH"
+            raise
+        finally:
+            os.close(read_end)
+            os.close(write_end)
+        producer, consumer = procs
+        spawned = time.perf_counter()
+
+        async def run():
+            # The producer's stderr is drained too; only the consumer's is reported.
+            producer_errors = asyncio.ensure_future(producer.stderr.read())
+            try:
+                result = await _pump(consumer, on_line)
+                await producer_errors
+            finally:
+                producer_errors.cancel()
+            await producer.wait()
+            return result
+
+        output = await _supervise(procs, run(), timeout)
+        if output is None:
+            return _timed_out(first, timeout)
+        bytes_out, stderr = output
+        code = producer.returncode or consumer.returncode
+        TELEMETRY.record(
+            [*first, "|", *second],
+            cwd,
+            code,
+            started=started,
+            spawn=spawned - started,
+            runtime=time.perf_counter() - spawned,
+            bytes_out=bytes_out,
+            thread=thread,
+        )
+        return code, "", stderr.decode("utf-8", errors="replace").strip()
+
+
+class GitLoop:
+    """An asyncio event loop on a daemon thread for submitting git coroutines."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def submit(self, coro):
+        """Schedule `coro`; returns a concurrent.futures.Future (cancel() kills git)."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro, timeout=None):
+        """Run `coro` on the loop and block the calling thread for its result."""
+        return self.submit(coro).result(timeout)
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+def git_loop() -> GitLoop:
+    """The shared background loop, started on first use."""
+    global _default_loop
+    with _loop_lock:
+        if _default_loop is None:
+            _default_loop = GitLoop()
+        return _default_loop
+
+
+__all__ = [
+    "MAX_CONCURRENT_GIT",
+    "MAX_CONCURRENT_PER_REPO",
+    "TIMED_OUT",
+    "GitLimits",
+    "GitLoop",
+    "default_limits",
+    "git_loop",
+    "run_git",
+    "stream_git",
+    "stream_pipe",
+]
@@ -1,23 +1,119 @@
 """Git command helpers."""
 
+import concurrent.futures
+import contextlib
 import os
-import subprocess
+import queue
+import re
+import threading
 
+CANCELLED = -2
+CANCEL_POLL_SECONDS = 0.1
+# Lines git may run ahead of a slow `stream_git` consumer before it is paused.
+STREAM_WINDOW_LINES = 4096
+STREAM_CREDIT_BATCH = 256
 
-def run_git(args, cwd):
-    """Run a git command and return (returncode, stdout, stderr)."""
-    try:
-        result = subprocess.run(
-            ["git"] + args,
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False,
-        )
-        return result.returncode, result.stdout.strip(), result.stderr.strip()
-    except FileNotFoundError:
-        return 127, "", "git not found in PATH"
+
+def _wait(job, cancel):
+    """Block on a git_async job; kill it and return CANCELLED once `cancel` is set."""
+    while True:
+        try:
+            return job.result(None if cancel is None else CANCEL_POLL_SECONDS)
+        except concurrent.futures.TimeoutError:
+            if cancel.is_set():
+                job.cancel()
+                return CANCELLED, "", "cancelled"
+
+
+def run_git(args, cwd, cancel=None, low_priority=False, input=None, text=True):
+    """Run a git command and return (returncode, stdout, stderr).
+
+    A thin blocking wrapper over `git_async.run_git` on the shared loop, so
+    calls from any thread share its concurrency limits and are timed into
+    `TELEMETRY`. Do not call it from the loop thread itself. When `cancel`
+    (a threading.Event) is set while git runs, the process is killed and
+    CANCELLED is returned as the code. `low_priority` runs git under idle
+    CPU/I/O scheduling for background housekeeping; `input` (str or bytes)
+    is written to git's stdin. With `text` False stdout comes back as raw
+    bytes.
+    """
+    if cancel is not None and cancel.is_set():
+        return CANCELLED, "", "cancelled"
+    # asyncio is imported on the first git call, not with this module.
+    import git_async
+
+    coro = git_async.run_git(args, cwd, low_priority=low_priority, input=input, text=text)
+    return _wait(git_async.git_loop().submit(coro), cancel)
+
+
+def stream_git(args, cwd, on_line, cancel=None):
+    """Run git and call `on_line(text)` for each stdout line as it arrives.
+
+    Wraps `git_async.stream_git` like `run_git`; lines are handed back to
+    the calling thread, so `on_line` may block or run more git. At most
+    STREAM_WINDOW_LINES lines wait for it; beyond that git is paused, so
+    memory stays bounded however slow `on_line` is. Returns (returncode,
+    "", stderr); setting `cancel` kills the process even while git is still
+    silent, and returns CANCELLED.
+    """
+    import git_async
+
+    return _stream(lambda put: git_async.stream_git(args, cwd, put), on_line, cancel)
+
+
+def stream_pipe(first, second, cwd, on_line, cancel=None):
+    """`stream_git` over `git <first> | git <second>`; one call under the shared limits."""
+    import git_async
+
+    return _stream(lambda put: git_async.stream_pipe(first, second, cwd, put), on_line, cancel)
+
+
+def _stream(start, on_line, cancel):
+    """Run the coroutine `start(put)` on the shared loop, feeding lines to `on_line`."""
+    if cancel is not None and cancel.is_set():
+        return CANCELLED, "", "cancelled"
+    import asyncio
+
+    import git_async
+
+    shared = git_async.git_loop()
+    lines = queue.SimpleQueue()
+    # Line credits, only touched on the loop; the consumer returns them in batches.
+    credit = [STREAM_WINDOW_LINES]
+    resumed = asyncio.Event()
+
+    def put(line):
+        lines.put(line)
+        credit[0] -= 1
+        if credit[0] > 0:
+            return None
+        resumed.clear()
+        return resumed.wait()
+
+    def give_back(count):
+        credit[0] += count
+        resumed.set()
+
+    job = shared.submit(start(put))
+    job.add_done_callback(lambda _job: lines.put(None))
+    idle = object()
+    taken = 0
+    while True:
+        try:
+            line = lines.get(timeout=CANCEL_POLL_SECONDS)
+        except queue.Empty:
+            line = idle
+        if cancel is not None and cancel.is_set():
+            job.cancel()
+            return CANCELLED, "", "cancelled"
+        if line is None:
+            return job.result()
+        if line is not idle:
+            on_line(line)
+            taken += 1
+            if taken == STREAM_CREDIT_BATCH:
+                shared.loop.call_soon_threadsafe(give_back, taken)
+                taken = 0
 
 
 def is_git_repo(path):
@@ -25,6 +121,264 @@ def is_git_repo(path):
     return code == 0 and out.strip() == "true"
 
 
+def commit_context(repo):
+    """Return (short status, staged diff or else working-tree diff) for prompts."""
+    _, status_out, _ = run_git(["status", "-s"], repo)
+    _, diff_cached, _ = run_git(["diff", "--cached"], repo)
+    diff_text = diff_cached
+    if not diff_text:
+        _, diff_text, _ = run_git(["diff"], repo)
+    return status_out, diff_text
+
+
+def change_stats(repo):
+    """`diff --raw --numstat -M -z` of the staged changes, or else the worktree's.
+
+    Returns (code, output, stderr); see commit_draft.parse_raw_numstat.
+    """
+    base = ["diff", "--raw", "--numstat", "-M", "-z"]
+    code, out, err = run_git([*base, "--cached"], repo)
+    if code == 0 and not out:
+        code, out, err = run_git(base, repo)
+    return code, out, err
+
+
+def history_text(repo, limit=50):
+    """One-line log of the last `limit` commits, or an error message."""
+    code, out, err = run_git(["log", "--oneline", f"-{limit}"], repo)
+    if code != 0:
+        return err or "Failed to read history."
+    return out or "No commits found."
+
+
+def diff_summary(repo):
+    """Short status plus `diff --stat` as display text, or an error message."""
+    code, status_out, status_err = run_git(["status", "-s"], repo)
+    if code != 0:
+        return status_err or "Failed to read status."
+    code_diff, diff_out, diff_err = run_git(["diff", "--stat"], repo)
+    if code_diff != 0:
+        return diff_err or "Failed to read diff."
+    parts = []
+    if status_out:
+        parts.append("Changed files:\n" + status_out)
+    else:
+        parts.append("Changed files: none")
+    if diff_out:
+        parts.append("\nDiff summary:\n" + diff_out)
+    else:
+        parts.append("\nDiff summary: clean")
+    return "\n".join(parts)
+
+
+def list_branches(repo):
+    """Return (code, local branches, current branch, stderr)."""
+    code, out, err = run_git(["branch"], repo)
+    if code != 0:
+        return code, [], "", err
+    branches = []
+    current = ""
+    for line in out.splitlines():
+        line = line.strip()
+        if line.startswith("*"):
+            current = line[1:].strip()
+            branches.append(current)
+        elif line:
+            branches.append(line)
+    return code, branches, current, err
+
+
+def list_remote_branches(repo):
+    """Return (code, sorted "<remote>/<branch>" names, stderr)."""
+    code, out, err = run_git(["branch", "-a"], repo)
+    if code != 0:
+        return code, [], err
+    remote_branches = []
+    for line in out.splitlines():
+        entry = line.strip()
+        if entry.startswith("*"):
+            entry = entry[1:].strip()
+        if "->" in entry:
+            continue
+        if entry.startswith("remotes/"):
+            entry = entry.replace("remotes/", "", 1)
+        if entry and "/" in entry:
+            remote_branches.append(entry)
+    return code, sorted(set(remote_branches)), err
+
+
+_TRACK_RE = re.compile(r"(ahead|behind) (\d+)")
+_cache_lock = threading.Lock()
+_git_dirs: dict[str, tuple[str, str]] = {}
+_tracking_cache: dict[str, tuple[tuple, list]] = {}
+
+
+def git_dirs(repo):
+    """Return (git dir, common dir) as absolute paths, cached per repo."""
+    with _cache_lock:
+        cached = _git_dirs.get(repo)
+    if cached:
+        return cached
+    code, out, _ = run_git(["rev-parse", "--absolute-git-dir", "--git-common-dir"], repo)
+    if code != 0:
+        return "", ""
+    git_dir, common_dir = (out.splitlines() + [""])[:2]
+    common_dir = os.path.normpath(os.path.join(repo, common_dir)) if common_dir else git_dir
+    with _cache_lock:
+        _git_dirs[repo] = (git_dir, common_dir)
+    return git_dir, common_dir
+
+
+def _tree_signature(path):
+    # Directory mtimes change when refs are added or removed; file mtimes when
+    # a loose ref is updated. max() over both is enough to detect a change.
+    newest, count = 0, 0
+    for root, _dirs, files in os.walk(path):
+        with contextlib.suppress(OSError):
+            newest = max(newest, os.stat(root).st_mtime_ns)
+        for name in files:
+            with contextlib.suppress(OSError):
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+            count += 1
+    return newest, count
+
+
+def refs_signature(repo):
+    """Cheap stat-only fingerprint of HEAD, packed refs, branches and FETCH_HEAD."""
+    git_dir, common_dir = git_dirs(repo)
+    if not git_dir:
+        return None
+    parts = []
+    for path in (
+        os.path.join(git_dir, "HEAD"),
+        os.path.join(common_dir, "packed-refs"),
+        os.path.join(git_dir, "FETCH_HEAD"),
+    ):
+        try:
+            stat = os.stat(path)
+            parts.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            parts.append(None)
+    parts.append(_tree_signature(os.path.join(common_dir, "refs", "heads")))
+    parts.append(_tree_signature(os.path.join(common_dir, "refs", "remotes")))
+    return tuple(parts)
+
+
+def last_fetch_time(repo):
+    """mtime of FETCH_HEAD (seconds since epoch), or None if never fetched."""
+    git_dir, _ = git_dirs(repo)
+    try:
+        return os.path.getmtime(os.path.join(git_dir, "FETCH_HEAD"))
+    except OSError:
+        return None
+
+
+def parse_branch_tracking(output):
+    branches = []
+    for line in output.splitlines():
+        if not line:
+            continue
+        name, upstream, track, head = (line.split("\0") + ["", "", ""])[:4]
+        counts = {kind: int(value) for kind, value in _TRACK_RE.findall(track)}
+        branches.append(
+            {
+                "name": name,
+                "upstream": upstream,
+                "ahead": counts.get("ahead", 0),
+                "behind": counts.get("behind", 0),
+                "gone": track == "[gone]",
+                "current": head == "*",
+            }
+        )
+    return branches
+
+
+def branch_tracking(repo, use_cache=True):
+    """Return (code, branches, stderr) with upstream and ahead/behind per branch.
+
+    One `for-each-ref` pass computes everything; the result is reused until
+    `refs_signature` changes.
+    """
+    signature = refs_signature(repo) if use_cache else None
+    with _cache_lock:
+        cached = _tracking_cache.get(repo)
+    if signature is not None and cached and cached[0] == signature:
+        return 0, cached[1], ""
+    code, out, err = run_git(
+        [
+            "for-each-ref",
+            "--format=%(refname:short)%00%(upstream:short)%00%(upstream:track)%00%(HEAD)",
+            "refs/heads",
+        ],
+        repo,
+    )
+    if code != 0:
+        return code, [], err
+    branches = parse_branch_tracking(out)
+    if signature is not None:
+        with _cache_lock:
+            _tracking_cache[repo] = (signature, branches)
+    return code, branches, err
+
+
+def format_branch_label(branch):
+    """Branch selector text, e.g. "main  \u21912 \u21933  (origin/main)"."""
+    label = branch["name"]
+    if branch["gone"]:
+        return f"{label}  (upstream gone)"
+    if not branch["upstream"]:
+        return label
+    counts = []
+    if branch["ahead"]:
+        counts.append(f"\u2191{branch['ahead']}")
+    if branch["behind"]:
+        counts.append(f"\u2193{branch['behind']}")
+    state = " ".join(counts) or "\u2713"
+    return f"{label}  {state}  ({branch['upstream']})"
+
+
+def parse_status_v2(output):
+    """Parse `git status --porcelain=v2 --branch` into a summary dict."""
+    info = {
+        "branch": "",
+        "upstream": "",
+        "ahead": 0,
+        "behind": 0,
+        "staged": 0,
+        "unstaged": 0,
+        "untracked": 0,
+        "conflicts": 0,
+    }
+    for line in output.splitlines():
+        if line.startswith("# branch.head "):
+            info["branch"] = line[len("# branch.head ") :]
+        elif line.startswith("# branch.upstream "):
+            info["upstream"] = line[len("# branch.upstream ") :]
+        elif line.startswith("# branch.ab "):
+            ahead, behind = line[len("# branch.ab ") :].split()
+            info["ahead"] = int(ahead)
+            info["behind"] = -int(behind)
+        elif line.startswith(("1 ", "2 ")):
+            xy = line[2:4]
+            if xy[0] != ".":
+                info["staged"] += 1
+            if xy[1] != ".":
+                info["unstaged"] += 1
+        elif line.startswith("u "):
+            info["conflicts"] += 1
+        elif line.startswith("? "):
+            info["untracked"] += 1
+    return info
+
+
+def repo_status(repo):
+    """Branch, upstream, ahead/behind and change counts from one git call."""
+    code, out, err = run_git(["status", "--porcelain=v2", "--branch"], repo)
+    if code != 0:
+        return code, {}, err
+    return code, parse_status_v2(out), err
+
+
 def derive_repo_name(url):
     base = url.rstrip("/").split("/")[-1]
     if base.endswith(".git"):
@@ -48,8 +402,25 @@ def ssh_key_status():
 
 
 __all__ = [
+    "CANCELLED",
     "run_git",
+    "stream_git",
+    "stream_pipe",
     "is_git_repo",
+    "commit_context",
+    "change_stats",
+    "history_text",
+    "diff_summary",
+    "list_branches",
+    "list_remote_branches",
+    "git_dirs",
+    "refs_signature",
+    "last_fetch_time",
+    "parse_branch_tracking",
+    "branch_tracking",
+    "format_branch_label",
+    "parse_status_v2",
+    "repo_status",
     "derive_repo_name",
     "read_git_config",
     "ssh_key_status",
@@ -1,39 +1,68 @@
 #!/usr/bin/env python3
 """Simple Git GUI using Tkinter."""
 
-import json
+import argparse
 import os
-import queue
+import re
+import sqlite3
+import subprocess
+import sys
 import threading
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
+from tkinter import font as tkfont
 
+from commit_draft import draft_commit_message, parse_raw_numstat
 from git_ops import (
+    CANCELLED,
+    branch_tracking,
+    change_stats,
+    commit_context,
     derive_repo_name,
+    diff_summary,
+    format_branch_label,
+    history_text,
     is_git_repo,
+    last_fetch_time,
+    list_remote_branches,
     read_git_config,
-    run_git,
     ssh_key_status,
 )
 from openrouter import (
     CRYPTO_AVAILABLE,
     REQUESTS_AVAILABLE,
-    InvalidToken,
-    decrypt_api_key,
-    encrypt_api_key,
+    KeyStore,
+    calibrate_kdf,
     openrouter_request,
 )
+from output_log import OutputLog
 from prompt_builder import build_commit_prompt
-from storage import load_list, load_profiles, save_list, save_profiles
-
-FAVORITES_PATH = os.path.expanduser("~/.cindergrace_git_gui_favorites.json")
-PROFILES_PATH = os.path.expanduser("~/.cindergrace_git_gui_profiles.json")
-OPENROUTER_CONFIG_PATH = os.path.expanduser("~/.cindergrace_git_gui_openrouter.json")
+from storage import MAINTENANCE_ENABLED_SETTING, OPENROUTER_KEY_SETTING, open_state_store
+from telemetry import TELEMETRY
+from ui_dispatch import Dispatcher
+
+OPENROUTER_KDF_SETTING = "openrouter_kdf"
+OUTPUT_LOG_PATH = os.path.expanduser("~/.cindergrace_git_gui_output.log")
+KEY_IDLE_CHECK_MS = 30_000
+AI_WAIT_SETTING = "ai_suggestion_wait_seconds"
+DEFAULT_AI_WAIT_SECONDS = 8.0
+CONFLICT_COMMANDS = {"rebase", "merge", "pull", "stash", "cherry-pick", "revert"}
+MAINTENANCE_CHECK_MS = 60_000
+MAINTENANCE_IDLE_SECONDS = 120
+MAINTENANCE_JOIN_SECONDS = 10
+MAINTENANCE_CLOSE_POLL_MS = 50
+BLAME_GUTTER = 35
+BLAME_RECENT_COMMITS = 5
+DISPATCH_PROBES = 50
 
 
 class GitGui(tk.Tk):
-    def __init__(self):
+    def __init__(self, profile_startup=False, dispatch_mode="event"):
+        self.startup_marks = [("start", time.perf_counter())]
+        self.profile_startup = profile_startup
         super().__init__()
+        self._mark_startup("tk init")
         self.title("Cindergrace Git GUI")
         self.geometry("1160x1080")
         self.resizable(True, True)
@@ -41,6 +70,8 @@ class GitGui(tk.Tk):
         self.repo_path = tk.StringVar()
         self.status_var = tk.StringVar(value="Select a git repository.")
         self.branch_var = tk.StringVar()
+        self.branch_labels = {}
+        self.tracking_var = tk.StringVar()
         self.remote_var = tk.StringVar(value="origin")
         self.remote_branch_var = tk.StringVar()
         self.clone_url_var = tk.StringVar()
@@ -52,15 +83,125 @@ class GitGui(tk.Tk):
         self.commit_msg_var = tk.StringVar()
         self.openrouter_model_var = tk.StringVar(value="openai/gpt-4o-mini")
         self.openrouter_status_var = tk.StringVar(value="OpenRouter: not configured")
-        self.output_queue = queue.Queue()
+        self.ai_wait_var = tk.DoubleVar()
         self.busy = False
+        self.current_job = None
+        self.store = open_state_store()
+        self.ai_wait_var.set(self.store.get_setting(AI_WAIT_SETTING, DEFAULT_AI_WAIT_SECONDS))
         self.favorites = self._load_favorites()
         self.profiles = self._load_profiles()
-        self.openrouter_api_key: str | None = None
+        self.key_store = KeyStore()
+        self.key_idle_job = None
+        self.action_buttons = []
+        self.output_log = OutputLog(log_path=OUTPUT_LOG_PATH)
+        self.output_search_var = tk.StringVar()
+        self.output_render_job = None
+        self.output_top = 0
+        self.output_follow = True
+        self.output_linespace = None
+        self.profile_combo = None
+        self.maintenance_tree = None
+        self.maintenance_cancel = None
+        self.maintenance_thread = None
+        self.closing = False
+        self.maintenance_enabled_var = tk.BooleanVar(
+            value=bool(self.store.get_setting(MAINTENANCE_ENABLED_SETTING, False))
+        )
+        self.last_input = time.monotonic()
+        self._mark_startup("state load")
 
         self._build_ui()
-        self._poll_output()
+        self._mark_startup("build ui")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.bind("<FocusIn>", self._on_focus_in)
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>"):
+            self.bind_all(sequence, self._on_user_input, add="+")
+        self.dispatcher = Dispatcher(self, mode=dispatch_mode)
+        self.after(MAINTENANCE_CHECK_MS, self._maintenance_tick)
         self._refresh_openrouter_status()
+        self.after_idle(self._on_first_paint)
+
+    def _mark_startup(self, label):
+        self.startup_marks.append((label, time.perf_counter()))
+
+    def _on_first_paint(self):
+        self.update_idletasks()
+        self._mark_startup("first paint")
+        if not self.profile_startup:
+            return
+        previous = self.startup_marks[0][1]
+        for label, stamp in self.startup_marks[1:]:
+            print(f"{label:<14} {(stamp - previous) * 1000:8.1f} ms")
+            previous = stamp
+        total = self.startup_marks[-1][1] - self.startup_marks[0][1]
+        print(f"{'window total':<14} {total * 1000:8.1f} ms", flush=True)
+        self.destroy()
+
+    def measure_dispatch(self, seconds):
+        """Print idle CPU/wakeups over `seconds`, then completion latency, then exit."""
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        wakeups_start = self.dispatcher.wakeups
+
+        def report():
+            stats = self.dispatcher.stats()
+            print(
+                f"completion latency ({DISPATCH_PROBES} results): "
+                f"p50={stats['latency_p50_ms']:.2f} ms p95={stats['latency_p95_ms']:.2f} ms "
+                f"max={stats['latency_max_ms']:.2f} ms",
+                flush=True,
+            )
+            self.destroy()
+
+        def probe():
+            for _ in range(DISPATCH_PROBES):
+                time.sleep(0.02)
+                self.dispatcher.post(lambda: None)
+            self.dispatcher.post(report)
+
+        def finish_idle():
+            wall = time.perf_counter() - wall_start
+            idle_cpu = (time.process_time() - cpu_start) / wall * 100
+            wakeups = (self.dispatcher.wakeups - wakeups_start) / wall
+            print(
+                f"dispatch={self.dispatcher.mode} idle: cpu={idle_cpu:.2f}% "
+                f"wakeups={wakeups:.1f}/s over {wall:.1f} s",
+                flush=True,
+            )
+            self.dispatcher.latencies.clear()
+            threading.Thread(target=probe, daemon=True).start()
+
+        self.after(int(seconds * 1000), finish_idle)
+
+    def _register_buttons(self, *buttons):
+        # Buttons disabled while a git job runs; lazy panels register on build.
+        state = tk.DISABLED if self.busy else tk.NORMAL
+        for btn in buttons:
+            btn.configure(state=state)
+            self.action_buttons.append(btn)
+
+    def _add_lazy_panel(self, title, builder):
+        """Pack a collapsed section whose widgets are built on first expand."""
+        container = ttk.Frame(self, padding=(10, 2))
+        container.pack(fill=tk.X)
+        body = ttk.Frame(container)
+        toggle = ttk.Button(container, text=f"\u25b8 {title}")
+        toggle.pack(anchor="w")
+        built = expanded = False
+
+        def on_toggle():
+            nonlocal built, expanded
+            if not built:
+                builder(body)
+                built = True
+            expanded = not expanded
+            if expanded:
+                body.pack(fill=tk.X)
+                toggle.configure(text=f"\u25be {title}")
+            else:
+                body.pack_forget()
+                toggle.configure(text=f"\u25b8 {title}")
+
+        toggle.configure(command=on_toggle)
 
     def _build_ui(self):
         top_frame = ttk.Frame(self, padding=10)
@@ -91,34 +232,9 @@ class GitGui(tk.Tk):
         self.load_fav_btn.pack(side=tk.LEFT, padx=4)
         self.add_fav_btn.pack(side=tk.LEFT, padx=4)
         self.remove_fav_btn.pack(side=tk.LEFT, padx=4)
+        self._register_buttons(self.load_fav_btn, self.add_fav_btn, self.remove_fav_btn)
 
-        profile_frame = ttk.Frame(self, padding=10)
-        profile_frame.pack(fill=tk.X)
-        ttk.Label(profile_frame, text="Profiles:").pack(side=tk.LEFT)
-        self.profile_combo = ttk.Combobox(
-            profile_frame,
-            textvariable=self.profile_var,
-            values=sorted(self.profiles.keys()),
-            state="readonly",
-        )
-        self.profile_combo.pack(side=tk.LEFT, padx=6, fill=tk.X, expand=True)
-        self.profile_load_btn = ttk.Button(profile_frame, text="Load", command=self._load_profile)
-        self.profile_delete_btn = ttk.Button(
-            profile_frame, text="Delete", command=self._delete_profile
-        )
-        self.profile_load_btn.pack(side=tk.LEFT, padx=4)
-        self.profile_delete_btn.pack(side=tk.LEFT, padx=4)
-
-        profile_save_frame = ttk.Frame(self, padding=10)
-        profile_save_frame.pack(fill=tk.X)
-        ttk.Label(profile_save_frame, text="Profile Name:").pack(side=tk.LEFT)
-        ttk.Entry(profile_save_frame, textvariable=self.profile_name_var, width=30).pack(
-            side=tk.LEFT, padx=6
-        )
-        self.profile_save_btn = ttk.Button(
-            profile_save_frame, text="Save/Update", command=self._save_profile
-        )
-        self.profile_save_btn.pack(side=tk.LEFT, padx=4)
+        self._add_lazy_panel("Profiles", self._build_profiles_panel)
 
         action_frame = ttk.Frame(self, padding=10)
         action_frame.pack(fill=tk.X)
@@ -131,11 +247,16 @@ class GitGui(tk.Tk):
         self.rebase_btn = ttk.Button(action_frame, text="Rebase", command=self._rebase)
         self.stash_btn = ttk.Button(action_frame, text="Stash", command=self._stash)
         self.stash_pop_btn = ttk.Button(action_frame, text="Stash Pop", command=self._stash_pop)
+        self.stashes_btn = ttk.Button(action_frame, text="Stashes...", command=self._show_stashes)
+        self.conflicts_btn = ttk.Button(
+            action_frame, text="Conflicts...", command=self._open_conflicts
+        )
         self.branches_btn = ttk.Button(
             action_frame, text="Refresh Branches", command=self._refresh_branches
         )
         self.checkout_btn = ttk.Button(action_frame, text="Checkout", command=self._checkout_branch)
         self.auth_btn = ttk.Button(action_frame, text="Auth Check", command=self._auth_check)
+        self.size_btn = ttk.Button(action_frame, text="Repo Size...", command=self._show_repo_size)
 
         for btn in [
             self.status_btn,
@@ -146,11 +267,15 @@ class GitGui(tk.Tk):
             self.rebase_btn,
             self.stash_btn,
             self.stash_pop_btn,
+            self.stashes_btn,
+            self.conflicts_btn,
             self.branches_btn,
             self.checkout_btn,
             self.auth_btn,
+            self.size_btn,
         ]:
             btn.pack(side=tk.LEFT, padx=4)
+            self._register_buttons(btn)
 
         branch_frame = ttk.Frame(self, padding=10)
         branch_frame.pack(fill=tk.X)
@@ -161,6 +286,7 @@ class GitGui(tk.Tk):
         self.branch_combo.pack(side=tk.LEFT, padx=6, fill=tk.X, expand=True)
         ttk.Label(branch_frame, text="Remote:").pack(side=tk.LEFT, padx=6)
         ttk.Entry(branch_frame, textvariable=self.remote_var, width=12).pack(side=tk.LEFT)
+        ttk.Label(branch_frame, textvariable=self.tracking_var).pack(side=tk.LEFT, padx=6)
 
         remote_frame = ttk.Frame(self, padding=10)
         remote_frame.pack(fill=tk.X)
@@ -178,6 +304,7 @@ class GitGui(tk.Tk):
             command=self._checkout_remote_branch,
         )
         self.checkout_remote_btn.pack(side=tk.LEFT, padx=4)
+        self._register_buttons(self.checkout_remote_btn)
 
         branch_manage_frame = ttk.Frame(self, padding=10)
         branch_manage_frame.pack(fill=tk.X)
@@ -193,6 +320,7 @@ class GitGui(tk.Tk):
         )
         self.create_branch_btn.pack(side=tk.LEFT, padx=4)
         self.delete_branch_btn.pack(side=tk.LEFT, padx=4)
+        self._register_buttons(self.create_branch_btn, self.delete_branch_btn)
 
         commit_frame = ttk.Frame(self, padding=10)
         commit_frame.pack(fill=tk.X)
@@ -200,71 +328,49 @@ class GitGui(tk.Tk):
         ttk.Entry(commit_frame, textvariable=self.commit_msg_var, width=50).pack(
             side=tk.LEFT, padx=6, fill=tk.X, expand=True
         )
+        self.draft_btn = ttk.Button(commit_frame, text="Draft", command=self._draft_commit_message)
         self.stage_btn = ttk.Button(commit_frame, text="Stage All", command=self._stage_all)
         self.commit_btn = ttk.Button(commit_frame, text="Commit", command=self._commit)
+        self.draft_btn.pack(side=tk.LEFT, padx=4)
         self.stage_btn.pack(side=tk.LEFT, padx=4)
         self.commit_btn.pack(side=tk.LEFT, padx=4)
+        self._register_buttons(self.draft_btn, self.stage_btn, self.commit_btn)
 
-        openrouter_frame = ttk.LabelFrame(self, text="OpenRouter Commit Helper", padding=10)
-        openrouter_frame.pack(fill=tk.X, padx=10, pady=6)
-        ttk.Label(openrouter_frame, text="Model:").grid(row=0, column=0, sticky="w")
-        ttk.Entry(openrouter_frame, textvariable=self.openrouter_model_var, width=40).grid(
-            row=0, column=1, sticky="w", padx=6
-        )
-        self.openrouter_status_label = ttk.Label(
-            openrouter_frame, textvariable=self.openrouter_status_var
-        )
-        self.openrouter_status_label.grid(row=0, column=2, sticky="w", padx=6)
-
-        self.openrouter_set_btn = ttk.Button(
-            openrouter_frame, text="Set API Key", command=self._set_openrouter_key
-        )
-        self.openrouter_unlock_btn = ttk.Button(
-            openrouter_frame, text="Unlock Key", command=self._unlock_openrouter_key
-        )
-        self.openrouter_test_btn = ttk.Button(
-            openrouter_frame, text="Test", command=self._test_openrouter
-        )
-        self.openrouter_suggest_btn = ttk.Button(
-            openrouter_frame,
-            text="Suggest Commit Message",
-            command=self._suggest_commit_message,
-        )
-        self.openrouter_set_btn.grid(row=1, column=0, pady=4, sticky="w")
-        self.openrouter_unlock_btn.grid(row=1, column=1, pady=4, sticky="w")
-        self.openrouter_test_btn.grid(row=1, column=2, pady=4, sticky="w")
-        self.openrouter_suggest_btn.grid(row=1, column=3, pady=4, sticky="w")
-        openrouter_frame.columnconfigure(3, weight=1)
-
-        clone_frame = ttk.Frame(self, padding=10)
-        clone_frame.pack(fill=tk.X)
-        ttk.Label(clone_frame, text="Clone URL:").grid(row=0, column=0, sticky="w")
-        ttk.Entry(clone_frame, textvariable=self.clone_url_var, width=60).grid(
-            row=0, column=1, padx=6, sticky="ew"
-        )
-        ttk.Label(clone_frame, text="Destination:").grid(row=1, column=0, sticky="w")
-        ttk.Entry(clone_frame, textvariable=self.clone_dest_var, width=60).grid(
-            row=1, column=1, padx=6, sticky="ew"
-        )
-        ttk.Button(clone_frame, text="Browse", command=self._browse_clone_dest).grid(
-            row=1, column=2, padx=4
-        )
-        self.clone_btn = ttk.Button(clone_frame, text="Clone", command=self._clone_repo)
-        self.clone_btn.grid(row=0, column=2, padx=4)
-        clone_frame.columnconfigure(1, weight=1)
+        self._add_lazy_panel("OpenRouter Commit Helper", self._build_openrouter_panel)
+        self._add_lazy_panel("Clone", self._build_clone_panel)
+        self._add_lazy_panel("Performance", self._build_performance_panel)
+        self._add_lazy_panel("Maintenance", self._build_maintenance_panel)
 
         status_frame = ttk.Frame(self, padding=10)
         status_frame.pack(fill=tk.X)
         ttk.Label(status_frame, textvariable=self.status_var).pack(side=tk.LEFT)
+        self.cancel_job_btn = ttk.Button(
+            status_frame, text="Cancel", command=self._cancel_job, state=tk.DISABLED
+        )
+        self.cancel_job_btn.pack(side=tk.RIGHT)
 
         output_frame = ttk.Frame(self, padding=10)
         output_frame.pack(fill=tk.BOTH, expand=True)
+        output_header = ttk.Frame(output_frame)
+        output_header.pack(fill=tk.X)
+        ttk.Label(output_header, text="Output").pack(side=tk.LEFT)
+        search_entry = ttk.Entry(output_header, textvariable=self.output_search_var, width=30)
+        search_entry.pack(side=tk.RIGHT)
+        search_entry.bind("<Return>", lambda _event: self._search_output())
+        ttk.Button(output_header, text="Search Output", command=self._search_output).pack(
+            side=tk.RIGHT, padx=6
+        )
 
+        # Only the visible rows of the ring buffer are rendered; the scrollbar
+        # is driven by the buffer position, not by the Text widget.
         self.output_text = tk.Text(output_frame, wrap=tk.WORD, height=12)
         self.output_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar = ttk.Scrollbar(output_frame, command=self.output_text.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.output_text.configure(yscrollcommand=scrollbar.set)
+        self.output_scroll = ttk.Scrollbar(output_frame, command=self._scroll_output)
+        self.output_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.output_text.bind("<Configure>", lambda _event: self._schedule_output_render())
+        self.output_text.bind("<MouseWheel>", self._on_output_wheel)
+        self.output_text.bind("<Button-4>", self._on_output_wheel)
+        self.output_text.bind("<Button-5>", self._on_output_wheel)
 
         history_frame = ttk.Frame(self, padding=10)
         history_frame.pack(fill=tk.BOTH, expand=True)
@@ -275,11 +381,22 @@ class GitGui(tk.Tk):
             history_header, text="Refresh History", command=self._refresh_history
         )
         self.refresh_history_btn.pack(side=tk.LEFT, padx=6)
+        self._register_buttons(self.refresh_history_btn)
+        ttk.Button(history_header, text="Blame...", command=self._blame_from_history).pack(
+            side=tk.LEFT
+        )
+        ttk.Button(history_header, text="File History...", command=self._file_history).pack(
+            side=tk.LEFT, padx=6
+        )
+        ttk.Button(history_header, text="Reword Range...", command=self._show_reword).pack(
+            side=tk.LEFT
+        )
         self.history_text = tk.Text(history_frame, wrap=tk.WORD, height=10)
         self.history_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         history_scroll = ttk.Scrollbar(history_frame, command=self.history_text.yview)
         history_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         self.history_text.configure(yscrollcommand=history_scroll.set)
+        self.history_text.bind("<Double-Button-1>", lambda _event: self._blame_from_history())
 
         diff_frame = ttk.Frame(self, padding=10)
         diff_frame.pack(fill=tk.BOTH, expand=True)
@@ -290,11 +407,14 @@ class GitGui(tk.Tk):
             diff_header, text="Refresh Diff", command=self._refresh_diff
         )
         self.refresh_diff_btn.pack(side=tk.LEFT, padx=6)
+        self._register_buttons(self.refresh_diff_btn)
+        ttk.Button(diff_header, text="Blame", command=self._blame_from_diff).pack(side=tk.LEFT)
         self.diff_text = tk.Text(diff_frame, wrap=tk.WORD, height=10)
         self.diff_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         diff_scroll = ttk.Scrollbar(diff_frame, command=self.diff_text.yview)
         diff_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         self.diff_text.configure(yscrollcommand=diff_scroll.set)
+        self.diff_text.bind("<Double-Button-1>", lambda _event: self._blame_from_diff())
 
         note_frame = ttk.Frame(self, padding=10)
         note_frame.pack(fill=tk.X)
@@ -305,46 +425,362 @@ class GitGui(tk.Tk):
             ),
         ).pack(side=tk.LEFT)
 
-    def _set_busy(self, busy, message=None):
-        self.busy = busy
-        for btn in [
-            self.status_btn,
-            self.pull_btn,
-            self.push_btn,
-            self.log_btn,
-            self.fetch_btn,
-            self.rebase_btn,
-            self.stash_btn,
-            self.stash_pop_btn,
-            self.branches_btn,
-            self.checkout_btn,
-            self.checkout_remote_btn,
-            self.create_branch_btn,
-            self.delete_branch_btn,
-            self.stage_btn,
-            self.commit_btn,
-            self.clone_btn,
-            self.load_fav_btn,
-            self.add_fav_btn,
-            self.remove_fav_btn,
-            self.profile_load_btn,
-            self.profile_delete_btn,
-            self.profile_save_btn,
-            self.auth_btn,
-            self.refresh_history_btn,
-            self.refresh_diff_btn,
+    def _build_profiles_panel(self, parent):
+        profile_frame = ttk.Frame(parent, padding=(0, 4))
+        profile_frame.pack(fill=tk.X)
+        ttk.Label(profile_frame, text="Profiles:").pack(side=tk.LEFT)
+        self.profile_combo = ttk.Combobox(
+            profile_frame,
+            textvariable=self.profile_var,
+            values=sorted(self.profiles.keys()),
+            state="readonly",
+        )
+        self.profile_combo.pack(side=tk.LEFT, padx=6, fill=tk.X, expand=True)
+        self.profile_load_btn = ttk.Button(profile_frame, text="Load", command=self._load_profile)
+        self.profile_delete_btn = ttk.Button(
+            profile_frame, text="Delete", command=self._delete_profile
+        )
+        self.profile_load_btn.pack(side=tk.LEFT, padx=4)
+        self.profile_delete_btn.pack(side=tk.LEFT, padx=4)
+
+        profile_save_frame = ttk.Frame(parent, padding=(0, 4))
+        profile_save_frame.pack(fill=tk.X)
+        ttk.Label(profile_save_frame, text="Profile Name:").pack(side=tk.LEFT)
+        ttk.Entry(profile_save_frame, textvariable=self.profile_name_var, width=30).pack(
+            side=tk.LEFT, padx=6
+        )
+        self.profile_save_btn = ttk.Button(
+            profile_save_frame, text="Save/Update", command=self._save_profile
+        )
+        self.profile_save_btn.pack(side=tk.LEFT, padx=4)
+        self._register_buttons(
+            self.profile_load_btn, self.profile_delete_btn, self.profile_save_btn
+        )
+
+    def _build_openrouter_panel(self, parent):
+        openrouter_frame = ttk.Frame(parent, padding=(0, 4))
+        openrouter_frame.pack(fill=tk.X)
+        ttk.Label(openrouter_frame, text="Model:").grid(row=0, column=0, sticky="w")
+        ttk.Entry(openrouter_frame, textvariable=self.openrouter_model_var, width=40).grid(
+            row=0, column=1, sticky="w", padx=6
+        )
+        self.openrouter_status_label = ttk.Label(
+            openrouter_frame, textvariable=self.openrouter_status_var
+        )
+        self.openrouter_status_label.grid(row=0, column=2, sticky="w", padx=6)
+
+        self.openrouter_set_btn = ttk.Button(
+            openrouter_frame, text="Set API Key", command=self._set_openrouter_key
+        )
+        self.openrouter_unlock_btn = ttk.Button(
+            openrouter_frame, text="Unlock Key", command=self._unlock_openrouter_key
+        )
+        self.openrouter_lock_btn = ttk.Button(
+            openrouter_frame, text="Lock Key", command=self._lock_openrouter_key
+        )
+        self.openrouter_test_btn = ttk.Button(
+            openrouter_frame, text="Test", command=self._test_openrouter
+        )
+        self.openrouter_suggest_btn = ttk.Button(
+            openrouter_frame,
+            text="Suggest Commit Message",
+            command=self._suggest_commit_message,
+        )
+        self.openrouter_set_btn.grid(row=1, column=0, pady=4, sticky="w")
+        self.openrouter_unlock_btn.grid(row=1, column=1, pady=4, sticky="w")
+        self.openrouter_lock_btn.grid(row=1, column=2, pady=4, sticky="w")
+        self.openrouter_test_btn.grid(row=1, column=3, pady=4, sticky="w")
+        self.openrouter_suggest_btn.grid(row=1, column=4, pady=4, sticky="w")
+        ttk.Label(openrouter_frame, text="AI may replace the draft within (s):").grid(
+            row=2, column=0, columnspan=2, sticky="w"
+        )
+        ai_wait = ttk.Spinbox(
+            openrouter_frame,
+            from_=0,
+            to=120,
+            increment=1,
+            width=6,
+            textvariable=self.ai_wait_var,
+            command=self._save_ai_wait,
+        )
+        ai_wait.grid(row=2, column=2, sticky="w")
+        ai_wait.bind("<FocusOut>", lambda _event: self._save_ai_wait())
+        openrouter_frame.columnconfigure(4, weight=1)
+        self._register_buttons(
             self.openrouter_set_btn,
             self.openrouter_unlock_btn,
+            self.openrouter_lock_btn,
             self.openrouter_test_btn,
             self.openrouter_suggest_btn,
-        ]:
+        )
+
+    def _build_clone_panel(self, parent):
+        clone_frame = ttk.Frame(parent, padding=(0, 4))
+        clone_frame.pack(fill=tk.X)
+        ttk.Label(clone_frame, text="Clone URL:").grid(row=0, column=0, sticky="w")
+        ttk.Entry(clone_frame, textvariable=self.clone_url_var, width=60).grid(
+            row=0, column=1, padx=6, sticky="ew"
+        )
+        ttk.Label(clone_frame, text="Destination:").grid(row=1, column=0, sticky="w")
+        ttk.Entry(clone_frame, textvariable=self.clone_dest_var, width=60).grid(
+            row=1, column=1, padx=6, sticky="ew"
+        )
+        ttk.Button(clone_frame, text="Browse", command=self._browse_clone_dest).grid(
+            row=1, column=2, padx=4
+        )
+        self.clone_btn = ttk.Button(clone_frame, text="Clone", command=self._clone_repo)
+        self.clone_btn.grid(row=0, column=2, padx=4)
+        clone_frame.columnconfigure(1, weight=1)
+        self._register_buttons(self.clone_btn)
+
+    def _build_performance_panel(self, parent):
+        header = ttk.Frame(parent, padding=(0, 4))
+        header.pack(fill=tk.X)
+        ttk.Button(header, text="Refresh", command=self._refresh_performance).pack(side=tk.LEFT)
+        ttk.Button(header, text="Reset", command=self._reset_performance).pack(side=tk.LEFT, padx=4)
+        ttk.Button(
+            header, text="Export JSON", command=lambda: self._export_performance("json")
+        ).pack(side=tk.LEFT, padx=4)
+        ttk.Button(
+            header, text="Export Chrome Trace", command=lambda: self._export_performance("chrome")
+        ).pack(side=tk.LEFT, padx=4)
+
+        columns = [
+            ("command", "Command", 160),
+            ("count", "Count", 60),
+            ("failures", "Failed", 60),
+            ("p50_ms", "p50 ms", 80),
+            ("p95_ms", "p95 ms", 80),
+            ("p99_ms", "p99 ms", 80),
+            ("max_ms", "max ms", 80),
+            ("spawn_avg_ms", "spawn ms", 80),
+            ("bytes_out", "bytes out", 100),
+        ]
+        self.performance_tree = ttk.Treeview(
+            parent, columns=[key for key, _, _ in columns], show="headings", height=8
+        )
+        for key, title, width in columns:
+            anchor = tk.W if key == "command" else tk.E
+            self.performance_tree.heading(key, text=title)
+            self.performance_tree.column(key, width=width, anchor=anchor)
+        self.performance_tree.pack(fill=tk.X)
+        self._refresh_performance()
+
+    def _refresh_performance(self):
+        tree = self.performance_tree
+        tree.delete(*tree.get_children())
+        for row in TELEMETRY.summary():
+            values = []
+            for key in tree["columns"]:
+                value = row[key]
+                values.append(f"{value:.1f}" if isinstance(value, float) else value)
+            tree.insert("", tk.END, values=values)
+
+    def _reset_performance(self):
+        TELEMETRY.reset()
+        self._refresh_performance()
+
+    def _export_performance(self, fmt):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile="git-trace.json" if fmt == "chrome" else "git-telemetry.json",
+            filetypes=[("JSON", "*.json")],
+        )
+        if not path:
+            return
+        try:
+            TELEMETRY.export(path, fmt)
+        except OSError as exc:
+            messagebox.showerror("Error", f"Failed to export: {exc}")
+            return
+        self.status_var.set(f"Exported {path}")
+
+    def _build_maintenance_panel(self, parent):
+        from maintenance import PROBES, last_reports
+
+        controls = ttk.Frame(parent)
+        controls.pack(fill=tk.X)
+        ttk.Checkbutton(
+            controls,
+            text="Maintain favorites and profiles when idle (low priority)",
+            variable=self.maintenance_enabled_var,
+            command=self._toggle_maintenance,
+        ).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Run Now (current repo)", command=self._run_maintenance_now).pack(
+            side=tk.LEFT, padx=6
+        )
+        columns = [
+            ("repo", "Repository", 220),
+            ("task", "Task", 130),
+            ("result", "Result", 70),
+            ("seconds", "Took s", 70),
+            *[(probe, f"{probe} ms", 110) for probe in PROBES],
+            ("cut", "Latency cut", 90),
+        ]
+        self.maintenance_tree = ttk.Treeview(
+            parent, columns=[key for key, _, _ in columns], show="headings", height=6
+        )
+        for key, title, width in columns:
+            anchor = tk.W if key in ("repo", "task") else tk.E
+            self.maintenance_tree.heading(key, text=title)
+            self.maintenance_tree.column(key, width=width, anchor=anchor)
+        self.maintenance_tree.pack(fill=tk.X)
+        for repo in self._maintenance_repos():
+            for report in last_reports(self.store, repo):
+                self._show_maintenance_report(report)
+
+    def _show_maintenance_report(self, report):
+        from maintenance import PROBES, latency_cut
+
+        if self.maintenance_tree is None:
+            return
+        values = [
+            os.path.basename(report["repo"]) or report["repo"],
+            report["task"],
+            "ok" if report["ok"] else "failed",
+            f"{report['seconds']:.1f}",
+            *[f"{report['before'][probe]:.0f} -> {report['after'][probe]:.0f}" for probe in PROBES],
+            f"{latency_cut(report):.0f}%",
+        ]
+        self.maintenance_tree.insert("", 0, values=values)
+
+    def _maintenance_repos(self):
+        repos = list(self.favorites)
+        repos += [profile.get("path", "") for profile in self.profiles.values()]
+        return list(dict.fromkeys(repo for repo in repos if repo and os.path.isdir(repo)))
+
+    def _toggle_maintenance(self):
+        enabled = self.maintenance_enabled_var.get()
+        self.store.set_setting(MAINTENANCE_ENABLED_SETTING, enabled)
+        if not enabled and self.maintenance_cancel is not None:
+            self.maintenance_cancel.set()
+
+    def _on_user_input(self, _event=None):
+        self.last_input = time.monotonic()
+
+    def _is_idle(self):
+        return not self.busy and time.monotonic() - self.last_input >= MAINTENANCE_IDLE_SECONDS
+
+    def _maintenance_tick(self):
+        self.after(MAINTENANCE_CHECK_MS, self._maintenance_tick)
+        if self.maintenance_enabled_var.get() and self._is_idle():
+            self._start_maintenance(self._maintenance_repos(), force=False)
+
+    def _run_maintenance_now(self):
+        repo = self._ensure_repo()
+        if repo:
+            self._start_maintenance([repo], force=True)
+
+    def _start_maintenance(self, repos, force):
+        from maintenance import run_maintenance
+
+        if self.maintenance_cancel is not None or not repos:
+            return
+        cancel = self.maintenance_cancel = threading.Event()
+        # Scheduled runs stop between tasks once the user is back; "Run Now" does not.
+        should_continue = None if force else self._is_idle
+
+        def done(count):
+            self.maintenance_cancel = None
+            if count:
+                self.status_var.set(f"Maintenance finished {count} task(s).")
+
+        def worker():
+            reports = run_maintenance(
+                self.store,
+                repos,
+                cancel,
+                should_continue,
+                lambda report: self.dispatcher.post(self._show_maintenance_report, report),
+                force=force,
+            )
+            self.dispatcher.post(done, len(reports))
+
+        self.status_var.set("Running repository maintenance in the background...")
+        self.maintenance_thread = threading.Thread(target=worker, daemon=True)
+        self.maintenance_thread.start()
+
+    def _set_busy(self, busy, message=None):
+        self.busy = busy
+        for btn in self.action_buttons:
             btn.configure(state=(tk.DISABLED if busy else tk.NORMAL))
+        cancellable = busy and self.current_job is not None
+        self.cancel_job_btn.configure(state=(tk.NORMAL if cancellable else tk.DISABLED))
         if message is not None:
             self.status_var.set(message)
 
     def _append_output(self, text):
-        self.output_text.insert(tk.END, text + "\n")
-        self.output_text.see(tk.END)
+        self.output_log.append(text)
+        self._schedule_output_render()
+
+    def _schedule_output_render(self):
+        # All appends in one event-loop turn are drawn with a single render.
+        if self.output_render_job is None:
+            self.output_render_job = self.after_idle(self._render_output)
+
+    def _output_rows(self):
+        height = self.output_text.winfo_height()
+        if height <= 1:
+            return int(self.output_text.cget("height"))
+        if self.output_linespace is None:
+            font = tkfont.nametofont(self.output_text.cget("font"))
+            self.output_linespace = max(1, font.metrics("linespace"))
+        return max(1, height // self.output_linespace)
+
+    def _render_output(self):
+        self.output_render_job = None
+        log = self.output_log
+        rows = self._output_rows()
+        last_top = max(log.start, log.end - rows)
+        if self.output_follow:
+            self.output_top = last_top
+        self.output_top = min(max(self.output_top, log.start), last_top)
+        lines = log.slice(self.output_top, self.output_top + rows)
+        self.output_text.delete("1.0", tk.END)
+        self.output_text.insert("1.0", "\n".join(lines))
+        if self.output_follow:
+            self.output_text.see(tk.END)
+        total = max(1, len(log))
+        first = (self.output_top - log.start) / total
+        self.output_scroll.set(first, min(1.0, first + rows / total))
+
+    def _scroll_output(self, action, amount, unit=None):
+        log = self.output_log
+        rows = self._output_rows()
+        if action == "moveto":
+            top = log.start + int(float(amount) * len(log))
+        else:
+            step = rows if unit == "pages" else 1
+            top = self.output_top + int(amount) * step
+        last_top = max(log.start, log.end - rows)
+        self.output_top = min(max(top, log.start), last_top)
+        self.output_follow = self.output_top >= last_top
+        self._schedule_output_render()
+
+    def _on_output_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._scroll_output("scroll", -3, "units")
+        else:
+            self._scroll_output("scroll", 3, "units")
+        return "break"
+
+    def _search_output(self):
+        needle = self.output_search_var.get().strip()
+        if not needle:
+            return
+        matches = self.output_log.search(needle)
+        window = tk.Toplevel(self)
+        window.title(f"Output search: {needle}")
+        text = tk.Text(window, wrap=tk.NONE, width=120, height=30)
+        scroll = ttk.Scrollbar(window, command=text.yview)
+        text.configure(yscrollcommand=scroll.set)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        for source, number, line in matches:
+            label = "output" if source == "memory" else os.path.basename(source)
+            text.insert(tk.END, f"{label}:{number}: {line}\n")
+        if not matches:
+            text.insert(tk.END, "No matches.")
 
     def _set_history(self, text):
         self.history_text.delete("1.0", tk.END)
@@ -393,28 +829,47 @@ class GitGui(tk.Tk):
     def _run_async_with_cwd(self, args, cwd, description):
         if self.busy:
             return
-        self._set_busy(True, f"Running: git {' '.join(args)}")
-
-        def worker():
-            code, out, err = run_git(args, cwd)
-            self.output_queue.put((description, args, code, out, err))
+        import git_async
 
-        threading.Thread(target=worker, daemon=True).start()
+        # Runs on the shared asyncio loop (no thread per job); Cancel kills git.
+        job = self.current_job = git_async.git_loop().submit(git_async.run_git(args, cwd))
+        self._set_busy(True, f"Running: git {' '.join(args)}")
 
-    def _poll_output(self):
-        try:
-            while True:
-                description, args, code, out, err = self.output_queue.get_nowait()
-                self._append_output(f"$ git {' '.join(args)}")
-                if out:
-                    self._append_output(out)
-                if err:
-                    self._append_output(err)
-                self._append_output(f"Exit code: {code}\n")
-                self._set_busy(False, f"Done: {description}")
-        except queue.Empty:
-            pass
-        self.after(200, self._poll_output)
+        def on_done(future):
+            if future.cancelled():
+                result = (CANCELLED, "", "Cancelled by user.")
+            elif future.exception() is not None:
+                # e.g. an unreadable cwd; the UI must still leave the busy state.
+                result = (1, "", str(future.exception()))
+            else:
+                result = future.result()
+            self.dispatcher.post(self._on_job_done, description, args, *result)
+
+        job.add_done_callback(on_done)
+
+    def _cancel_job(self):
+        if self.current_job is not None:
+            self.current_job.cancel()
+
+    def _on_job_done(self, description, args, code, out, err):
+        self.current_job = None
+        self._append_output(f"$ git {' '.join(args)}")
+        if out:
+            self._append_output(out)
+        if err:
+            self._append_output(err)
+        self._append_output(f"Exit code: {code}\n")
+        self._set_busy(False, f"Done: {description}")
+        # Cheap when refs are unchanged: tracking info is cached by refs signature.
+        repo = self.repo_path.get().strip()
+        if repo and os.path.isdir(repo):
+            self._update_branch_tracking(repo)
+            if code not in (0, CANCELLED) and args and args[0] in CONFLICT_COMMANDS:
+                from conflicts import unmerged_paths
+
+                _, conflicts, _ = unmerged_paths(repo)
+                if conflicts:
+                    self._show_conflicts(repo, conflicts)
 
     def _status(self):
         self._run_async(["status"], "status")
@@ -425,9 +880,18 @@ class GitGui(tk.Tk):
         self._run_async(["pull"], "pull")
 
     def _push(self):
-        if not messagebox.askyesno("Confirm", "Run git push?"):
+        from preview import push_command, push_preview
+
+        repo = self._ensure_repo()
+        if not repo:
             return
-        self._run_async(["push"], "push")
+        remote = self.remote_var.get().strip() or "origin"
+        self._show_preview(
+            "Push preview",
+            lambda cancel: push_preview(repo, remote, cancel),
+            "Push",
+            lambda: self._run_async_with_cwd(push_command(repo, remote), repo, "push"),
+        )
 
     def _log(self):
         self._run_async(["log", "--oneline", "-20"], "log")
@@ -438,17 +902,77 @@ class GitGui(tk.Tk):
         self._run_async(["fetch", "--all", "--prune"], "fetch")
 
     def _rebase(self):
-        if not messagebox.askyesno("Confirm", "Run git rebase onto <remote>/<branch>?"):
-            return
+        from preview import rebase_preview
+
         repo = self._ensure_repo()
         if not repo:
             return
-        branch = self.branch_var.get().strip()
+        branch = self._selected_branch()
         if not branch:
             messagebox.showerror("Missing branch", "Please select a branch.")
             return
         remote = self.remote_var.get().strip() or "origin"
-        self._run_async_with_cwd(["rebase", f"{remote}/{branch}"], repo, f"rebase {branch}")
+        onto = f"{remote}/{branch}"
+        self._show_preview(
+            f"Rebase onto {onto}",
+            lambda cancel: rebase_preview(repo, onto, cancel),
+            "Rebase",
+            lambda: self._run_async_with_cwd(["rebase", onto], repo, f"rebase {branch}"),
+        )
+
+    def _show_preview(self, title, make_steps, confirm_text, on_confirm):
+        """Confirm dialog filled section by section by a cancellable background job."""
+        from preview import PreviewCancelled
+
+        if self.busy:
+            return
+        cancel = threading.Event()
+        window = tk.Toplevel(self)
+        window.title(title)
+        text = tk.Text(window, wrap=tk.NONE, width=100, height=30)
+        scroll = ttk.Scrollbar(window, command=text.yview)
+        text.configure(yscrollcommand=scroll.set)
+        buttons = ttk.Frame(window, padding=6)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        progress = tk.StringVar(value="Computing preview...")
+        ttk.Label(buttons, textvariable=progress).pack(side=tk.LEFT)
+
+        def close():
+            cancel.set()
+            window.destroy()
+
+        def confirm():
+            close()
+            on_confirm()
+
+        ttk.Button(buttons, text="Cancel", command=close).pack(side=tk.RIGHT)
+        ttk.Button(buttons, text=confirm_text, command=confirm).pack(side=tk.RIGHT, padx=6)
+        window.protocol("WM_DELETE_WINDOW", close)
+
+        def show(section, body):
+            if not cancel.is_set():
+                text.insert(tk.END, f"{section}:\n{body}\n\n")
+
+        def finish(message):
+            if not cancel.is_set():
+                progress.set(message)
+
+        def worker():
+            try:
+                for section, body in make_steps(cancel):
+                    if cancel.is_set():
+                        return
+                    self.dispatcher.post(show, section, body)
+            except PreviewCancelled:
+                return
+            except Exception as exc:
+                self.dispatcher.post(finish, f"Preview failed: {exc}")
+                return
+            self.dispatcher.post(finish, "Preview complete.")
+
+        threading.Thread(target=worker, daemon=True).start()
 
     def _stash(self):
         if not messagebox.askyesno("Confirm", "Stash changes? (git stash push)"):
@@ -460,6 +984,541 @@ class GitGui(tk.Tk):
             return
         self._run_async(["stash", "pop"], "stash pop")
 
+    def _show_stashes(self):
+        """Stash browser: diffs load on selection, apply-cleanly checks run behind."""
+        from stash import apply_stash, check_all, drop_stash, list_stashes, stash_diff
+
+        repo = self._ensure_repo()
+        if not repo:
+            return
+        cancel = threading.Event()
+        window = tk.Toplevel(self)
+        window.title("Stashes")
+        panes = ttk.PanedWindow(window, orient=tk.HORIZONTAL)
+        panes.pack(fill=tk.BOTH, expand=True)
+        columns = [
+            ("ref", "Stash", 80),
+            ("date", "Date", 130),
+            ("subject", "Message", 260),
+            ("applies", "Applies to HEAD", 160),
+        ]
+        tree = ttk.Treeview(
+            panes, columns=[key for key, _, _ in columns], show="headings", selectmode="browse"
+        )
+        for key, title, width in columns:
+            tree.heading(key, text=title)
+            tree.column(key, width=width, anchor=tk.W)
+        diff = tk.Text(panes, wrap=tk.NONE, width=90, height=30)
+        panes.add(tree, weight=1)
+        panes.add(diff, weight=2)
+        buttons = ttk.Frame(window, padding=6)
+        buttons.pack(fill=tk.X)
+        progress = tk.StringVar()
+        ttk.Label(buttons, textvariable=progress).pack(side=tk.LEFT)
+        entries = {}
+
+        def close():
+            cancel.set()
+            window.destroy()
+
+        def selected():
+            selection = tree.selection()
+            return entries.get(selection[0]) if selection else None
+
+        def show_diff(stash, code, stat, patch):
+            if cancel.is_set() or selected() is not stash:
+                return
+            diff.delete("1.0", tk.END)
+            diff.insert(tk.END, f"{stat}\n\n{patch}" if code == 0 else patch)
+
+        def on_select(_event=None):
+            stash = selected()
+            if stash is None:
+                return
+            diff.delete("1.0", tk.END)
+            diff.insert(tk.END, "Loading...")
+
+            def worker():
+                self.dispatcher.post(show_diff, stash, *stash_diff(repo, stash.commit))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        def show_check(item, stash, status, paths):
+            if cancel.is_set() or entries.get(item) is not stash:
+                return
+            label = {"clean": "clean", "unknown": "?"}.get(status, f"conflicts: {', '.join(paths)}")
+            tree.set(item, "applies", label)
+
+        def show_list(code, stashes, err):
+            if cancel.is_set():
+                return
+            tree.delete(*tree.get_children())
+            entries.clear()
+            diff.delete("1.0", tk.END)
+            if code != 0:
+                progress.set(err or "git stash list failed.")
+                return
+            items = {}
+            for stash in stashes:
+                stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(stash.time))
+                item = tree.insert("", tk.END, values=(stash.ref, stamp, stash.subject, "..."))
+                entries[item] = stash
+                items[stash.commit] = item
+            progress.set(f"{len(stashes)} stash(es).")
+
+            def checker():
+                check_all(
+                    repo,
+                    stashes,
+                    lambda stash, status, paths: self.dispatcher.post(
+                        show_check, items[stash.commit], stash, status, paths
+                    ),
+                    cancel,
+                )
+
+            threading.Thread(target=checker, daemon=True).start()
+
+        def refresh():
+            def worker():
+                self.dispatcher.post(show_list, *list_stashes(repo))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        def run_action(action, verb):
+            stash = selected()
+            if stash is None or self.busy:
+                return
+            if not messagebox.askyesno("Confirm", f"{verb} {stash.ref}?\n{stash.subject}"):
+                return
+            self._set_busy(True, f"Running: git stash {verb.lower()} {stash.ref}")
+
+            def worker():
+                code, out, err = action(repo, stash)
+                args = ["stash", verb.lower(), stash.ref]
+                self.dispatcher.post(self._on_job_done, " ".join(args[:2]), args, code, out, err)
+                refresh()
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        ttk.Button(buttons, text="Drop", command=lambda: run_action(drop_stash, "Drop")).pack(
+            side=tk.RIGHT
+        )
+        ttk.Button(buttons, text="Apply", command=lambda: run_action(apply_stash, "Apply")).pack(
+            side=tk.RIGHT, padx=6
+        )
+        ttk.Button(buttons, text="Refresh", command=refresh).pack(side=tk.RIGHT)
+        tree.bind("<<TreeviewSelect>>", on_select)
+        window.protocol("WM_DELETE_WINDOW", close)
+        refresh()
+
+    def _show_reword(self):
+        """AI messages for base..HEAD, reviewed in a table and applied in one rewrite."""
+        from reword import list_range, rewrite_messages, suggest_range
+
+        repo = self._ensure_repo()
+        if not repo:
+            return
+        cancel = threading.Event()
+        window = tk.Toplevel(self)
+        window.title("Reword Range")
+        top = ttk.Frame(window, padding=6)
+        top.pack(fill=tk.X)
+        ttk.Label(top, text="Base:").pack(side=tk.LEFT)
+        base_var = tk.StringVar(value="@{upstream}")
+        ttk.Entry(top, textvariable=base_var, width=24).pack(side=tk.LEFT, padx=6)
+        progress = tk.StringVar()
+        columns = [
+            ("use", "Use", 40),
+            ("commit", "Commit", 80),
+            ("subject", "Current", 260),
+            ("suggestion", "Suggested", 320),
+            ("source", "", 60),
+        ]
+        tree = ttk.Treeview(
+            window, columns=[key for key, _, _ in columns], show="headings", selectmode="browse"
+        )
+        for key, title, width in columns:
+            tree.heading(key, text=title)
+            tree.column(key, width=width, anchor=tk.W)
+        tree.pack(fill=tk.BOTH, expand=True)
+        edit = ttk.Frame(window, padding=6)
+        edit.pack(fill=tk.X)
+        message_var = tk.StringVar()
+        ttk.Entry(edit, textvariable=message_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        buttons = ttk.Frame(window, padding=6)
+        buttons.pack(fill=tk.X)
+        ttk.Label(buttons, textvariable=progress).pack(side=tk.LEFT)
+        items = {}
+        state = {"base": "", "done": 0}
+
+        def close():
+            cancel.set()
+            window.destroy()
+
+        def on_select(_event=None):
+            selection = tree.selection()
+            if selection:
+                message_var.set(tree.set(selection[0], "suggestion"))
+
+        def set_message():
+            selection = tree.selection()
+            if selection and message_var.get().strip():
+                tree.set(selection[0], "suggestion", message_var.get().strip())
+                tree.set(selection[0], "use", "yes")
+
+        def toggle(_event=None):
+            selection = tree.selection()
+            if selection and tree.set(selection[0], "suggestion"):
+                use = tree.set(selection[0], "use")
+                tree.set(selection[0], "use", "" if use else "yes")
+
+        def show_result(commit, message, cached, error):
+            item = items.get(commit.commit)
+            if cancel.is_set() or item is None:
+                return
+            state["done"] += 1
+            if error:
+                tree.set(item, "source", "error")
+                self._append_output(f"{commit.commit[:8]}: {error}")
+            else:
+                tree.set(item, "suggestion", message)
+                tree.set(item, "source", "cached" if cached else "ai")
+                tree.set(item, "use", "yes")
+            progress.set(f"{state['done']}/{len(items)} suggested.")
+
+        def finished():
+            if not cancel.is_set():
+                generate_button.configure(state=tk.NORMAL)
+
+        def show_range(base, code, commits, err, api_key, model):
+            if cancel.is_set():
+                return
+            tree.delete(*tree.get_children())
+            items.clear()
+            state.update(base=base, done=0)
+            if code != 0 or not commits:
+                progress.set(err or f"No commits in {base}..HEAD.")
+                finished()
+                return
+            for commit in commits:
+                items[commit.commit] = tree.insert(
+                    "", tk.END, values=("", commit.commit[:8], commit.subject, "", "...")
+                )
+            progress.set(f"Requesting {len(commits)} suggestion(s)...")
+
+            def worker():
+                code, err = suggest_range(
+                    repo,
+                    base,
+                    lambda prompt: openrouter_request(api_key, model, prompt),
+                    model,
+                    lambda *result: self.dispatcher.post(show_result, *result),
+                    store=self.store,
+                    cancel=cancel,
+                )
+                if code not in (0, CANCELLED):
+                    self.dispatcher.post(progress.set, err or "git log failed.")
+                self.dispatcher.post(finished)
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        def generate():
+            if not REQUESTS_AVAILABLE:
+                messagebox.showerror("Missing dependency", "Install requests to use OpenRouter.")
+                return
+            api_key = self.key_store.api_key()
+            if not api_key:
+                self._refresh_openrouter_status()
+                messagebox.showerror("OpenRouter", "Unlock or set the API key first.")
+                return
+            base = base_var.get().strip() or "@{upstream}"
+            model = self.openrouter_model_var.get().strip() or "openai/gpt-4o-mini"
+            # One run at a time: a second one would write into the same rows.
+            generate_button.configure(state=tk.DISABLED)
+
+            def worker():
+                self.dispatcher.post(show_range, base, *list_range(repo, base), api_key, model)
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        def apply():
+            chosen = {
+                commit: tree.set(item, "suggestion")
+                for commit, item in items.items()
+                if tree.set(item, "use") and tree.set(item, "suggestion")
+            }
+            if not chosen or self.busy:
+                return
+            base = state["base"]
+            if not messagebox.askyesno(
+                "Confirm",
+                f"Rewrite {len(chosen)} commit message(s) in {base}..HEAD?\n"
+                "Commits from the first changed one on get new ids; "
+                "avoid this on history others already pulled.",
+            ):
+                return
+            self._set_busy(True, f"Rewording {len(chosen)} commit(s)...")
+
+            def worker():
+                code, head, err = rewrite_messages(repo, base, chosen)
+                args = ["reword", f"{base}..HEAD"]
+                self.dispatcher.post(self._on_job_done, "reword", args, code, head, err)
+                if code == 0:
+                    self.dispatcher.post(self._refresh_history)
+                    self.dispatcher.post(close)
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        generate_button = ttk.Button(top, text="Generate", command=generate)
+        generate_button.pack(side=tk.LEFT)
+        ttk.Button(edit, text="Set", command=set_message).pack(side=tk.LEFT, padx=6)
+        ttk.Button(buttons, text="Apply", command=apply).pack(side=tk.RIGHT)
+        tree.bind("<<TreeviewSelect>>", on_select)
+        tree.bind("<Double-Button-1>", toggle)
+        window.protocol("WM_DELETE_WINDOW", close)
+
+    def _show_repo_size(self):
+        """Largest blobs and heaviest directories, scanned in the background."""
+        from repo_size import analyze, human_size
+
+        repo = self._ensure_repo()
+        if not repo:
+            return
+        cancel = threading.Event()
+        window = tk.Toplevel(self)
+        window.title("Repository Size")
+        summary = tk.StringVar(value="Scanning...")
+        ttk.Label(window, textvariable=summary, padding=6, justify=tk.LEFT).pack(fill=tk.X)
+        panes = ttk.PanedWindow(window, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True)
+        blob_columns = [
+            ("size", "Size", 90),
+            ("disk", "On disk", 90),
+            ("path", "Path", 320),
+            ("commit", "Introduced by", 360),
+        ]
+        dir_columns = [("disk", "On disk", 90), ("blobs", "Blobs", 70), ("path", "Directory", 400)]
+        trees = []
+        for columns in (blob_columns, dir_columns):
+            tree = ttk.Treeview(panes, columns=[key for key, _, _ in columns], show="headings")
+            for key, title, width in columns:
+                tree.heading(key, text=title)
+                tree.column(key, width=width, anchor=tk.W)
+            panes.add(tree, weight=1)
+            trees.append(tree)
+        blob_tree, dir_tree = trees
+        buttons = ttk.Frame(window, padding=6)
+        buttons.pack(fill=tk.X)
+        rescan = ttk.Button(buttons, text="Rescan", command=lambda: scan(force=True))
+        rescan.pack(side=tk.RIGHT)
+
+        def close():
+            cancel.set()
+            window.destroy()
+
+        def show(code, report, err):
+            if cancel.is_set():
+                return
+            rescan.configure(state=tk.NORMAL)
+            for tree in trees:
+                tree.delete(*tree.get_children())
+            if code != 0:
+                summary.set(err or "Size scan failed.")
+                return
+            stats = report["count_objects"]
+            types = ", ".join(
+                f"{kind}s: {entry['count']} ({human_size(entry['disk'])})"
+                for kind, entry in sorted(report["types"].items())
+            )
+            source = "cached" if report["cached"] else f"{report['seconds']:.1f} s"
+            summary.set(
+                f"Packs: {stats.get('packs', 0)} ({human_size(stats.get('size-pack', 0) * 1024)}), "
+                f"loose: {stats.get('count', 0)} ({human_size(stats.get('size', 0) * 1024)}), "
+                f"garbage: {human_size(stats.get('size-garbage', 0) * 1024)}\n"
+                f"{types} [{source}]"
+            )
+            for blob in report["blobs"]:
+                introduced = f"{blob['commit'][:8]} {blob['subject']}" if blob["commit"] else ""
+                blob_tree.insert(
+                    "",
+                    tk.END,
+                    values=(
+                        human_size(blob["size"]),
+                        human_size(blob["disk"]),
+                        blob["path"] or f"(unreachable {blob['oid'][:8]})",
+                        introduced,
+                    ),
+                )
+            for directory in report["directories"]:
+                dir_tree.insert(
+                    "",
+                    tk.END,
+                    values=(human_size(directory["disk"]), directory["blobs"], directory["path"]),
+                )
+
+        def scan(force=False):
+            # One scan at a time; show() re-enables the button.
+            rescan.configure(state=tk.DISABLED)
+            summary.set("Scanning...")
+
+            def worker():
+                result = analyze(
+                    repo,
+                    self.store,
+                    lambda text: self.dispatcher.post(summary.set, text),
+                    cancel,
+                    force,
+                )
+                self.dispatcher.post(show, *result)
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+        scan()
+
+    def _open_conflicts(self):
+        from conflicts import unmerged_paths
+
+        repo = self._ensure_repo()
+        if not repo:
+            return
+        code, conflicts, err = unmerged_paths(repo)
+        if code != 0:
+            messagebox.showerror("Error", err or "Failed to list conflicts.")
+        elif not conflicts:
+            messagebox.showinfo("Conflicts", "No unmerged paths.")
+        else:
+            self._show_conflicts(repo, conflicts)
+
+    def _show_conflicts(self, repo, conflicts):
+        """Unmerged paths with a base/ours/theirs view loaded one file at a time."""
+        from conflicts import (
+            BlobReader,
+            mark_resolved,
+            resolve_with,
+            save_resolution,
+            three_way,
+            working_text,
+        )
+
+        reader = BlobReader(repo)
+        window = tk.Toplevel(self)
+        window.title(f"Conflicts ({len(conflicts)})")
+        panes = ttk.PanedWindow(window, orient=tk.HORIZONTAL)
+        panes.pack(fill=tk.BOTH, expand=True)
+        tree = ttk.Treeview(panes, columns=("path", "kind"), show="headings", selectmode="browse")
+        tree.heading("path", text="Path")
+        tree.heading("kind", text="Conflict")
+        tree.column("path", width=260)
+        tree.column("kind", width=110)
+        panes.add(tree, weight=1)
+        right = ttk.PanedWindow(panes, orient=tk.VERTICAL)
+        panes.add(right, weight=3)
+        sides = ttk.PanedWindow(right, orient=tk.HORIZONTAL)
+        right.add(sides, weight=1)
+        views = {}
+        for name in ("base", "ours", "theirs"):
+            frame = ttk.LabelFrame(sides, text=name.capitalize())
+            views[name] = tk.Text(frame, wrap=tk.NONE, width=40, height=18)
+            views[name].pack(fill=tk.BOTH, expand=True)
+            sides.add(frame, weight=1)
+        result_frame = ttk.LabelFrame(right, text="Result (working file)")
+        result = tk.Text(result_frame, wrap=tk.NONE, height=14, undo=True)
+        result.pack(fill=tk.BOTH, expand=True)
+        right.add(result_frame, weight=1)
+        buttons = ttk.Frame(window, padding=6)
+        buttons.pack(fill=tk.X)
+        progress = tk.StringVar(value=f"{len(conflicts)} unmerged path(s).")
+        ttk.Label(buttons, textvariable=progress).pack(side=tk.LEFT)
+        entries = {}
+        for conflict in conflicts:
+            entries[tree.insert("", tk.END, values=(conflict.path, conflict.kind))] = conflict
+
+        def selected():
+            selection = tree.selection()
+            return (selection[0], entries[selection[0]]) if selection else (None, None)
+
+        def show(conflict, texts, working, editable):
+            if not window.winfo_exists() or selected()[1] is not conflict:
+                return
+            for name, view in views.items():
+                view.delete("1.0", tk.END)
+                view.insert(tk.END, texts[name])
+            result.configure(state=tk.NORMAL)
+            result.delete("1.0", tk.END)
+            result.insert(tk.END, working)
+            result.edit_reset()
+            # Saving lossy text (binary, truncated, not UTF-8) would corrupt the file.
+            state = tk.NORMAL if editable else tk.DISABLED
+            result.configure(state=state)
+            save_button.configure(state=state)
+            if not editable:
+                progress.set(
+                    f"{conflict.path} is deleted, binary, too large or not UTF-8: "
+                    "use Ours/Theirs, or edit it outside and Mark Resolved."
+                )
+            else:
+                progress.set(f"{len(entries)} unmerged path(s).")
+
+        def on_select(_event=None):
+            _, conflict = selected()
+            if conflict is None:
+                return
+
+            def worker():
+                texts = three_way(reader, conflict)
+                self.dispatcher.post(show, conflict, texts, *working_text(repo, conflict.path))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        def resolved(item, code, err):
+            if not window.winfo_exists():
+                return
+            if code != 0:
+                messagebox.showerror("Error", err or "Failed to resolve.", parent=window)
+                return
+            # Drop just this row; the rest of the list is still accurate.
+            following = tree.next(item) or tree.prev(item)
+            tree.delete(item)
+            entries.pop(item, None)
+            progress.set(f"{len(entries)} unmerged path(s) left.")
+            if following:
+                tree.selection_set(following)
+            else:
+                result.configure(state=tk.NORMAL)
+                for view in (*views.values(), result):
+                    view.delete("1.0", tk.END)
+
+        def resolve(action):
+            item, conflict = selected()
+            if conflict is None:
+                return
+            text = result.get("1.0", "end-1c")
+
+            def worker():
+                code, _, err = action(conflict, text)
+                self.dispatcher.post(resolved, item, code, err)
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        def close():
+            reader.close()
+            window.destroy()
+
+        actions = {}
+        for label, action in (
+            ("Mark Resolved", lambda conflict, _text: mark_resolved(repo, conflict.path)),
+            ("Save Result", lambda conflict, text: save_resolution(repo, conflict.path, text)),
+            ("Use Theirs", lambda conflict, _text: resolve_with(repo, conflict, "theirs")),
+            ("Use Ours", lambda conflict, _text: resolve_with(repo, conflict, "ours")),
+        ):
+            actions[label] = ttk.Button(buttons, text=label, command=lambda a=action: resolve(a))
+            actions[label].pack(side=tk.RIGHT, padx=3)
+        save_button = actions["Save Result"]
+        tree.bind("<<TreeviewSelect>>", on_select)
+        window.protocol("WM_DELETE_WINDOW", close)
+        tree.selection_set(tree.get_children()[0])
+
     def _stage_all(self):
         if not messagebox.askyesno("Confirm", "Stage all changes? (git add -A)"):
             return
@@ -478,81 +1537,250 @@ class GitGui(tk.Tk):
         repo = self._ensure_repo()
         if not repo:
             return
-        code, out, err = run_git(["log", "--oneline", "-50"], repo)
-        if code != 0:
-            self._set_history(err or "Failed to read history.")
-            return
-        self._set_history(out or "No commits found.")
+        self._set_history(history_text(repo))
 
     def _refresh_diff(self):
         repo = self._ensure_repo()
         if not repo:
             return
-        code, status_out, status_err = run_git(["status", "-s"], repo)
-        code_diff, diff_out, diff_err = run_git(["diff", "--stat"], repo)
-        if code != 0:
-            self._set_diff(status_err or "Failed to read status.")
+        self._set_diff(diff_summary(repo))
+
+    def _blame_from_diff(self):
+        repo = self._ensure_repo()
+        if not repo:
             return
-        if code_diff != 0:
-            self._set_diff(diff_err or "Failed to read diff.")
+        line = self.diff_text.get("insert linestart", "insert lineend")
+        path = simpledialog.askstring(
+            "Blame", "File to blame (at HEAD):", initialvalue=_path_from_summary_line(line)
+        )
+        if path:
+            self._show_blame(repo, path.strip(), "HEAD")
+
+    def _blame_from_history(self):
+        repo = self._ensure_repo()
+        if not repo:
             return
-        parts = []
-        if status_out:
-            parts.append("Changed files:\n" + status_out)
-        else:
-            parts.append("Changed files: none")
-        if diff_out:
-            parts.append("\nDiff summary:\n" + diff_out)
-        else:
-            parts.append("\nDiff summary: clean")
-        self._set_diff("\n".join(parts))
+        words = self.history_text.get("insert linestart", "insert lineend").split()
+        rev = words[0] if words and re.fullmatch(r"[0-9a-f]{4,40}", words[0]) else "HEAD"
+        path = simpledialog.askstring("Blame", f"File to blame at {rev}:")
+        if path:
+            self._show_blame(repo, path.strip(), rev)
+
+    def _file_history(self):
+        repo = self._ensure_repo()
+        if not repo:
+            return
+        line = self.diff_text.get("insert linestart", "insert lineend")
+        path = simpledialog.askstring(
+            "File History",
+            "Path (relative to the repository root):",
+            initialvalue=_path_from_summary_line(line),
+        )
+        if path:
+            self._show_file_history(repo, path.strip())
+
+    def _show_file_history(self, repo, path):
+        """Commits touching `path` across renames; double-click a row to blame it."""
+        from file_history import file_history, has_changed_paths, update_index
+
+        cancel = threading.Event()
+        window = tk.Toplevel(self)
+        window.title(f"History of {path}")
+        columns = [
+            ("commit", "Commit", 90),
+            ("date", "Date", 100),
+            ("author", "Author", 140),
+            ("summary", "Summary", 420),
+            ("path", "Path", 220),
+        ]
+        tree = ttk.Treeview(
+            window, columns=[key for key, _, _ in columns], show="headings", height=20
+        )
+        for key, title, width in columns:
+            tree.heading(key, text=title)
+            tree.column(key, width=width, anchor=tk.W)
+        progress = tk.StringVar(value="Loading history...")
+        ttk.Label(window, textvariable=progress, padding=6).pack(side=tk.BOTTOM, fill=tk.X)
+        tree.pack(fill=tk.BOTH, expand=True)
+        rows = {}
+
+        def close():
+            cancel.set()
+            window.destroy()
+
+        def on_open(_event=None):
+            for item in tree.selection():
+                entry = rows[item]
+                if entry.status != "D":
+                    self._show_blame(repo, entry.path, entry.commit)
+
+        window.protocol("WM_DELETE_WINDOW", close)
+        tree.bind("<Double-Button-1>", on_open)
+
+        def show(code, source, history, err, bloom):
+            if cancel.is_set():
+                return
+            for entry in history:
+                stamp = time.strftime("%Y-%m-%d", time.localtime(entry.time))
+                values = (entry.commit[:10], stamp, entry.author, entry.summary, entry.path)
+                rows[tree.insert("", tk.END, values=values)] = entry
+            if code != 0:
+                progress.set(err or "git log failed.")
+                return
+            if source == "index":
+                origin = "path index"
+            elif bloom:
+                origin = "git log with changed-path filters (index not ready)"
+            else:
+                origin = "git log (index not ready)"
+            progress.set(f"{len(history)} commits from {origin}.")
+
+        def worker():
+            code, source, history, err = file_history(repo, path, self.store, cancel)
+            bloom = source == "git" and has_changed_paths(repo)
+            if code != CANCELLED:
+                self.dispatcher.post(show, code, source, history, err, bloom)
+            if source == "git" and code == 0:
+                # Built lazily on first use; the repository itself is not written.
+                started = time.perf_counter()
+                if update_index(repo, self.store, cancel):
+                    elapsed = time.perf_counter() - started
+                    self.dispatcher.post(
+                        self.status_var.set, f"File history index ready ({elapsed:.1f}s)."
+                    )
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _show_blame(self, repo, path, rev):
+        """Blame window annotated hunk by hunk as `git blame --incremental` streams."""
+        from blame import blame, file_lines
+
+        cancel = threading.Event()
+        window = tk.Toplevel(self)
+        window.title(f"Blame {path} @ {rev}")
+        text = tk.Text(window, wrap=tk.NONE, width=120, height=40)
+        scroll = ttk.Scrollbar(window, command=text.yview)
+        text.configure(yscrollcommand=scroll.set)
+        progress = tk.StringVar(value="Loading file...")
+        ttk.Label(window, textvariable=progress, padding=6).pack(side=tk.BOTTOM, fill=tk.X)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        text.tag_configure("recent", background="#fff3c4")
+        blamed = [0, 0]
+
+        def close():
+            cancel.set()
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+
+        def show_file(lines):
+            if cancel.is_set():
+                return
+            blamed[1] = len(lines)
+            text.insert(tk.END, "".join(f"{'':{BLAME_GUTTER}}| {line}\n" for line in lines))
+            progress.set(f"Blaming {len(lines)} lines (newest changes first)...")
+
+        def annotate(hunk, info, recent):
+            if cancel.is_set():
+                return
+            stamp = time.strftime("%Y-%m-%d", time.localtime(int(info.get("author-time", 0))))
+            label = f"{hunk.commit[:8]} {info.get('author', '')[:14]:<14} {stamp} "
+            for line in range(hunk.final_line, hunk.final_line + hunk.count):
+                text.delete(f"{line}.0", f"{line}.{BLAME_GUTTER}")
+                text.insert(f"{line}.0", label, ("recent",) if recent else ())
+            blamed[0] += hunk.count
+            progress.set(f"Blamed {blamed[0]} of {blamed[1]} lines...")
+
+        def finish(message):
+            if not cancel.is_set():
+                progress.set(message)
+
+        def worker():
+            code, lines, err = file_lines(repo, path, rev)
+            if code != 0:
+                self.dispatcher.post(finish, err or f"Cannot read {path} at {rev}.")
+                return
+            self.dispatcher.post(show_file, lines)
+            # The first hunks streamed are the newest; highlight their lines.
+            seen = set()
+
+            def on_hunk(hunk, result):
+                seen.add(hunk.commit)
+                info = dict(result.commits.get(hunk.commit, {}))
+                self.dispatcher.post(annotate, hunk, info, len(seen) <= BLAME_RECENT_COMMITS)
+
+            code, result, err = blame(repo, path, rev, on_hunk, cancel, self.store)
+            if code == 0:
+                self.dispatcher.post(finish, f"{len(result.commits)} commits, {len(lines)} lines.")
+            elif code != CANCELLED:
+                self.dispatcher.post(finish, err or "git blame failed.")
+
+        threading.Thread(target=worker, daemon=True).start()
 
     def _refresh_branches(self):
         repo = self._ensure_repo()
         if not repo:
             return
-        code, out, err = run_git(["branch"], repo)
-        if code != 0:
-            messagebox.showerror("Error", err or "Failed to list branches.")
-            return
-        branches = []
-        current = ""
-        for line in out.splitlines():
-            line = line.strip()
-            if line.startswith("*"):
-                current = line[1:].strip()
-                branches.append(current)
-            elif line:
-                branches.append(line)
-        self.branch_combo["values"] = branches
-        if current:
-            self.branch_var.set(current)
-
-        remote_code, remote_out, remote_err = run_git(["branch", "-a"], repo)
+        code, branches, err = branch_tracking(repo)
+        fetched = last_fetch_time(repo)
+        if not self._apply_branch_tracking(
+            repo, code, branches, err, fetched, show_errors=True, select_current=True
+        ):
+            return
+
+        remote_code, remote_branches, remote_err = list_remote_branches(repo)
         if remote_code != 0:
             messagebox.showerror("Error", remote_err or "Failed to list remote branches.")
             return
-        remote_branches = []
-        for line in remote_out.splitlines():
-            entry = line.strip()
-            if entry.startswith("*"):
-                entry = entry[1:].strip()
-            if "->" in entry:
-                continue
-            if entry.startswith("remotes/"):
-                entry = entry.replace("remotes/", "", 1)
-            if entry and "/" in entry:
-                remote_branches.append(entry)
-        remote_branches = sorted(set(remote_branches))
         self.remote_combo["values"] = remote_branches
-        if remote_branches:
-            if self.remote_branch_var.get() not in remote_branches:
-                self.remote_branch_var.set(remote_branches[0])
+        if remote_branches and self.remote_branch_var.get() not in remote_branches:
+            self.remote_branch_var.set(remote_branches[0])
 
         self.status_var.set("Branches refreshed.")
 
+    def _update_branch_tracking(self, repo):
+        """Refresh the branch selector from a worker; used after every job."""
+
+        def worker():
+            result = branch_tracking(repo)
+            self.dispatcher.post(self._apply_branch_tracking, repo, *result, last_fetch_time(repo))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _apply_branch_tracking(
+        self, repo, code, branches, err, fetched, show_errors=False, select_current=False
+    ):
+        """Show tracking labels; `select_current` moves the selector to HEAD's branch."""
+        if repo != self.repo_path.get().strip():
+            return False
+        if code != 0:
+            if show_errors:
+                messagebox.showerror("Error", err or "Failed to list branches.")
+            return False
+        selected = self._selected_branch()
+        self.branch_labels = {format_branch_label(branch): branch["name"] for branch in branches}
+        labels = list(self.branch_labels)
+        self.branch_combo["values"] = labels
+        current = next((b for b in branches if b["current"]), None)
+        keep = next((b for b in branches if b["name"] == selected), None)
+        chosen = current if select_current or not keep else keep
+        if chosen:
+            self.branch_var.set(format_branch_label(chosen))
+        if fetched is None:
+            self.tracking_var.set("Last fetch: never")
+        else:
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(fetched))
+            self.tracking_var.set(f"Last fetch: {stamp}")
+        return True
+
+    def _selected_branch(self):
+        """Branch name behind the selector, which shows tracking info in its labels."""
+        value = self.branch_var.get().strip()
+        return self.branch_labels.get(value, value)
+
     def _checkout_branch(self):
-        branch = self.branch_var.get().strip()
+        branch = self._selected_branch()
         if not branch:
             messagebox.showerror("Missing branch", "Please select a branch.")
             return
@@ -585,7 +1813,7 @@ class GitGui(tk.Tk):
         self._run_async(["checkout", "-b", name], f"create branch {name}")
 
     def _delete_branch(self):
-        name = self.branch_var.get().strip()
+        name = self._selected_branch()
         if not name:
             messagebox.showerror("Missing branch", "Please select a branch to delete.")
             return
@@ -593,14 +1821,50 @@ class GitGui(tk.Tk):
             return
         self._run_async(["branch", "-D", name], f"delete branch {name}")
 
+    def _on_focus_in(self, event):
+        # Pick up edits committed by another GUI instance.
+        if event.widget is not self or not self.store.changed():
+            return
+        self.favorites = self._load_favorites()
+        self._refresh_favorites_combo()
+        self.profiles = self._load_profiles()
+        self._refresh_profiles_combo()
+        self._refresh_openrouter_status()
+
+    def _on_close(self):
+        if self.closing:
+            return
+        self.closing = True
+        if self.maintenance_cancel is not None:
+            self.maintenance_cancel.set()
+        self.withdraw()
+        self._finish_close(time.monotonic() + MAINTENANCE_JOIN_SECONDS)
+
+    def _finish_close(self, deadline):
+        # Poll instead of join(): the worker's last posts need the Tk loop running.
+        worker = self.maintenance_thread
+        alive = worker is not None and worker.is_alive()
+        if alive and time.monotonic() < deadline:
+            self.after(MAINTENANCE_CLOSE_POLL_MS, self._finish_close, deadline)
+            return
+        self.output_log.close()
+        if not alive:
+            # Otherwise the worker still writes reports; leave the store to exit.
+            self.store.close()
+        self.destroy()
+
     def _load_favorites(self):
-        return load_list(FAVORITES_PATH)
+        return self.store.favorites()
 
-    def _save_favorites(self):
+    def _update_favorites(self, change, path):
         try:
-            save_list(FAVORITES_PATH, self.favorites)
-        except OSError as exc:
+            change(path)
+        except sqlite3.Error as exc:
             messagebox.showerror("Error", f"Failed to save favorites: {exc}")
+            return False
+        self.favorites = self._load_favorites()
+        self._refresh_favorites_combo()
+        return True
 
     def _refresh_favorites_combo(self):
         self.favorites_combo["values"] = self.favorites
@@ -625,10 +1889,7 @@ class GitGui(tk.Tk):
         if not os.path.isdir(path):
             messagebox.showerror("Invalid path", "Path does not exist.")
             return
-        if path not in self.favorites:
-            self.favorites.append(path)
-            self._save_favorites()
-            self._refresh_favorites_combo()
+        if self._update_favorites(self.store.add_favorite, path):
             self.status_var.set("Favorite added.")
 
     def _remove_favorite(self):
@@ -636,22 +1897,25 @@ class GitGui(tk.Tk):
         if not path:
             messagebox.showerror("Missing favorite", "Please select a favorite.")
             return
-        if path in self.favorites:
-            self.favorites.remove(path)
-            self._save_favorites()
-            self._refresh_favorites_combo()
+        if self._update_favorites(self.store.remove_favorite, path):
             self.status_var.set("Favorite removed.")
 
     def _load_profiles(self):
-        return load_profiles(PROFILES_PATH)
+        return self.store.profiles()
 
-    def _save_profiles(self):
+    def _update_profiles(self, change, *args):
         try:
-            save_profiles(PROFILES_PATH, self.profiles)
-        except OSError as exc:
+            change(*args)
+        except sqlite3.Error as exc:
             messagebox.showerror("Error", f"Failed to save profiles: {exc}")
+            return False
+        self.profiles = self._load_profiles()
+        self._refresh_profiles_combo()
+        return True
 
     def _refresh_profiles_combo(self):
+        if self.profile_combo is None:
+            return
         self.profile_combo["values"] = sorted(self.profiles.keys())
         if self.profile_var.get() not in self.profiles:
             self.profile_var.set("")
@@ -687,11 +1951,10 @@ class GitGui(tk.Tk):
         profile = {
             "path": repo,
             "remote": self.remote_var.get().strip() or "origin",
-            "branch": self.branch_var.get().strip(),
+            "branch": self._selected_branch(),
         }
-        self.profiles[name] = profile
-        self._save_profiles()
-        self._refresh_profiles_combo()
+        if not self._update_profiles(self.store.save_profile, name, profile):
+            return
         self.profile_var.set(name)
         self.status_var.set(f"Profile saved: {name}")
 
@@ -702,10 +1965,7 @@ class GitGui(tk.Tk):
             return
         if not messagebox.askyesno("Confirm", f"Delete profile '{name}'?"):
             return
-        if name in self.profiles:
-            del self.profiles[name]
-            self._save_profiles()
-            self._refresh_profiles_combo()
+        if self._update_profiles(self.store.delete_profile, name):
             self.status_var.set("Profile deleted.")
 
     def _auth_check(self):
@@ -760,10 +2020,10 @@ class GitGui(tk.Tk):
         if not REQUESTS_AVAILABLE:
             self.openrouter_status_var.set("OpenRouter: requests not installed")
             return
-        if not os.path.exists(OPENROUTER_CONFIG_PATH):
+        if self.store.get_setting(OPENROUTER_KEY_SETTING) is None:
             self.openrouter_status_var.set("OpenRouter: no key saved")
             return
-        if self.openrouter_api_key:
+        if self.key_store.is_unlocked():
             self.openrouter_status_var.set("OpenRouter: unlocked")
         else:
             self.openrouter_status_var.set("OpenRouter: locked")
@@ -782,86 +2042,240 @@ class GitGui(tk.Tk):
         )
         if not password:
             return
-        payload = encrypt_api_key(api_key.strip(), password)
+        # Calibrated once per machine so unlocking takes ~0.3 s.
+        params = self.store.get_setting(OPENROUTER_KDF_SETTING)
+        calibrated = isinstance(params, dict)
+        self.status_var.set("Encrypting the OpenRouter key...")
+
+        def worker():
+            # Calibration and key derivation take a while; keep them off the Tk thread.
+            try:
+                kdf = params if calibrated else calibrate_kdf()
+                payload = self.key_store.set_api_key(api_key.strip(), password, kdf)
+            except (RuntimeError, ValueError) as exc:
+                self.dispatcher.post(self._on_openrouter_key_failed, str(exc))
+                return
+            self.dispatcher.post(self._save_openrouter_key, payload, None if calibrated else kdf)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _save_openrouter_key(self, payload, new_kdf):
         try:
-            with open(OPENROUTER_CONFIG_PATH, "w", encoding="utf-8") as handle:
-                json.dump(payload, handle)
-            self.openrouter_api_key = api_key.strip()
-            self._refresh_openrouter_status()
-            self._append_output("OpenRouter key saved and unlocked.")
-        except OSError as exc:
-            messagebox.showerror("Error", f"Failed to save key: {exc}")
+            if new_kdf is not None:
+                self.store.set_setting(OPENROUTER_KDF_SETTING, new_kdf)
+            self.store.set_setting(OPENROUTER_KEY_SETTING, payload)
+        except sqlite3.Error as exc:
+            self._on_openrouter_key_failed(f"Failed to save key: {exc}")
+            return
+        self._on_key_unlocked()
+        self.status_var.set("OpenRouter key saved.")
+        self._append_output("OpenRouter key saved and unlocked.")
+
+    def _on_openrouter_key_failed(self, error):
+        self.status_var.set("OpenRouter key not saved.")
+        messagebox.showerror("Error", error)
+
+    def _on_key_unlocked(self):
+        self._refresh_openrouter_status()
+        if self.key_idle_job is None:
+            self.key_idle_job = self.after(KEY_IDLE_CHECK_MS, self._check_key_idle)
+
+    def _check_key_idle(self):
+        self.key_idle_job = None
+        self._refresh_openrouter_status()
+        if self.key_store.is_unlocked():
+            self.key_idle_job = self.after(KEY_IDLE_CHECK_MS, self._check_key_idle)
+        else:
+            self._append_output("OpenRouter key locked after inactivity.")
+
+    def _lock_openrouter_key(self):
+        self.key_store.lock()
+        if self.key_idle_job is not None:
+            self.after_cancel(self.key_idle_job)
+            self.key_idle_job = None
+        self._refresh_openrouter_status()
+        self._append_output("OpenRouter key locked.")
 
     def _unlock_openrouter_key(self):
         if not CRYPTO_AVAILABLE:
             messagebox.showerror("Missing dependency", "Install cryptography to unlock the key.")
             return
-        if not os.path.exists(OPENROUTER_CONFIG_PATH):
+        payload = self.store.get_setting(OPENROUTER_KEY_SETTING)
+        if not isinstance(payload, dict):
             messagebox.showerror("Missing key", "No encrypted key found.")
             return
         password = simpledialog.askstring("OpenRouter", "Enter password:", show="*")
         if not password:
             return
+        from openrouter import InvalidToken
+
         try:
-            with open(OPENROUTER_CONFIG_PATH, encoding="utf-8") as handle:
-                payload = json.load(handle)
-            self.openrouter_api_key = decrypt_api_key(payload, password)
-            self._refresh_openrouter_status()
+            self.key_store.unlock(payload, password)
+            self._on_key_unlocked()
             self._append_output("OpenRouter key unlocked for this session.")
         except InvalidToken:
             messagebox.showerror("Error", "Invalid password.")
-        except (json.JSONDecodeError, ValueError, OSError) as exc:
+        except (ValueError, TypeError) as exc:
             messagebox.showerror("Error", f"Failed to unlock key: {exc}")
 
     def _test_openrouter(self):
         if not REQUESTS_AVAILABLE:
             messagebox.showerror("Missing dependency", "Install requests to use OpenRouter.")
             return
-        if not self.openrouter_api_key:
+        api_key = self.key_store.api_key()
+        if not api_key:
+            self._refresh_openrouter_status()
             messagebox.showerror("OpenRouter", "Unlock or set the API key first.")
             return
         model = self.openrouter_model_var.get().strip() or "openai/gpt-4o-mini"
         prompt = "Reply with the word OK."
         try:
-            result = openrouter_request(self.openrouter_api_key, model, prompt)
+            result = openrouter_request(api_key, model, prompt)
             self._append_output(f"OpenRouter test response: {result}")
         except RuntimeError as exc:
             messagebox.showerror("OpenRouter", str(exc))
 
     def _collect_commit_context(self, repo: str) -> str:
-        _, status_out, _ = run_git(["status", "-s"], repo)
-        _, diff_cached, _ = run_git(["diff", "--cached"], repo)
-        _, diff_working, _ = run_git(["diff"], repo)
-        diff_text = diff_cached or diff_working
-        return build_commit_prompt(status_out, diff_text)
+        return build_commit_prompt(*commit_context(repo))
 
-    def _suggest_commit_message(self):
-        if not REQUESTS_AVAILABLE:
-            messagebox.showerror("Missing dependency", "Install requests to use OpenRouter.")
-            return
-        if not self.openrouter_api_key:
-            messagebox.showerror("OpenRouter", "Unlock or set the API key first.")
+    def _save_ai_wait(self):
+        try:
+            seconds = max(0.0, float(self.ai_wait_var.get()))
+        except (tk.TclError, ValueError):
+            self.ai_wait_var.set(DEFAULT_AI_WAIT_SECONDS)
             return
+        self.store.set_setting(AI_WAIT_SETTING, seconds)
+
+    def _draft_commit_message(self, repo=None):
+        """Fill the commit field with the local draft; returns it ("" if nothing changed)."""
+        repo = repo or self._ensure_repo()
+        if not repo:
+            return ""
+        code, out, err = change_stats(repo)
+        if code != 0:
+            self.status_var.set(err or "Failed to read changes.")
+            return ""
+        draft = draft_commit_message(parse_raw_numstat(out))
+        if not draft:
+            self.status_var.set("No changes to describe.")
+            return ""
+        self.commit_msg_var.set(draft)
+        self.status_var.set("Local draft ready.")
+        return draft
+
+    def _suggest_commit_message(self):
+        from reword import cached_suggestion
+
         repo = self._ensure_repo()
         if not repo:
             return
+        # The local draft is instant and works offline; the AI may replace it below.
+        draft = self._draft_commit_message(repo)
+        if not REQUESTS_AVAILABLE:
+            self.status_var.set("Local draft ready (install requests for AI suggestions).")
+            return
+        api_key = self.key_store.api_key()
+        if not api_key:
+            self._refresh_openrouter_status()
+            self.status_var.set("Local draft ready (unlock the OpenRouter key for AI).")
+            return
         model = self.openrouter_model_var.get().strip() or "openai/gpt-4o-mini"
         prompt = self._collect_commit_context(repo)
-        self._set_busy(True, "Generating commit message...")
+        self._save_ai_wait()
+        deadline = time.monotonic() + float(
+            self.store.get_setting(AI_WAIT_SETTING, DEFAULT_AI_WAIT_SECONDS)
+        )
 
         def worker():
             try:
-                suggestion = openrouter_request(self.openrouter_api_key, model, prompt)
-                self.output_queue.put(("openrouter", ["openrouter"], 0, suggestion, ""))
-                self.commit_msg_var.set(suggestion.strip())
+                suggestion, _ = cached_suggestion(
+                    self.store,
+                    repo,
+                    model,
+                    prompt,
+                    lambda text: openrouter_request(api_key, model, text),
+                )
             except Exception as exc:
-                self.output_queue.put(("openrouter", ["openrouter"], 1, "", str(exc)))
+                self.dispatcher.post(self._append_output, f"OpenRouter failed: {exc}\n")
+                return
+            self.dispatcher.post(self._on_ai_suggestion, draft, suggestion, deadline)
 
         threading.Thread(target=worker, daemon=True).start()
 
-
-def main() -> None:
-    app = GitGui()
+    def _on_ai_suggestion(self, draft, suggestion, deadline):
+        self._append_output(f"AI suggestion: {suggestion}")
+        if time.monotonic() > deadline:
+            self.status_var.set("AI suggestion arrived late; kept the draft (see Output).")
+        elif self.commit_msg_var.get() != draft:
+            self.status_var.set("Commit message was edited; AI suggestion is in Output.")
+        else:
+            self.commit_msg_var.set(suggestion)
+            self.status_var.set("AI suggestion applied.")
+
+
+def _path_from_summary_line(line):
+    """Pull a file path out of a `status -s` or `diff --stat` line, or ""."""
+    stat = re.match(r"^\s*(.+?)\s+\|\s+(\d+|Bin)", line)
+    if stat:
+        return stat.group(1)
+    status = re.match(r"^[ MADRCTU?!]{2} (.+)$", line)
+    if not status:
+        return ""
+    path = status.group(1).split(" -> ")[-1]
+    return path[1:-1] if path.startswith('"') and path.endswith('"') else path
+
+
+def _profile_startup() -> int:
+    """Re-run the GUI under `-X importtime` and print a startup breakdown."""
+    command = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--profile-startup"]
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    imports = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)", line)
+        # Only top-level imports; nested ones are included in their parent.
+        if match and not match.group(3):
+            imports.append((int(match.group(2)), match.group(4)))
+    imports.sort(reverse=True)
+    print("Imports (cumulative):")
+    for micros, name in imports[:15]:
+        print(f"  {name:<28} {micros / 1000:8.1f} ms")
+    print(f"  {'all imports':<28} {sum(m for m, _ in imports) / 1000:8.1f} ms")
+    print("Window:")
+    for line in result.stdout.splitlines():
+        print(f"  {line}")
+    print(f"Process launch to first paint: {wall * 1000:.1f} ms (includes -X importtime overhead)")
+    if result.returncode != 0:
+        print(result.stderr.splitlines()[-1] if result.stderr else "GUI failed to start")
+    return result.returncode
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="cindergrace-git-gui")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print an import-time and first-paint breakdown, then exit",
+    )
+    parser.add_argument(
+        "--dispatch",
+        choices=["event", "poll"],
+        default="event",
+        help="how worker results reach the UI (poll = legacy fixed 200 ms loop)",
+    )
+    parser.add_argument(
+        "--measure-dispatch",
+        type=float,
+        metavar="SECONDS",
+        help="measure idle CPU for SECONDS and result latency, print them, then exit",
+    )
+    args = parser.parse_args(argv)
+    if args.profile_startup and "importtime" not in sys._xoptions:
+        raise SystemExit(_profile_startup())
+    app = GitGui(profile_startup=args.profile_startup, dispatch_mode=args.dispatch)
+    if args.measure_dispatch:
+        app.measure_dispatch(args.measure_dispatch)
     app.mainloop()
 
 
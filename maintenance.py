@@ -0,0 +1,136 @@
+"""Opt-in background maintenance for favorite and profile repositories.
+
+Runs `git maintenance`-style tasks at idle CPU/I/O priority and measures
+the GUI's own read operations (status, history, branches) before and
+after each task, so the report shows what every task actually saved.
+Last runs and reports are kept in the state cache; the per-task latency
+cut is also recorded as a metric for trends.
+"""
+
+import statistics
+import time
+
+from git_ops import CANCELLED, branch_tracking, history_text, is_git_repo, repo_status, run_git
+from storage import MAINTENANCE_ENABLED_SETTING
+
+CACHE_NAMESPACE = "maintenance"
+# Kept in storage so the GUI can read it without importing this module.
+ENABLED_SETTING = MAINTENANCE_ENABLED_SETTING
+PROBE_REPEAT = 3
+DAY = 24 * 3600
+
+# Loose objects are packed before incremental-repack, which needs packs to
+# work on; the commit-graph is written last so it covers everything.
+TASKS = {
+    "pack-refs": ["pack-refs", "--all"],
+    "loose-objects": ["maintenance", "run", "--task=loose-objects"],
+    "incremental-repack": ["maintenance", "run", "--task=incremental-repack"],
+    "commit-graph": ["commit-graph", "write", "--reachable", "--changed-paths"],
+}
+TASK_INTERVALS = {
+    "pack-refs": 7 * DAY,
+    "loose-objects": DAY,
+    "incremental-repack": DAY,
+    "commit-graph": DAY,
+}
+# What the GUI runs on every refresh.
+PROBES = {
+    "status": repo_status,
+    "history": history_text,
+    "branches": lambda repo: branch_tracking(repo, use_cache=False),
+}
+
+
+def measure(repo, repeat=PROBE_REPEAT) -> dict:
+    """Median milliseconds of each probe over `repeat` runs."""
+    timings = {}
+    for name, probe in PROBES.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            probe(repo)
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def due_tasks(store, repo, now=None) -> list[str]:
+    now = time.time() if now is None else now
+    due = []
+    for task, interval in TASK_INTERVALS.items():
+        last = store.cache_get(CACHE_NAMESPACE, repo, task) or {}
+        if now - last.get("finished", 0) >= interval:
+            due.append(task)
+    return due
+
+
+def last_reports(store, repo) -> list[dict]:
+    """Stored report of the latest run of each task, oldest first."""
+    reports = [store.cache_get(CACHE_NAMESPACE, repo, task) for task in TASKS]
+    return sorted((report for report in reports if report), key=lambda r: r["finished"])
+
+
+def latency_cut(report) -> float:
+    """Percent by which the task cut the summed probe latency."""
+    before = sum(report["before"].values())
+    after = sum(report["after"].values())
+    return (before - after) / before * 100 if before else 0.0
+
+
+def run_maintenance(store, repos, cancel=None, should_continue=None, on_report=None, force=False):
+    """Run due tasks (all of them with `force`) for each repo in order.
+
+    `should_continue()` is checked between tasks so the caller can stop
+    when the user comes back; `on_report(report)` gets each finished task.
+    Returns the list of reports.
+    """
+    reports = []
+    for repo in repos:
+        if not is_git_repo(repo):
+            continue
+        tasks = list(TASKS) if force else due_tasks(store, repo)
+        if not tasks:
+            continue
+        timings = measure(repo)
+        for task in tasks:
+            if (cancel is not None and cancel.is_set()) or (
+                should_continue is not None and not should_continue()
+            ):
+                return reports
+            started = time.perf_counter()
+            code, _, err = run_git(TASKS[task], repo, cancel=cancel, low_priority=True)
+            if code == CANCELLED:
+                return reports
+            seconds = time.perf_counter() - started
+            after = measure(repo)
+            report = {
+                "repo": repo,
+                "task": task,
+                "ok": code == 0,
+                "error": err if code != 0 else "",
+                "seconds": seconds,
+                "finished": time.time(),
+                "before": timings,
+                "after": after,
+            }
+            timings = after
+            store.cache_put(CACHE_NAMESPACE, repo, task, report)
+            if code == 0:
+                store.record_metric(f"maintenance.{task}", latency_cut(report), repo)
+            reports.append(report)
+            if on_report is not None:
+                on_report(report)
+    return reports
+
+
+__all__ = [
+    "ENABLED_SETTING",
+    "PROBES",
+    "TASKS",
+    "TASK_INTERVALS",
+    "due_tasks",
+    "last_reports",
+    "latency_cut",
+    "measure",
+    "run_maintenance",
+]
@@ -1,49 +1,123 @@
 """OpenRouter helpers for commit message suggestions."""
 
 import base64
+import importlib.util
 import os
+import threading
+import time
 
-try:
-    from cryptography.fernet import Fernet, InvalidToken
-    from cryptography.hazmat.primitives import hashes
-    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-
-    CRYPTO_AVAILABLE = True
-except ImportError:
-    CRYPTO_AVAILABLE = False
-    Fernet = None
-    InvalidToken = Exception
-    PBKDF2HMAC = None
-    hashes = None
-
-try:
-    import requests
-
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
-    requests = None
+# Availability is checked without importing: cryptography and requests are
+# only loaded on the first OpenRouter action to keep GUI startup fast.
+CRYPTO_AVAILABLE = importlib.util.find_spec("cryptography") is not None
+REQUESTS_AVAILABLE = importlib.util.find_spec("requests") is not None
 
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
-
-def _derive_fernet_key(password: str, salt: bytes) -> bytes:
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=200_000,
-    )
+PAYLOAD_VERSION = 2
+KDF_PBKDF2 = "pbkdf2-sha256"
+KDF_SCRYPT = "scrypt"
+LEGACY_PBKDF2_ITERATIONS = 200_000
+PBKDF2_ITERATIONS = 600_000
+SCRYPT_N = 2**15
+SCRYPT_MAX_N = 2**16
+KEY_IDLE_TIMEOUT_SECONDS = 30 * 60
+
+
+def __getattr__(name):
+    # `InvalidToken` resolves lazily, so it is importable by name but not in __all__.
+    if name == "InvalidToken":
+        if not CRYPTO_AVAILABLE:
+            return Exception
+        from cryptography.fernet import InvalidToken
+
+        return InvalidToken
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def kdf_params(kdf: str = KDF_PBKDF2, **cost) -> dict:
+    """Return KDF parameters for `kdf`, filling in defaults for missing cost values."""
+    if kdf == KDF_PBKDF2:
+        return {"kdf": kdf, "iterations": int(cost.get("iterations", PBKDF2_ITERATIONS))}
+    if kdf == KDF_SCRYPT:
+        return {
+            "kdf": kdf,
+            "n": int(cost.get("n", SCRYPT_N)),
+            "r": int(cost.get("r", 8)),
+            "p": int(cost.get("p", 1)),
+        }
+    raise ValueError(f"Unsupported KDF: {kdf}")
+
+
+def payload_params(payload: dict) -> dict:
+    """Read KDF parameters from a payload; unversioned payloads use legacy PBKDF2."""
+    if payload.get("version", 1) < 2:
+        return kdf_params(KDF_PBKDF2, iterations=LEGACY_PBKDF2_ITERATIONS)
+    return kdf_params(**payload.get("kdf", {}))
+
+
+def _derive_fernet_key(password: str, salt: bytes, params: dict | None = None) -> bytes:
+    params = params or kdf_params(KDF_PBKDF2, iterations=LEGACY_PBKDF2_ITERATIONS)
+    if params["kdf"] == KDF_SCRYPT:
+        from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+        kdf = Scrypt(salt=salt, length=32, n=params["n"], r=params["r"], p=params["p"])
+    else:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=params["iterations"],
+        )
     return base64.urlsafe_b64encode(kdf.derive(password.encode("utf-8")))
 
 
-def encrypt_api_key(api_key: str, password: str) -> dict:
+def calibrate_kdf(kdf: str = KDF_PBKDF2, target_seconds: float = 0.3) -> dict:
+    """Pick a KDF cost that takes about `target_seconds` to unlock on this machine.
+
+    PBKDF2 never drops below the legacy 200,000 iterations; scrypt keeps r=8,
+    p=1 and scales n in powers of two up to 64 MiB of memory.
+    """
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("cryptography is required for encryption")
+    salt = os.urandom(16)
+    if kdf == KDF_PBKDF2:
+        probe = kdf_params(kdf, iterations=20_000)
+        started = time.perf_counter()
+        _derive_fernet_key("calibration", salt, probe)
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        iterations = int(probe["iterations"] * target_seconds / elapsed)
+        iterations = max(LEGACY_PBKDF2_ITERATIONS, iterations // 10_000 * 10_000)
+        return kdf_params(kdf, iterations=iterations)
+    n = 2**12
+    while n < SCRYPT_MAX_N:
+        started = time.perf_counter()
+        _derive_fernet_key("calibration", salt, kdf_params(kdf, n=n))
+        # Cost is linear in n: stop once doubling would overshoot the target.
+        if (time.perf_counter() - started) * 2 > target_seconds:
+            break
+        n *= 2
+    return kdf_params(kdf, n=n)
+
+
+def encrypt_api_key(api_key: str, password: str, params: dict | None = None) -> dict:
     if not CRYPTO_AVAILABLE:
         raise RuntimeError("cryptography is required for encryption")
+    params = params or kdf_params()
     salt = os.urandom(16)
-    key = _derive_fernet_key(password, salt)
+    key = _derive_fernet_key(password, salt, params)
+    return _encrypt_with_key(api_key, key, salt, params)
+
+
+def _encrypt_with_key(api_key: str, key: bytes, salt: bytes, params: dict) -> dict:
+    from cryptography.fernet import Fernet
+
     token = Fernet(key).encrypt(api_key.encode("utf-8"))
     return {
+        "version": PAYLOAD_VERSION,
+        "kdf": params,
         "salt": base64.b64encode(salt).decode("ascii"),
         "token": token.decode("ascii"),
     }
@@ -52,15 +126,89 @@ def encrypt_api_key(api_key: str, password: str) -> dict:
 def decrypt_api_key(payload: dict, password: str) -> str:
     if not CRYPTO_AVAILABLE:
         raise RuntimeError("cryptography is required for encryption")
+    from cryptography.fernet import Fernet
+
     salt = base64.b64decode(payload.get("salt", ""))
     token = payload.get("token", "").encode("ascii")
-    key = _derive_fernet_key(password, salt)
+    key = _derive_fernet_key(password, salt, payload_params(payload))
     return Fernet(key).decrypt(token).decode("utf-8")
 
 
+class KeyStore:
+    """Holds the derived Fernet key for one unlocked session.
+
+    The KDF runs once in `unlock()` or `set_api_key()`; `api_key()` then only
+    does a cheap Fernet decrypt. The key is dropped after `idle_timeout`
+    seconds without use, or by `lock()`.
+    """
+
+    def __init__(self, idle_timeout: float = KEY_IDLE_TIMEOUT_SECONDS):
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._fernet_key: bytes | None = None
+        self._payload: dict | None = None
+        self._last_used = 0.0
+
+    def _expired(self) -> bool:
+        return self.idle_timeout > 0 and time.monotonic() - self._last_used > self.idle_timeout
+
+    def is_unlocked(self) -> bool:
+        with self._lock:
+            if self._fernet_key is not None and self._expired():
+                self._fernet_key = None
+            return self._fernet_key is not None
+
+    def unlock(self, payload: dict, password: str) -> None:
+        """Derive the key for `payload`. Raises InvalidToken on a wrong password."""
+        if not CRYPTO_AVAILABLE:
+            raise RuntimeError("cryptography is required for encryption")
+        from cryptography.fernet import Fernet
+
+        salt = base64.b64decode(payload.get("salt", ""))
+        key = _derive_fernet_key(password, salt, payload_params(payload))
+        Fernet(key).decrypt(payload.get("token", "").encode("ascii"))
+        with self._lock:
+            self._fernet_key = key
+            self._payload = dict(payload)
+            self._last_used = time.monotonic()
+
+    def set_api_key(self, api_key: str, password: str, params: dict | None = None) -> dict:
+        """Encrypt `api_key` with a fresh salt, stay unlocked, return the payload."""
+        if not CRYPTO_AVAILABLE:
+            raise RuntimeError("cryptography is required for encryption")
+        params = params or kdf_params()
+        salt = os.urandom(16)
+        key = _derive_fernet_key(password, salt, params)
+        payload = _encrypt_with_key(api_key, key, salt, params)
+        with self._lock:
+            self._fernet_key = key
+            self._payload = payload
+            self._last_used = time.monotonic()
+        return payload
+
+    def api_key(self) -> str | None:
+        """Return the plaintext key, or None if locked or idle too long."""
+        if not self.is_unlocked():
+            return None
+        from cryptography.fernet import Fernet
+
+        with self._lock:
+            if self._fernet_key is None or self._payload is None:
+                return None
+            self._last_used = time.monotonic()
+            token = self._payload.get("token", "").encode("ascii")
+            return Fernet(self._fernet_key).decrypt(token).decode("utf-8")
+
+    def lock(self) -> None:
+        with self._lock:
+            self._fernet_key = None
+            self._payload = None
+
+
 def openrouter_request(api_key: str, model: str, prompt: str, api_url: str | None = None) -> str:
     if not REQUESTS_AVAILABLE:
         raise RuntimeError("requests is required for OpenRouter calls")
+    import requests
 
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -91,8 +239,15 @@ def openrouter_request(api_key: str, model: str, prompt: str, api_url: str | Non
 __all__ = [
     "CRYPTO_AVAILABLE",
     "REQUESTS_AVAILABLE",
-    "InvalidToken",
     "OPENROUTER_API_URL",
+    "PAYLOAD_VERSION",
+    "KDF_PBKDF2",
+    "KDF_SCRYPT",
+    "KEY_IDLE_TIMEOUT_SECONDS",
+    "KeyStore",
+    "kdf_params",
+    "payload_params",
+    "calibrate_kdf",
     "encrypt_api_key",
     "decrypt_api_key",
     "openrouter_request",
@@ -0,0 +1,117 @@
+"""Bounded in-memory output log that spills old lines to a rotating file."""
+
+import logging
+import logging.handlers
+import os
+import threading
+from collections import deque
+
+OUTPUT_CAPACITY = 5000
+SPILL_MAX_BYTES = 2_000_000
+SPILL_BACKUPS = 3
+SEARCH_LIMIT = 500
+
+
+class OutputLog:
+    """Ring buffer of output lines addressed by absolute line number.
+
+    Line numbers keep counting up as old lines are evicted; `start` is the
+    number of the oldest line still in memory and `end` is one past the
+    newest. Evicted lines are appended to `log_path` (rotated at `max_bytes`
+    with `backups` old files) so they stay searchable.
+    """
+
+    def __init__(
+        self,
+        capacity: int = OUTPUT_CAPACITY,
+        log_path: str | None = None,
+        max_bytes: int = SPILL_MAX_BYTES,
+        backups: int = SPILL_BACKUPS,
+    ):
+        self.capacity = capacity
+        self.log_path = log_path
+        self.backups = backups
+        self._lines: deque[str] = deque()
+        self._start = 0
+        self._lock = threading.Lock()
+        self._spill = None
+        if log_path:
+            handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            # One logger per file, detached from the root logging config.
+            self._spill = logging.getLogger(f"{__name__}.{os.path.abspath(log_path)}")
+            self._spill.propagate = False
+            self._spill.setLevel(logging.INFO)
+            self._spill.handlers = [handler]
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def end(self) -> int:
+        return self._start + len(self._lines)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, text: str) -> None:
+        with self._lock:
+            for line in text.split("\n"):
+                if len(self._lines) >= self.capacity:
+                    evicted = self._lines.popleft()
+                    self._start += 1
+                    if self._spill is not None:
+                        self._spill.info(evicted)
+                self._lines.append(line)
+
+    def slice(self, first: int, last: int) -> list[str]:
+        """Return retained lines with absolute numbers in [first, last)."""
+        with self._lock:
+            first = max(first, self._start) - self._start
+            last = min(last, self.end) - self._start
+            if last <= first:
+                return []
+            return [self._lines[index] for index in range(first, last)]
+
+    def _spill_files(self) -> list[str]:
+        if not self.log_path:
+            return []
+        candidates = [f"{self.log_path}.{n}" for n in range(self.backups, 0, -1)]
+        candidates.append(self.log_path)
+        return [path for path in candidates if os.path.exists(path)]
+
+    def search(self, needle: str, limit: int = SEARCH_LIMIT) -> list[tuple[str, int, str]]:
+        """Case-insensitive search, oldest first: spill files, then memory.
+
+        Returns (source, line number, text); source is a file path or
+        "memory" (with the absolute line number).
+        """
+        needle = needle.lower()
+        matches = []
+        if self._spill is not None:
+            for handler in self._spill.handlers:
+                handler.flush()
+        for path in self._spill_files():
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                for number, line in enumerate(handle, start=1):
+                    if needle in line.lower():
+                        matches.append((path, number, line.rstrip("\n")))
+        with self._lock:
+            retained = list(self._lines)
+            start = self._start
+        for offset, line in enumerate(retained):
+            if needle in line.lower():
+                matches.append(("memory", start + offset, line))
+        return matches[-limit:]
+
+    def close(self) -> None:
+        if self._spill is not None:
+            for handler in self._spill.handlers:
+                handler.close()
+            self._spill.handlers = []
+
+
+__all__ = ["OUTPUT_CAPACITY", "OutputLog"]
@@ -0,0 +1,156 @@
+"""Push and rebase impact previews computed without touching the worktree.
+
+Both previews are generators yielding (section title, text) as each step
+finishes, so a caller on a background thread can show partial results and
+stop early. Every git call takes the caller's cancel event, which kills a
+running process. Commit lists are capped at COMMIT_LIST_LIMIT, and
+patch-id matching (--cherry-pick) is skipped on large ranges, so branches
+thousands of commits apart stay fast.
+"""
+
+from git_ops import CANCELLED, run_git
+
+COMMIT_LIST_LIMIT = 200
+FILE_LIST_LIMIT = 500
+CHERRY_PICK_LIMIT = 2000
+
+
+class PreviewCancelled(Exception):
+    pass
+
+
+def _git(args, repo, cancel):
+    code, out, err = run_git(args, repo, cancel=cancel)
+    if code == CANCELLED:
+        raise PreviewCancelled()
+    return code, out, err
+
+
+def _count(repo, cancel, *range_args):
+    code, out, _ = _git(["rev-list", "--count", *range_args], repo, cancel)
+    return int(out) if code == 0 and out.isdigit() else 0
+
+
+def _limited(lines, limit, noun):
+    if len(lines) <= limit:
+        return "\n".join(lines)
+    return "\n".join(lines[:limit] + [f"... and {len(lines) - limit} more {noun}"])
+
+
+def _commit_list(repo, cancel, total, *range_args):
+    if not total:
+        return "none"
+    _, out, err = _git(
+        ["log", "--oneline", "--no-decorate", f"-n{COMMIT_LIST_LIMIT}", *range_args], repo, cancel
+    )
+    text = out or err
+    if total > COMMIT_LIST_LIMIT:
+        text += f"\n... and {total - COMMIT_LIST_LIMIT} more commits"
+    return text
+
+
+def push_destination(repo, cancel=None):
+    """Remote-tracking ref a plain `git push` updates (`@{push}`), or ""."""
+    code, out, _ = _git(
+        ["rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{push}"], repo, cancel
+    )
+    return out if code == 0 else ""
+
+
+def push_command(repo, remote, cancel=None):
+    """Arguments for the push that `push_preview` describes.
+
+    Plain `git push` when `@{push}` resolves; otherwise the current branch
+    goes to `remote` under its own name.
+    """
+    return ["push"] if push_destination(repo, cancel) else ["push", remote, "HEAD"]
+
+
+def push_preview(repo, remote, cancel=None):
+    """Commits `push_command` would send and the files they touch."""
+    upstream = push_destination(repo, cancel)
+    if upstream:
+        range_args = ["HEAD", f"^{upstream}"]
+        yield "Target", f"HEAD -> {upstream}"
+    else:
+        range_args = ["HEAD", "--not", f"--remotes={remote}"]
+        yield "Target", f"No push destination; HEAD -> '{remote}' under the same branch name"
+
+    ahead = _count(repo, cancel, *range_args)
+    yield "Commits to push", str(ahead)
+    if upstream:
+        behind = _count(repo, cancel, upstream, "^HEAD")
+        if behind:
+            yield (
+                "Warning",
+                f"{upstream} has {behind} commit(s) not in HEAD; the push will be "
+                "rejected unless you pull/rebase first.",
+            )
+    yield "Commits", _commit_list(repo, cancel, ahead, *range_args)
+    if not ahead:
+        return
+
+    if upstream:
+        base = upstream
+    else:
+        # The boundary commit is the parent of the oldest unpushed commit.
+        _, out, _ = _git(["rev-list", "--boundary", *range_args], repo, cancel)
+        boundaries = [line[1:] for line in out.splitlines() if line.startswith("-")]
+        base = boundaries[0] if boundaries else ""
+    if not base:
+        yield "Files", "(root commit; every file is new)"
+        return
+    _, out, err = _git(["diff", "--name-status", f"{base}...HEAD"], repo, cancel)
+    files = out.splitlines()
+    yield f"Files touched ({len(files)})", _limited(files, FILE_LIST_LIMIT, "files") or err
+
+
+def rebase_preview(repo, onto, cancel=None):
+    """Commits `git rebase <onto>` would replay, overlapping files and predicted conflicts."""
+    code, base, err = _git(["merge-base", "HEAD", onto], repo, cancel)
+    if code != 0:
+        yield "Error", err or f"No common ancestor between HEAD and {onto}."
+        return
+    replay = _count(repo, cancel, "--no-merges", f"{onto}..HEAD")
+    incoming = _count(repo, cancel, f"HEAD..{onto}")
+    yield "Summary", f"{replay} commit(s) to replay onto {onto}; {incoming} new commit(s) there."
+    if not replay:
+        yield "Result", "Nothing to replay; the rebase is a fast-forward."
+        return
+
+    range_args = ["--no-merges", f"{onto}..HEAD"]
+    if replay + incoming <= CHERRY_PICK_LIMIT:
+        # Hide commits whose patch is already upstream, as rebase would skip them.
+        range_args = ["--no-merges", "--cherry-pick", "--right-only", f"{onto}...HEAD"]
+    yield "Commits to replay", _commit_list(repo, cancel, replay, *range_args)
+
+    _, ours, _ = _git(["diff", "--name-only", base, "HEAD"], repo, cancel)
+    _, theirs, _ = _git(["diff", "--name-only", base, onto], repo, cancel)
+    ours_set = set(ours.splitlines())
+    both = sorted(ours_set & set(theirs.splitlines()))
+    overlap = _limited(both, FILE_LIST_LIMIT, "files") or "none"
+    yield f"Files changed on both sides ({len(both)})", overlap
+
+    code, out, err = _git(
+        ["merge-tree", "--write-tree", "--name-only", "--no-messages", onto, "HEAD"], repo, cancel
+    )
+    if code == 0:
+        yield "Predicted conflicts", "none (three-way merge of the end states is clean)"
+    elif code == 1:
+        conflicted = out.splitlines()[1:]
+        yield (
+            f"Predicted conflicts ({len(conflicted)})",
+            _limited(conflicted, FILE_LIST_LIMIT, "files"),
+        )
+    else:
+        yield "Predicted conflicts", f"unavailable (needs git 2.38+): {err}"
+
+
+__all__ = [
+    "COMMIT_LIST_LIMIT",
+    "PreviewCancelled",
+    "push_command",
+    "push_destination",
+    "push_preview",
+    "rebase_preview",
+]
@@ -1,15 +1,20 @@
 """Commit message prompt builder."""
 
+STATUS_BUDGET = 2000
+DIFF_BUDGET = 8000
 
-def build_commit_prompt(status_out: str, diff_text: str) -> str:
-    status_trimmed = (status_out or "")[:2000]
-    diff_trimmed = (diff_text or "")[:8000]
+
+def build_commit_prompt(status_out: str, diff_text: str, current_message: str = "") -> str:
+    status_trimmed = (status_out or "")[:STATUS_BUDGET]
+    diff_trimmed = (diff_text or "")[:DIFF_BUDGET]
+    current = f"Current message:\n{current_message[:500]}\n\n" if current_message else ""
     return (
         "Generate a short git commit message (max 72 chars).\n"
         "Use imperative mood. No quotes. No trailing period.\n\n"
+        f"{current}"
         f"Changed files:\n{status_trimmed}\n\n"
         f"Diff (truncated):\n{diff_trimmed}"
     )
 
 
-__all__ = ["build_commit_prompt"]
+__all__ = ["DIFF_BUDGET", "STATUS_BUDGET", "build_commit_prompt"]
@@ -0,0 +1,203 @@
+"""Repository size report: largest blobs and heaviest directories over history.
+
+Everything is streamed line by line with bounded state (a top-N heap of
+blobs, one counter per directory), so memory does not grow with the object
+count. Three passes run over the object database:
+
+1. `cat-file --batch-all-objects --batch-check` for per-type totals and the
+   largest blobs (including unreachable ones),
+2. `rev-list --objects --all | cat-file --batch-check` for each reachable
+   blob's path, summed into directories,
+3. `log --all --raw` to find the commit that introduced each large blob.
+
+`count-objects -v` supplies the loose/pack summary. A finished report is
+cached per pack set (pack names and sizes plus the loose object count), so
+reopening the analyzer is instant until objects are added or repacked.
+"""
+
+import hashlib
+import heapq
+import os
+import time
+
+from git_ops import run_git, stream_git, stream_pipe
+
+CACHE_NAMESPACE = "repo_size"
+TOP_BLOBS = 25
+TOP_DIRECTORIES = 25
+PROGRESS_EVERY = 50_000
+BATCH_CHECK = "--batch-check=%(objecttype) %(objectname) %(objectsize) %(objectsize:disk)"
+
+
+def count_objects(repo):
+    """Return (code, {key: int}, stderr) from `count-objects -v` (sizes in KiB)."""
+    code, out, err = run_git(["count-objects", "-v"], repo)
+    if code != 0:
+        return code, {}, err
+    stats = {}
+    for line in out.splitlines():
+        key, _, value = line.partition(": ")
+        if value.strip().isdigit():
+            stats[key] = int(value)
+    return code, stats, err
+
+
+def pack_signature(repo, stats) -> str:
+    """Identify the current pack set and loose object count."""
+    code, pack_dir, _ = run_git(["rev-parse", "--git-path", "objects/pack"], repo)
+    pack_dir = os.path.join(repo, pack_dir) if code == 0 else ""
+    packs = []
+    try:
+        with os.scandir(pack_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".pack"):
+                    packs.append(f"{entry.name}:{entry.stat().st_size}")
+    except OSError:
+        pass
+    parts = sorted(packs) + [f"loose:{stats.get('count', 0)}:{stats.get('size', 0)}"]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def human_size(size) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return ""
+
+
+def _scan_objects(repo, top, on_progress, cancel):
+    totals: dict[str, dict] = {}
+    heap: list[tuple[int, str, int]] = []
+    seen = 0
+
+    def on_line(line):
+        nonlocal seen
+        parts = line.split()
+        if len(parts) != 4:
+            return
+        kind, oid, size, disk = parts[0], parts[1], int(parts[2]), int(parts[3])
+        entry = totals.setdefault(kind, {"count": 0, "size": 0, "disk": 0})
+        entry["count"] += 1
+        entry["size"] += size
+        entry["disk"] += disk
+        if kind == "blob":
+            item = (size, oid, disk)
+            if len(heap) < top:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+        seen += 1
+        if seen % PROGRESS_EVERY == 0:
+            on_progress(f"{seen} objects scanned...")
+
+    args = ["cat-file", "--batch-all-objects", "--unordered", BATCH_CHECK]
+    code, _, err = stream_git(args, repo, on_line, cancel)
+    blobs = [
+        {"oid": oid, "size": size, "disk": disk, "path": "", "commit": "", "subject": ""}
+        for size, oid, disk in sorted(heap, reverse=True)
+    ]
+    return code, totals, blobs, err
+
+
+def _scan_paths(repo, blobs, top, cancel):
+    by_oid = {blob["oid"]: blob for blob in blobs}
+    directories: dict[str, list[int]] = {}
+
+    def on_line(line):
+        parts = line.split(" ", 3)
+        if len(parts) != 4 or parts[0] != "blob":
+            return
+        _, oid, disk, path = parts
+        if oid in by_oid and not by_oid[oid]["path"]:
+            by_oid[oid]["path"] = path
+        directory = os.path.dirname(path)
+        while directory:
+            totals = directories.setdefault(directory, [0, 0])
+            totals[0] += int(disk)
+            totals[1] += 1
+            directory = os.path.dirname(directory)
+
+    code, _, err = stream_pipe(
+        ["rev-list", "--objects", "--all"],
+        ["cat-file", "--batch-check=%(objecttype) %(objectname) %(objectsize:disk) %(rest)"],
+        repo,
+        on_line,
+        cancel,
+    )
+    heaviest = heapq.nlargest(top, directories.items(), key=lambda item: item[1][0])
+    return code, [{"path": p, "disk": d, "blobs": n} for p, (d, n) in heaviest], err
+
+
+def _scan_introductions(repo, blobs, cancel):
+    by_oid = {blob["oid"]: blob for blob in blobs}
+    current = ["", ""]
+
+    def on_line(line):
+        if line.startswith("\x00"):
+            _, commit, subject = line.split("\x00", 2)
+            current[:] = [commit, subject]
+        elif line.startswith(":"):
+            oid = line.split("\t", 1)[0].split()[3]
+            # Newest first: the last commit that added the blob is the oldest one.
+            if oid in by_oid:
+                by_oid[oid]["commit"], by_oid[oid]["subject"] = current
+
+    args = [
+        "log",
+        "--all",
+        "--format=%x00%H%x00%s",
+        "--raw",
+        "--no-abbrev",
+        "--no-renames",
+        "--diff-filter=AMT",
+    ]
+    code, _, err = stream_git(args, repo, on_line, cancel)
+    return code, err
+
+
+def analyze(repo, store=None, on_progress=None, cancel=None, force=False):
+    """Return (code, report, stderr); `report` is cached per pack set in `store`."""
+    code, stats, err = count_objects(repo)
+    if code != 0:
+        return code, {}, err
+    signature = pack_signature(repo, stats)
+    if store is not None and not force:
+        cached = store.cache_get(CACHE_NAMESPACE, repo, "report")
+        if cached and cached.get("signature") == signature:
+            return 0, {**cached, "cached": True}, ""
+    progress = on_progress or (lambda _text: None)
+    started = time.perf_counter()
+    progress("Scanning objects...")
+    code, totals, blobs, err = _scan_objects(repo, TOP_BLOBS, progress, cancel)
+    if code != 0:
+        return code, {}, err
+    progress("Mapping blobs to paths...")
+    code, directories, err = _scan_paths(repo, blobs, TOP_DIRECTORIES, cancel)
+    if code != 0:
+        return code, {}, err
+    progress("Finding introducing commits...")
+    code, err = _scan_introductions(repo, blobs, cancel)
+    if code != 0:
+        return code, {}, err
+    report = {
+        "signature": signature,
+        "generated": time.time(),
+        "seconds": time.perf_counter() - started,
+        "count_objects": stats,
+        "types": totals,
+        "blobs": blobs,
+        "directories": directories,
+    }
+    if store is not None:
+        store.cache_put(CACHE_NAMESPACE, repo, "report", report)
+    return 0, {**report, "cached": False}, ""
+
+
+__all__ = [
+    "CACHE_NAMESPACE",
+    "analyze",
+    "count_objects",
+    "human_size",
+    "pack_signature",
+]
@@ -0,0 +1,318 @@
+"""AI commit messages for a range of commits and a one-shot message rewrite.
+
+One `git log -p --stat` over the range is streamed in the background; each
+commit's prompt is cut to the prompt budget while it streams (memory stays
+bounded per commit) and is handed to a thread pool as soon as it is
+complete, so requests overlap with reading history. Requests go through a
+shared rate limiter and a suggestion cache keyed by model and prompt.
+
+Approved messages are applied without a rebase: every commit in the range
+is re-written with `hash-object` from its raw object (author, committer,
+dates and trees unchanged, parents remapped) and the branch is moved with
+one `update-ref`. Only the subject is replaced; the body and trailers are
+kept, and objects are handled as bytes so other encodings survive. Trees
+do not change, so worktree and index stay valid.
+"""
+
+import codecs
+import contextlib
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from git_ops import CANCELLED, run_git, stream_git
+from prompt_builder import DIFF_BUDGET, STATUS_BUDGET, build_commit_prompt
+
+CACHE_NAMESPACE = "ai_suggestions"
+DEFAULT_WORKERS = 4
+DEFAULT_PER_MINUTE = 600
+MARKER = "\x00"
+SIGNATURE_HEADERS = (b"gpgsig ", b"gpgsig-sha256 ")
+
+
+@dataclass
+class RangeCommit:
+    commit: str
+    subject: str
+    prompt: str = ""
+
+
+class RateLimiter:
+    """Token bucket shared across threads: `burst` calls at once, then per_minute.
+
+    Tokens refill at per_minute / 60 per second up to `burst`; a call that
+    finds none reserves the next one and sleeps until it is due.
+    """
+
+    def __init__(self, per_minute=DEFAULT_PER_MINUTE, burst=DEFAULT_WORKERS):
+        self.rate = per_minute / 60.0 if per_minute > 0 else 0.0
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def wait(self, cancel=None) -> bool:
+        """Block until a token is available; False when cancelled meanwhile."""
+        if not self.rate:
+            return cancel is None or not cancel.is_set()
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if cancel is not None:
+            return not cancel.wait(delay) if delay > 0 else not cancel.is_set()
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+
+class _PromptCollector:
+    """Turns streamed `log --format=%x00%H%x00%s --stat -p` lines into prompts."""
+
+    def __init__(self, on_commit):
+        self.on_commit = on_commit
+        self.current = None
+        self.stat: list[str] = []
+        self.diff: list[str] = []
+        self.sizes = [0, 0]
+
+    def _add(self, part, lines, text, budget):
+        if self.sizes[part] < budget:
+            lines.append(text)
+            self.sizes[part] += len(text) + 1
+
+    def line(self, text):
+        if text.startswith(MARKER):
+            self.flush()
+            _, commit, subject = text.split(MARKER, 2)
+            self.current = RangeCommit(commit, subject)
+        elif self.current is None:
+            return
+        elif self.diff or text.startswith("diff --git "):
+            self._add(1, self.diff, text, DIFF_BUDGET)
+        elif text.strip() and text != "---":
+            self._add(0, self.stat, text, STATUS_BUDGET)
+
+    def flush(self):
+        if self.current is not None:
+            commit = self.current
+            commit.prompt = build_commit_prompt(
+                "\n".join(self.stat), "\n".join(self.diff), commit.subject
+            )
+            self.on_commit(commit)
+        self.current = None
+        self.stat, self.diff, self.sizes = [], [], [0, 0]
+
+
+def list_range(repo, base):
+    """Return (code, [RangeCommit], stderr) for base..HEAD, oldest first, without prompts."""
+    code, out, err = run_git(
+        ["log", "--reverse", "--topo-order", "--format=%H%x00%s", f"{base}..HEAD", "--"], repo
+    )
+    if code != 0:
+        return code, [], err
+    commits = [RangeCommit(*line.split("\x00", 1)) for line in out.splitlines() if "\x00" in line]
+    return code, commits, err
+
+
+def stream_prompts(repo, base, on_commit, cancel=None):
+    """Call `on_commit(RangeCommit)` for each commit in base..HEAD, oldest first."""
+    collector = _PromptCollector(on_commit)
+    code, out, err = stream_git(
+        [
+            "log",
+            "--reverse",
+            "--topo-order",
+            "--no-color",
+            "--stat",
+            "-p",
+            "--format=%x00%H%x00%s",
+            f"{base}..HEAD",
+            "--",
+        ],
+        repo,
+        collector.line,
+        cancel,
+    )
+    if code == 0:
+        collector.flush()
+    return code, out, err
+
+
+def suggestion_key(model, prompt) -> str:
+    return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+
+def cached_suggestion(store, repo, model, prompt, request, limiter=None, cancel=None):
+    """Return (message, cached); `request(prompt)` only runs on a cache miss."""
+    key = suggestion_key(model, prompt)
+    if store is not None:
+        hit = store.cache_get(CACHE_NAMESPACE, repo, key)
+        if hit:
+            return hit, True
+    if limiter is not None and not limiter.wait(cancel):
+        return "", False
+    message = request(prompt).strip()
+    if store is not None and message:
+        store.cache_put(CACHE_NAMESPACE, repo, key, message)
+    return message, False
+
+
+def suggest_range(
+    repo,
+    base,
+    request,
+    model,
+    on_result,
+    store=None,
+    cancel=None,
+    workers=DEFAULT_WORKERS,
+    per_minute=DEFAULT_PER_MINUTE,
+):
+    """Suggest a message for every commit in base..HEAD.
+
+    `on_result(RangeCommit, message, cached, error)` is called from worker
+    threads. Returns (code, stderr) of the history read; requests already
+    started are awaited.
+    """
+    limiter = RateLimiter(per_minute, burst=workers)
+    futures = []
+
+    def ask(commit):
+        if cancel is not None and cancel.is_set():
+            return
+        try:
+            message, cached = cached_suggestion(
+                store, repo, model, commit.prompt, request, limiter, cancel
+            )
+        except Exception as exc:
+            on_result(commit, "", False, str(exc))
+            return
+        if cancel is None or not cancel.is_set():
+            on_result(commit, message, cached, "")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        code, _, err = stream_prompts(
+            repo, base, lambda commit: futures.append(pool.submit(ask, commit)), cancel
+        )
+        wait(futures)
+    return code, err
+
+
+def _known_encoding(name):
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def _replace_subject(body, subject, encoding):
+    """Swap the first paragraph of `body`; returns (message, keep encoding header)."""
+    _, sep, rest = body.partition(b"\n\n")
+    codec = _known_encoding(encoding)
+    new = None
+    if codec:
+        with contextlib.suppress(UnicodeEncodeError):
+            new = subject.encode(codec)
+    keep = new is not None
+    if not keep:
+        # The subject does not fit the commit's encoding: move the rest to UTF-8.
+        rest = rest.decode(codec or "utf-8", errors="replace").encode()
+        new = subject.encode()
+    return (new + sep + rest if rest else new + b"\n"), keep
+
+
+def _rewrite_raw(raw, parents, subject):
+    """Rebuild raw commit bytes with new parents and, if given, a new subject."""
+    headers, _, body = raw.partition(b"\n\n")
+    encoding = "utf-8"
+    for line in headers.split(b"\n"):
+        if line.startswith(b"encoding "):
+            encoding = line[9:].decode("ascii", errors="replace")
+    keep_encoding = True
+    # Only a subject is replaced: extra lines of a suggestion must not become the body.
+    subject = next((line.strip() for line in subject.splitlines() if line.strip()), "")
+    if subject:
+        body, keep_encoding = _replace_subject(body, subject, encoding)
+    lines = []
+    skipping = False
+    for line in headers.split(b"\n"):
+        if skipping and line.startswith(b" "):
+            continue
+        # Signatures no longer match the rewritten commit; drop them like rebase does.
+        skipping = line.startswith(SIGNATURE_HEADERS)
+        if skipping or line.startswith(b"parent "):
+            continue
+        if line.startswith(b"encoding ") and not keep_encoding:
+            continue
+        lines.append(line)
+        if line.startswith(b"tree "):
+            lines.extend(f"parent {parent}".encode() for parent in parents)
+    return b"\n".join(lines) + b"\n\n" + body
+
+
+def rewrite_messages(repo, base, messages, cancel=None):
+    """Replace commit subjects in base..HEAD; `messages` maps commit id -> subject.
+
+    Returns (code, new HEAD, stderr). Fails without touching refs when HEAD
+    moved meanwhile or a commit in `messages` is not in the range.
+    """
+    code, head, err = run_git(["rev-parse", "--verify", "HEAD"], repo)
+    if code != 0:
+        return code, "", err
+    code, out, err = run_git(
+        ["rev-list", "--reverse", "--topo-order", "--parents", f"{base}..{head}"], repo
+    )
+    if code != 0:
+        return code, "", err
+    rows = [line.split() for line in out.splitlines()]
+    missing = set(messages) - {row[0] for row in rows}
+    if missing:
+        return 1, "", f"Not in {base}..HEAD: {', '.join(sorted(missing))}"
+    mapping: dict[str, str] = {}
+    for commit, *parents in rows:
+        if cancel is not None and cancel.is_set():
+            return CANCELLED, "", "cancelled"
+        new_parents = [mapping.get(parent, parent) for parent in parents]
+        if commit not in messages and new_parents == parents:
+            mapping[commit] = commit
+            continue
+        code, raw, err = run_git(["cat-file", "commit", commit], repo, text=False)
+        if code != 0:
+            return code, "", err
+        message = _rewrite_raw(raw, new_parents, messages.get(commit, ""))
+        code, new_commit, err = run_git(
+            ["hash-object", "-t", "commit", "-w", "--stdin"], repo, cancel, input=message
+        )
+        if code != 0:
+            return code, "", err
+        mapping[commit] = new_commit
+    new_head = mapping.get(head, head)
+    if new_head == head:
+        return 0, head, ""
+    code, ref, _ = run_git(["symbolic-ref", "-q", "HEAD"], repo)
+    target = ref if code == 0 and ref else "HEAD"
+    args = ["update-ref", "-m", f"reword {len(messages)} commit(s)", target, new_head, head]
+    if target == "HEAD":
+        args.insert(1, "--no-deref")
+    code, _, err = run_git(args, repo)
+    if code != 0:
+        return code, "", err
+    return 0, new_head, ""
+
+
+__all__ = [
+    "CACHE_NAMESPACE",
+    "RangeCommit",
+    "RateLimiter",
+    "cached_suggestion",
+    "list_range",
+    "rewrite_messages",
+    "stream_prompts",
+    "suggest_range",
+    "suggestion_key",
+]
@@ -0,0 +1,151 @@
+"""Stash listing, lazily loaded stash diffs and apply-cleanly prediction.
+
+The list comes from a single `git stash list` call. Diffstat and patch of
+an entry are only read when it is selected and are cached by stash commit
+id, which never changes for a given stash. Whether a stash would apply
+cleanly is predicted with `git merge-tree --write-tree` using the stash's
+base commit as merge base (what `git stash apply` does), so nothing in the
+worktree or index is touched.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from git_ops import CANCELLED, run_git
+
+DIFF_CACHE_SIZE = 64
+LIST_FORMAT = "--format=%H%x00%gd%x00%ct%x00%gs"
+# Identity for the throwaway commits merge-tree needs on git < 2.40.
+CHECK_IDENTITY = ["-c", "user.name=stash-check", "-c", "user.email=stash-check@localhost"]
+
+_cache_lock = threading.Lock()
+_diff_cache: OrderedDict[tuple[str, str], tuple[str, str]] = OrderedDict()
+_merge_base_option: bool | None = None
+
+
+@dataclass
+class Stash:
+    commit: str
+    ref: str
+    time: int
+    subject: str
+
+
+def list_stashes(repo):
+    """Return (code, [Stash], stderr), newest first."""
+    code, out, err = run_git(["stash", "list", LIST_FORMAT], repo)
+    if code != 0:
+        return code, [], err
+    stashes = []
+    for line in out.splitlines():
+        parts = line.split("\x00")
+        if len(parts) == 4:
+            commit, ref, when, subject = parts
+            stashes.append(Stash(commit, ref, int(when or 0), subject))
+    return code, stashes, err
+
+
+def stash_diff(repo, commit):
+    """Return (code, diffstat, patch) for a stash commit, cached by commit id.
+
+    On failure the patch slot holds git's error message.
+    """
+    key = (repo, commit)
+    with _cache_lock:
+        if key in _diff_cache:
+            _diff_cache.move_to_end(key)
+            return 0, *_diff_cache[key]
+    code, stat, err = run_git(["stash", "show", "--stat", commit], repo)
+    if code != 0:
+        return code, "", err
+    code, patch, err = run_git(["stash", "show", "-p", commit], repo)
+    if code != 0:
+        return code, stat, err
+    with _cache_lock:
+        _diff_cache[key] = (stat, patch)
+        while len(_diff_cache) > DIFF_CACHE_SIZE:
+            _diff_cache.popitem(last=False)
+    return 0, stat, patch
+
+
+def _merge_tree(repo, base, ours, theirs, cancel):
+    global _merge_base_option
+    args = ["merge-tree", "--write-tree", "--name-only", "--no-messages"]
+    if _merge_base_option is not False:
+        code, out, err = run_git([*args, f"--merge-base={base}", ours, theirs], repo, cancel)
+        if code != 129:
+            _merge_base_option = True
+            return code, out, err
+        _merge_base_option = False
+    # Older git picks the merge base itself: give both sides `base` as the
+    # only parent so it is the merge base. The commits stay unreferenced.
+    sides = []
+    for tree in (f"{ours}^{{tree}}", f"{theirs}^{{tree}}"):
+        code, out, err = run_git(
+            [*CHECK_IDENTITY, "commit-tree", tree, "-p", base, "-m", "stash check"], repo, cancel
+        )
+        if code != 0:
+            return code, out, err
+        sides.append(out)
+    return run_git([*args, *sides], repo, cancel)
+
+
+def apply_check(repo, stash, cancel=None):
+    """Predict `git stash apply` onto HEAD: (status, conflicted paths).
+
+    status is "clean", "conflicts", "cancelled" or "unknown" (an error).
+    Local uncommitted changes are not considered.
+    """
+    code, out, _ = _merge_tree(repo, f"{stash.commit}^1", "HEAD", stash.commit, cancel)
+    if code == 0:
+        return "clean", []
+    if code == 1:
+        return "conflicts", out.splitlines()[1:]
+    return ("cancelled" if code == CANCELLED else "unknown"), []
+
+
+def check_all(repo, stashes, on_result, cancel=None):
+    """Run `apply_check` for each stash in order, reporting `on_result(stash, status, paths)`."""
+    for stash in stashes:
+        if cancel is not None and cancel.is_set():
+            return
+        status, paths = apply_check(repo, stash, cancel)
+        if status != "cancelled":
+            on_result(stash, status, paths)
+
+
+def _current_ref(repo, stash):
+    # stash@{n} shifts when other entries are dropped; find this commit's ref now.
+    code, stashes, err = list_stashes(repo)
+    if code != 0:
+        return "", err
+    for entry in stashes:
+        if entry.commit == stash.commit:
+            return entry.ref, ""
+    return "", "Stash no longer exists."
+
+
+def apply_stash(repo, stash):
+    ref, err = _current_ref(repo, stash)
+    if not ref:
+        return 1, "", err
+    return run_git(["stash", "apply", ref], repo)
+
+
+def drop_stash(repo, stash):
+    ref, err = _current_ref(repo, stash)
+    if not ref:
+        return 1, "", err
+    return run_git(["stash", "drop", ref], repo)
+
+
+__all__ = [
+    "Stash",
+    "apply_check",
+    "apply_stash",
+    "check_all",
+    "drop_stash",
+    "list_stashes",
+    "stash_diff",
+]
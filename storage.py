@@ -1,9 +1,22 @@
-"""JSON storage helpers for favorites and profiles."""
+"""JSON and SQLite storage helpers for favorites, profiles and caches."""
 
+import contextlib
 import json
 import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Callable
 from typing import Any
 
+FAVORITES_PATH = os.path.expanduser("~/.cindergrace_git_gui_favorites.json")
+PROFILES_PATH = os.path.expanduser("~/.cindergrace_git_gui_profiles.json")
+OPENROUTER_CONFIG_PATH = os.path.expanduser("~/.cindergrace_git_gui_openrouter.json")
+STATE_DB_PATH = os.path.expanduser("~/.cindergrace_git_gui.sqlite3")
+OPENROUTER_KEY_SETTING = "openrouter"
+MAINTENANCE_ENABLED_SETTING = "maintenance_enabled"
+
 
 def load_json(path: str, default: Any):
     if not os.path.exists(path):
@@ -17,28 +30,51 @@ def load_json(path: str, default: Any):
 
 
 def save_json(path: str, data: Any) -> None:
-    with open(path, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2)
+    """Write JSON atomically: temp file in the same folder, fsync, rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=2)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        with contextlib.suppress(OSError):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
 
 
-def load_list(path: str) -> list:
-    data = load_json(path, [])
+def clean_list(data: Any) -> list:
     if not isinstance(data, list):
         return []
-    return [item for item in data if isinstance(item, str)]
-
-
-def save_list(path: str, items: list) -> None:
     seen = set()
     cleaned = []
-    for item in items:
+    for item in data:
         if not isinstance(item, str):
             continue
         if item in seen:
             continue
         seen.add(item)
         cleaned.append(item)
-    save_json(path, cleaned)
+    return cleaned
+
+
+def load_list(path: str) -> list:
+    return clean_list(load_json(path, []))
+
+
+def save_list(path: str, items: list) -> None:
+    save_json(path, clean_list(items))
 
 
 def load_profiles(path: str) -> dict:
@@ -50,11 +86,313 @@ def save_profiles(path: str, profiles: dict) -> None:
     save_json(path, profiles)
 
 
+def _migrate_v1(conn: sqlite3.Connection) -> None:
+    # Plain execute() per statement: executescript() would COMMIT the
+    # surrounding migration transaction.
+    for statement in (
+        "CREATE TABLE favorites (path TEXT PRIMARY KEY, position INTEGER NOT NULL)",
+        "CREATE TABLE profiles (name TEXT PRIMARY KEY, path TEXT NOT NULL DEFAULT '', "
+        "data TEXT NOT NULL)",
+        "CREATE INDEX profiles_path ON profiles (path)",
+        "CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "CREATE TABLE cache (namespace TEXT NOT NULL, repo TEXT NOT NULL, key TEXT NOT NULL, "
+        "value TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (namespace, repo, key)) "
+        "WITHOUT ROWID",
+        "CREATE TABLE metrics (id INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+        "repo TEXT NOT NULL DEFAULT '', value REAL NOT NULL, recorded_at REAL NOT NULL)",
+        "CREATE INDEX metrics_name ON metrics (name, recorded_at)",
+    ):
+        conn.execute(statement)
+
+
+def _migrate_v2(conn: sqlite3.Connection) -> None:
+    # Path -> commit index for file history. `seq` orders commits within a
+    # repo topologically (children above parents); see file_history.py.
+    for statement in (
+        "CREATE TABLE path_index_state (repo TEXT PRIMARY KEY, tip TEXT NOT NULL, "
+        "complete INTEGER NOT NULL, min_seq INTEGER NOT NULL, max_seq INTEGER NOT NULL)",
+        "CREATE TABLE path_index_commits (repo TEXT NOT NULL, seq INTEGER NOT NULL, "
+        "commit_id TEXT NOT NULL, time INTEGER NOT NULL, author TEXT NOT NULL, "
+        "summary TEXT NOT NULL, PRIMARY KEY (repo, seq)) WITHOUT ROWID",
+        "CREATE TABLE path_index (repo TEXT NOT NULL, path TEXT NOT NULL, "
+        "seq INTEGER NOT NULL, status TEXT NOT NULL, old_path TEXT NOT NULL DEFAULT '', "
+        "PRIMARY KEY (repo, path, seq)) WITHOUT ROWID",
+    ):
+        conn.execute(statement)
+
+
+# Append new migrations here; the list index + 1 is the schema version.
+MIGRATIONS: list[Callable[[sqlite3.Connection], None]] = [_migrate_v1, _migrate_v2]
+
+
+class StateStore:
+    """Single SQLite database (WAL mode) for all persistent GUI state.
+
+    Schema upgrades run from `MIGRATIONS` keyed on `PRAGMA user_version`.
+    On first open, favorites, profiles and settings are imported from the
+    legacy JSON files given in `legacy_paths` (keys: "favorites",
+    "profiles", and any other name, which is stored as a setting). The JSON
+    files are left in place.
+    """
+
+    def __init__(self, path: str, legacy_paths: dict[str, str] | None = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._migrate()
+        if legacy_paths:
+            self._import_legacy(legacy_paths)
+        self._data_version = self._current_data_version()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _migrate(self) -> None:
+        with self._transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for index in range(version, len(MIGRATIONS)):
+                MIGRATIONS[index](conn)
+                conn.execute(f"PRAGMA user_version={index + 1}")
+
+    @property
+    def schema_version(self) -> int:
+        return self._query("PRAGMA user_version")[0][0]
+
+    def _import_legacy(self, legacy_paths: dict[str, str]) -> None:
+        if self.get_setting("legacy_json_imported"):
+            return
+        favorites = load_list(legacy_paths["favorites"]) if "favorites" in legacy_paths else []
+        profiles = load_profiles(legacy_paths["profiles"]) if "profiles" in legacy_paths else {}
+        with self._transaction() as conn:
+            for position, path in enumerate(favorites):
+                conn.execute(
+                    "INSERT OR IGNORE INTO favorites (path, position) VALUES (?, ?)",
+                    (path, position),
+                )
+            for name, profile in profiles.items():
+                if isinstance(profile, dict):
+                    conn.execute(
+                        "INSERT OR IGNORE INTO profiles (name, path, data) VALUES (?, ?, ?)",
+                        (name, profile.get("path", ""), json.dumps(profile)),
+                    )
+            for key, path in legacy_paths.items():
+                if key in ("favorites", "profiles"):
+                    continue
+                value = load_json(path, None)
+                if value is not None:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+                        (key, json.dumps(value)),
+                    )
+            conn.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                ("legacy_json_imported", json.dumps(True)),
+            )
+
+    def _current_data_version(self) -> int:
+        return self._query("PRAGMA data_version")[0][0]
+
+    def changed(self) -> bool:
+        """Return True once after another connection committed changes."""
+        with self._lock:
+            version = self._current_data_version()
+            changed = version != self._data_version
+            self._data_version = version
+            return changed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def favorites(self) -> list:
+        rows = self._query("SELECT path FROM favorites ORDER BY position, path")
+        return [row[0] for row in rows]
+
+    def add_favorite(self, path: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO favorites (path, position) "
+                "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM favorites))",
+                (path,),
+            )
+
+    def remove_favorite(self, path: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM favorites WHERE path = ?", (path,))
+
+    def profiles(self) -> dict:
+        rows = self._query("SELECT name, data FROM profiles ORDER BY name")
+        return {name: json.loads(data) for name, data in rows}
+
+    def get_profile(self, name: str) -> dict | None:
+        rows = self._query("SELECT data FROM profiles WHERE name = ?", (name,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def profiles_for_path(self, path: str) -> dict:
+        rows = self._query("SELECT name, data FROM profiles WHERE path = ?", (path,))
+        return {name: json.loads(data) for name, data in rows}
+
+    def save_profile(self, name: str, profile: dict) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles (name, path, data) VALUES (?, ?, ?)",
+                (name, profile.get("path", ""), json.dumps(profile)),
+            )
+
+    def delete_profile(self, name: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM profiles WHERE name = ?", (name,))
+
+    def get_setting(self, key: str, default: Any = None):
+        rows = self._query("SELECT value FROM settings WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else default
+
+    def set_setting(self, key: str, value: Any) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                (key, json.dumps(value)),
+            )
+
+    def delete_setting(self, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM settings WHERE key = ?", (key,))
+
+    def cache_get(self, namespace: str, repo: str, key: str, default: Any = None):
+        rows = self._query(
+            "SELECT value FROM cache WHERE namespace = ? AND repo = ? AND key = ?",
+            (namespace, repo, key),
+        )
+        return json.loads(rows[0][0]) if rows else default
+
+    def cache_put(self, namespace: str, repo: str, key: str, value: Any) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, repo, key, value, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, repo, key, json.dumps(value), time.time()),
+            )
+
+    def cache_clear(self, namespace: str, repo: str | None = None) -> None:
+        with self._transaction() as conn:
+            if repo is None:
+                conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND repo = ?", (namespace, repo)
+                )
+
+    def path_index_state(self, repo: str) -> dict | None:
+        rows = self._query(
+            "SELECT tip, complete, min_seq, max_seq FROM path_index_state WHERE repo = ?", (repo,)
+        )
+        if not rows:
+            return None
+        tip, complete, min_seq, max_seq = rows[0]
+        return {"tip": tip, "complete": bool(complete), "min_seq": min_seq, "max_seq": max_seq}
+
+    def path_index_reset(self, repo: str) -> None:
+        with self._transaction() as conn:
+            for table in ("path_index_state", "path_index_commits", "path_index"):
+                conn.execute(f"DELETE FROM {table} WHERE repo = ?", (repo,))
+
+    def path_index_add(self, repo: str, commits: list, state: dict) -> None:
+        """Store indexed commits and the new index state in one transaction.
+
+        `commits` holds (seq, commit id, time, author, summary, changes) with
+        changes as (status, path, old path) tuples.
+        """
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO path_index_commits "
+                "(repo, seq, commit_id, time, author, summary) VALUES (?, ?, ?, ?, ?, ?)",
+                [(repo, *commit[:5]) for commit in commits],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO path_index (repo, path, seq, status, old_path) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (repo, path, commit[0], status, old_path)
+                    for commit in commits
+                    for status, path, old_path in commit[5]
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO path_index_state (repo, tip, complete, min_seq, max_seq) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (repo, state["tip"], int(state["complete"]), state["min_seq"], state["max_seq"]),
+            )
+
+    def path_history(self, repo: str, path: str, below: int | None = None) -> list:
+        """Indexed commits touching `path` (seq < `below`), newest first.
+
+        Rows are (seq, commit id, time, author, summary, status, old path).
+        """
+        return self._query(
+            "SELECT p.seq, c.commit_id, c.time, c.author, c.summary, p.status, p.old_path "
+            "FROM path_index p JOIN path_index_commits c ON c.repo = p.repo AND c.seq = p.seq "
+            "WHERE p.repo = ? AND p.path = ? AND p.seq < ? ORDER BY p.seq DESC",
+            (repo, path, below if below is not None else 2**62),
+        )
+
+    def record_metric(self, name: str, value: float, repo: str = "") -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO metrics (name, repo, value, recorded_at) VALUES (?, ?, ?, ?)",
+                (name, repo, value, time.time()),
+            )
+
+    def metrics(self, name: str, since: float = 0.0) -> list[tuple[str, float, float]]:
+        """Return (repo, value, recorded_at) rows for `name`, oldest first."""
+        return self._query(
+            "SELECT repo, value, recorded_at FROM metrics "
+            "WHERE name = ? AND recorded_at >= ? ORDER BY recorded_at",
+            (name, since),
+        )
+
+
+def open_state_store(path: str = STATE_DB_PATH) -> StateStore:
+    """Open the shared state database, importing the legacy JSON files once."""
+    return StateStore(
+        path,
+        legacy_paths={
+            "favorites": FAVORITES_PATH,
+            "profiles": PROFILES_PATH,
+            OPENROUTER_KEY_SETTING: OPENROUTER_CONFIG_PATH,
+        },
+    )
+
+
 __all__ = [
+    "FAVORITES_PATH",
+    "PROFILES_PATH",
+    "OPENROUTER_CONFIG_PATH",
+    "STATE_DB_PATH",
+    "OPENROUTER_KEY_SETTING",
+    "MAINTENANCE_ENABLED_SETTING",
     "load_json",
     "save_json",
+    "clean_list",
     "load_list",
     "save_list",
     "load_profiles",
     "save_profiles",
+    "MIGRATIONS",
+    "StateStore",
+    "open_state_store",
 ]
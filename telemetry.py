@@ -0,0 +1,197 @@
+"""In-memory timing histograms for git invocations, with JSON/Chrome trace export."""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+# Log-spaced bucket upper bounds in seconds: 50 us .. ~2 min, 25% apart.
+BUCKET_BOUNDS = tuple(0.00005 * 1.25**n for n in range(66))
+RECENT_SAMPLES = 5000
+# Commands whose first positional argument selects a different operation.
+SUBCOMMAND_GROUPS = {
+    "stash",
+    "remote",
+    "worktree",
+    "maintenance",
+    "commit-graph",
+    "submodule",
+    "notes",
+    "bisect",
+}
+
+
+def argv_class(args) -> str:
+    """Group argv for aggregation: "status", "stash list", "log"..."""
+    while len(args) > 1 and args[0] == "-c":
+        args = args[2:]
+    if not args:
+        return "git"
+    name = args[0]
+    if name in SUBCOMMAND_GROUPS and len(args) > 1 and not args[1].startswith("-"):
+        return f"{name} {args[1]}"
+    return name
+
+
+@dataclass
+class GitSample:
+    command: str
+    argv: list
+    repo: str
+    exit_code: int
+    started: float
+    spawn: float
+    runtime: float
+    bytes_out: int
+    thread: int
+
+    @property
+    def total(self) -> float:
+        return self.spawn + self.runtime
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th value (max for the overflow)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(pct / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+
+class GitTelemetry:
+    """Thread-safe collector fed by `git_ops.run_git`."""
+
+    def __init__(self, recent: int = RECENT_SAMPLES):
+        self._lock = threading.Lock()
+        self._histograms: dict[str, Histogram] = {}
+        self._spawn: dict[str, Histogram] = {}
+        self._bytes: dict[str, int] = {}
+        self._failures: dict[str, int] = {}
+        self._recent: deque[GitSample] = deque(maxlen=recent)
+        self._epoch = time.perf_counter()
+        self.enabled = True
+
+    def record(
+        self, args, repo, exit_code, started, spawn, runtime, bytes_out, thread=None
+    ) -> None:
+        if not self.enabled:
+            return
+        command = argv_class(args)
+        sample = GitSample(
+            command=command,
+            argv=list(args),
+            repo=repo or "",
+            exit_code=exit_code,
+            started=started,
+            spawn=spawn,
+            runtime=runtime,
+            bytes_out=bytes_out,
+            thread=thread if thread is not None else threading.get_ident(),
+        )
+        with self._lock:
+            self._histograms.setdefault(command, Histogram()).add(sample.total)
+            self._spawn.setdefault(command, Histogram()).add(spawn)
+            self._bytes[command] = self._bytes.get(command, 0) + bytes_out
+            if exit_code != 0:
+                self._failures[command] = self._failures.get(command, 0) + 1
+            self._recent.append(sample)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._spawn.clear()
+            self._bytes.clear()
+            self._failures.clear()
+            self._recent.clear()
+
+    def summary(self) -> list[dict]:
+        """Per-command stats in milliseconds, slowest total time first."""
+        with self._lock:
+            rows = []
+            for command, hist in self._histograms.items():
+                spawn = self._spawn[command]
+                rows.append(
+                    {
+                        "command": command,
+                        "count": hist.count,
+                        "failures": self._failures.get(command, 0),
+                        "total_ms": hist.total * 1000,
+                        "p50_ms": hist.percentile(50) * 1000,
+                        "p95_ms": hist.percentile(95) * 1000,
+                        "p99_ms": hist.percentile(99) * 1000,
+                        "max_ms": hist.max * 1000,
+                        "spawn_avg_ms": spawn.total / spawn.count * 1000,
+                        "bytes_out": self._bytes.get(command, 0),
+                    }
+                )
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def samples(self) -> list[GitSample]:
+        with self._lock:
+            return list(self._recent)
+
+    def to_json(self) -> dict:
+        return {
+            "summary": self.summary(),
+            "samples": [asdict(sample) for sample in self.samples()],
+        }
+
+    def to_chrome_trace(self) -> dict:
+        """Chrome trace event format (load in chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        events = []
+        for sample in self.samples():
+            start_us = (sample.started - self._epoch) * 1_000_000
+            common = {"cat": "git", "ph": "X", "pid": pid, "tid": sample.thread}
+            events.append(
+                {
+                    **common,
+                    "name": f"git {sample.command}",
+                    "ts": start_us,
+                    "dur": sample.total * 1_000_000,
+                    "args": {
+                        "argv": sample.argv,
+                        "repo": sample.repo,
+                        "exit_code": sample.exit_code,
+                        "bytes_out": sample.bytes_out,
+                    },
+                }
+            )
+            events.append(
+                {**common, "name": "spawn", "ts": start_us, "dur": sample.spawn * 1_000_000}
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str, fmt: str = "json") -> None:
+        data = self.to_chrome_trace() if fmt == "chrome" else self.to_json()
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=2)
+
+
+TELEMETRY = GitTelemetry()
+
+
+__all__ = ["TELEMETRY", "GitSample", "GitTelemetry", "Histogram", "argv_class"]
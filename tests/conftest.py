@@ -0,0 +1,26 @@
+"""Shared fixtures for tests that need real git repositories."""
+
+import subprocess
+
+import pytest
+
+IDENTITY = ["-c", "user.name=t", "-c", "user.email=t@t"]
+
+
+def _run_git(repo, *args, check=True):
+    return subprocess.run(["git", *IDENTITY, *args], cwd=repo, check=check, capture_output=True)
+
+
+@pytest.fixture
+def git():
+    """`git(repo, *args, check=True)`: run git with a fixed test identity, output captured."""
+    return _run_git
+
+
+@pytest.fixture
+def repo(tmp_path, git):
+    """An empty repository on branch main at tmp_path / "repo"."""
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q", "-b", "main")
+    return path
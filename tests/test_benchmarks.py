@@ -0,0 +1,13 @@
+from benchmarks.run import compare, run_suite
+
+
+def test_suite_runs_at_tiny_scale():
+    current = run_suite(scale=0.01, repeat=1, log=lambda _line: None)
+    assert "refresh_history[many_commits]" in current["results"]
+    assert "storage_sqlite_roundtrip" in current["results"]
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}}}
+    current = {"results": {"a": {"median_ms": 40.0}, "b": {"median_ms": 14.0}}}
+    assert compare(current, baseline, threshold=0.25, slack_ms=5.0) == [("a", 10.0, 40.0)]
@@ -0,0 +1,30 @@
+from blame import blame, file_lines
+from storage import StateStore
+
+
+def test_blame_streams_newest_first_and_caches(tmp_path, monkeypatch, repo, git):
+    (repo / "f.txt").write_text("\nold\nkeep\n")
+    git(repo, "add", "f.txt")
+    git(repo, "commit", "-q", "-m", "first")
+    (repo / "f.txt").write_text("\nnew\nkeep\n")
+    git(repo, "commit", "-q", "-am", "second")
+
+    assert file_lines(str(repo), "f.txt")[1] == ["", "new", "keep"]
+    store = StateStore(str(tmp_path / "state.sqlite3"))
+    streamed = []
+    code, result, _ = blame(str(repo), "f.txt", on_hunk=lambda h, r: streamed.append(h))
+    assert code == 0
+    assert streamed[0].final_line == 2
+    assert result.commits[streamed[0].commit]["summary"] == "second"
+    assert sum(hunk.count for hunk in result.hunks) == 3
+
+    blame(str(repo), "f.txt", cache=store)
+    monkeypatch.setattr("blame.stream_git", lambda *args: (1, "", "git should not run"))
+    replayed = []
+    code, cached, _ = blame(
+        str(repo), "f.txt", cache=store, on_hunk=lambda h, r: replayed.append(h)
+    )
+    assert code == 0
+    assert replayed == result.hunks
+    assert cached.commits == result.commits
+    store.close()
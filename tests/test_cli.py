@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from cli import main
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_status_emits_json_lines(tmp_path, capsys, repo):
+    (repo / "a.txt").write_text("a\n")
+    missing = tmp_path / "missing"
+    code = main(["status", str(repo), str(missing), "--state", str(tmp_path / "s.db")])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert code == 1
+    assert records[0]["repo"] == str(repo)
+    assert records[0]["ok"] is True
+    assert records[0]["untracked"] == 1
+    assert records[1]["ok"] is False
+
+
+def test_draft_runs_offline_without_a_key(tmp_path, capsys, monkeypatch, repo, git):
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    (repo / "a.txt").write_text("a\n")
+    git(repo, "add", "a.txt")
+    code = main(["suggest", str(repo), "--draft", "--state", str(tmp_path / "s.db")])
+    record = json.loads(capsys.readouterr().out)
+    assert code == 0
+    assert record["ok"] is True and record["message"]
+
+
+def test_cli_does_not_import_tkinter():
+    code = "import sys, cli; sys.exit('tkinter' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0
@@ -0,0 +1,31 @@
+from commit_draft import FileChange, draft_commit_message, parse_raw_numstat
+from git_ops import change_stats
+
+
+def test_parse_raw_numstat_with_rename(repo, git):
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "old.py").write_text("".join(f"line {i}\n" for i in range(20)))
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", "init")
+    git(repo, "mv", "pkg/old.py", "pkg/new.py")
+    (repo / "pkg" / "extra.py").write_text("x = 1\ny = 2\n")
+    git(repo, "add", "-A")
+    code, out, _ = change_stats(str(repo))
+    changes = {change.path: change for change in parse_raw_numstat(out)}
+    assert code == 0
+    assert changes["pkg/new.py"].status == "R"
+    assert changes["pkg/new.py"].old_path == "pkg/old.py"
+    assert (changes["pkg/extra.py"].status, changes["pkg/extra.py"].added) == ("A", 2)
+    assert draft_commit_message(list(changes.values())) == "feat(pkg): update extra.py and new.py"
+
+
+def test_draft_commit_message_heuristics():
+    assert draft_commit_message([]) == ""
+    readme = [FileChange("M", "README.md", added=3)]
+    assert draft_commit_message(readme) == "docs(README): update README.md"
+    tests = [FileChange("A", "tests/test_a.py"), FileChange("A", "tests/test_b.py")]
+    assert draft_commit_message(tests) == "test(tests): add test_a.py and test_b.py"
+    many = [FileChange("M", f"src/long_module_name_{i}.py", added=1, deleted=9) for i in range(10)]
+    subject = draft_commit_message(many)
+    assert subject.startswith("refactor(src): update ")
+    assert len(subject) <= 72
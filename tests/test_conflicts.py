@@ -0,0 +1,56 @@
+from conflicts import (
+    BlobReader,
+    resolve_with,
+    save_resolution,
+    three_way,
+    unmerged_paths,
+    working_text,
+)
+
+
+def test_conflicts_three_way_and_resolve(repo, git):
+    for name in ("a.txt", "b.txt", "gone.txt"):
+        (repo / name).write_text("base\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "base")
+    git(repo, "checkout", "-q", "-b", "other")
+    for name in ("a.txt", "b.txt", "gone.txt"):
+        (repo / name).write_text("theirs\n")
+    git(repo, "commit", "-q", "-am", "theirs")
+    git(repo, "checkout", "-q", "main")
+    (repo / "a.txt").write_text("ours\n")
+    (repo / "b.txt").write_text("ours\n")
+    git(repo, "rm", "-q", "gone.txt")
+    git(repo, "commit", "-q", "-am", "ours")
+    git(repo, "merge", "-q", "other", check=False)
+
+    code, conflicts, _ = unmerged_paths(str(repo))
+    assert code == 0
+    by_path = {conflict.path: conflict for conflict in conflicts}
+    assert by_path["a.txt"].kind == "both modified"
+    assert by_path["gone.txt"].kind == "deleted by us"
+
+    reader = BlobReader(str(repo))
+    assert three_way(reader, by_path["a.txt"]) == {
+        "base": "base\n",
+        "ours": "ours\n",
+        "theirs": "theirs\n",
+    }
+    assert three_way(reader, by_path["gone.txt"])["ours"] == ""
+    reader.close()
+
+    assert resolve_with(str(repo), by_path["a.txt"], "theirs")[0] == 0
+    assert (repo / "a.txt").read_text() == "theirs\n"
+    assert save_resolution(str(repo), "b.txt", "merged\n")[0] == 0
+    assert resolve_with(str(repo), by_path["gone.txt"], "ours")[0] == 0
+    assert unmerged_paths(str(repo))[1] == []
+
+
+def test_working_text_flags_lossy_files(tmp_path):
+    (tmp_path / "utf8.txt").write_bytes("caf\u00e9\n".encode())
+    (tmp_path / "latin1.txt").write_bytes(b"caf\xe9\n")
+    (tmp_path / "image.bin").write_bytes(b"\x89PNG\0\0")
+    assert working_text(str(tmp_path), "utf8.txt") == ("caf\u00e9\n", True)
+    assert working_text(str(tmp_path), "latin1.txt")[1] is False
+    assert working_text(str(tmp_path), "image.bin") == ("(binary, 6 bytes)", False)
+    assert working_text(str(tmp_path), "deleted.txt") == ("", False)
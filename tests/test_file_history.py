@@ -0,0 +1,49 @@
+from file_history import file_history, has_changed_paths, update_index
+from storage import StateStore
+
+
+def test_file_history_follows_renames_from_git_and_index(tmp_path, repo, git):
+    def _commit(repo, message):
+        git(repo, "add", "-A")
+        git(repo, "commit", "-q", "-m", message)
+
+    (repo / "old.txt").write_text("line one\nline two\nline three\n")
+    _commit(repo, "add")
+    (repo / "other.txt").write_text("x\n")
+    _commit(repo, "unrelated")
+    git(repo, "mv", "old.txt", "new.txt")
+    _commit(repo, "rename")
+    (repo / "new.txt").write_text("line one\nline two\nline three\nfour\n")
+    _commit(repo, "edit")
+    store = StateStore(str(tmp_path / "state.sqlite3"))
+
+    code, source, fallback, _ = file_history(str(repo), "new.txt", store)
+    assert (code, source) == (0, "git")
+    assert [(c.summary, c.path) for c in fallback] == [
+        ("edit", "new.txt"),
+        ("rename", "new.txt"),
+        ("add", "old.txt"),
+    ]
+
+    assert update_index(str(repo), store)
+    assert not has_changed_paths(str(repo))
+    _, source, indexed, _ = file_history(str(repo), "new.txt", store)
+    assert source == "index"
+    assert indexed == fallback
+
+    (repo / "new.txt").write_text("changed\n")
+    _commit(repo, "after index")
+    _, source, updated, _ = file_history(str(repo), "new.txt", store)
+    assert source == "index"
+    assert [c.summary for c in updated] == ["after index", "edit", "rename", "add"]
+    store.close()
+
+
+def test_has_changed_paths_reads_existing_commit_graph(repo, git):
+    (repo / "a.txt").write_text("a\n")
+    git(repo, "add", "a.txt")
+    git(repo, "commit", "-q", "-m", "a")
+    git(repo, "commit-graph", "write", "--reachable")
+    assert not has_changed_paths(str(repo))
+    git(repo, "commit-graph", "write", "--reachable", "--changed-paths")
+    assert has_changed_paths(str(repo))
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import git_ops
+from git_async import TIMED_OUT, GitLimits, default_limits, git_loop, run_git, stream_git
+
+# The shell child keeps no pipes of git open, so killing git ends the call.
+SLEEP = ["-c", "alias.nap=!exec sleep 5 >/dev/null 2>&1", "nap"]
+
+
+def test_hundreds_of_concurrent_calls_stay_within_limits(tmp_path):
+    repos = [tmp_path / "a", tmp_path / "b"]
+    for repo in repos:
+        repo.mkdir()
+
+    async def main():
+        limits = GitLimits(total=6, per_repo=4)
+        baseline = threading.active_count()
+        peak_threads = baseline
+        done = asyncio.Event()
+
+        async def sample():
+            nonlocal peak_threads
+            while not done.is_set():
+                peak_threads = max(peak_threads, threading.active_count())
+                await asyncio.sleep(0.005)
+
+        sampler = asyncio.ensure_future(sample())
+        results = await asyncio.gather(
+            *(run_git(["--version"], str(repos[n % 2]), limits=limits) for n in range(300))
+        )
+        done.set()
+        await sampler
+        return results, limits.peak, peak_threads - baseline
+
+    results, peak, extra_threads = asyncio.run(main())
+    assert len(results) == 300
+    assert all(code == 0 and out.startswith("git version") for code, out, _ in results)
+    assert peak <= 6
+    # At most one child-watcher thread per running git, never one per call.
+    assert extra_threads <= 6 + 2
+
+
+def test_timeout_and_cancel_kill_git(tmp_path):
+    async def main():
+        started = time.perf_counter()
+        timed_out = await run_git(SLEEP, str(tmp_path), timeout=0.2)
+        task = asyncio.ensure_future(run_git(SLEEP, str(tmp_path)))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return timed_out, time.perf_counter() - started
+
+    (code, _, err), elapsed = asyncio.run(main())
+    assert code == TIMED_OUT and "timed out" in err
+    assert elapsed < 3
+
+
+def test_stream_git(tmp_path):
+    lines = []
+    code, _, _ = asyncio.run(stream_git(["help", "-a"], str(tmp_path), lines.append))
+    assert code == 0 and len(lines) > 10
+
+
+def test_sync_api_runs_on_the_shared_loop_limits(tmp_path):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(git_ops.run_git(["--version"], tmp_path)))
+        for _ in range(40)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    async def peak():
+        return default_limits().peak
+
+    assert [code for code, _, _ in results] == [0] * 40
+    assert 1 <= git_loop().call(peak()) <= 4
+
+
+def test_sync_cancel_kills_git(tmp_path):
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    started = time.perf_counter()
+    assert git_ops.run_git(SLEEP, str(tmp_path), cancel=cancel)[0] == git_ops.CANCELLED
+    lines = []
+    code, _, _ = git_ops.stream_git(SLEEP, str(tmp_path), lines.append, cancel)
+    assert code == git_ops.CANCELLED
+    assert time.perf_counter() - started < 3
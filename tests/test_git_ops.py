@@ -1,7 +1,112 @@
-from git_ops import derive_repo_name
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import git_ops
+from git_ops import (
+    branch_tracking,
+    derive_repo_name,
+    format_branch_label,
+    parse_status_v2,
+    stream_git,
+)
 
 
 def test_derive_repo_name_basic():
     assert derive_repo_name("https://github.com/example/repo.git") == "repo"
     assert derive_repo_name("https://github.com/example/repo/") == "repo"
     assert derive_repo_name("repo") == "repo"
+
+
+def test_parse_status_v2_counts():
+    output = "\n".join(
+        [
+            "# branch.oid abc",
+            "# branch.head main",
+            "# branch.upstream origin/main",
+            "# branch.ab +2 -3",
+            "1 M. N... 100644 100644 100644 a b file1",
+            "1 .M N... 100644 100644 100644 a b file2",
+            "u UU N... 1 2 3 4 a b c file3",
+            "? new.txt",
+        ]
+    )
+    info = parse_status_v2(output)
+    assert info["branch"] == "main"
+    assert info["upstream"] == "origin/main"
+    assert (info["ahead"], info["behind"]) == (2, 3)
+    assert (info["staged"], info["unstaged"], info["untracked"], info["conflicts"]) == (1, 1, 1, 1)
+
+
+def test_branch_tracking_counts_and_cache(tmp_path, repo, git):
+    origin = repo
+    git(origin, "commit", "-q", "--allow-empty", "-m", "one")
+    git(tmp_path, "clone", "-q", str(origin), "clone")
+    clone = str(tmp_path / "clone")
+    git(clone, "commit", "-q", "--allow-empty", "-m", "two")
+
+    code, branches, _ = branch_tracking(clone)
+    assert code == 0
+    assert branches == [
+        {
+            "name": "main",
+            "upstream": "origin/main",
+            "ahead": 1,
+            "behind": 0,
+            "gone": False,
+            "current": True,
+        }
+    ]
+    assert format_branch_label(branches[0]) == "main  ↑1  (origin/main)"
+    assert branch_tracking(clone)[1] is branches
+
+    git(clone, "branch", "topic")
+    assert [b["name"] for b in branch_tracking(clone)[1]] == ["main", "topic"]
+
+
+def test_stream_git_drains_stderr(tmp_path):
+    lines = []
+    noisy = ["-c", "alias.noisy=!head -c 300000 /dev/zero >&2; echo done", "noisy"]
+    code, _, err = stream_git(noisy, str(tmp_path), lines.append)
+    assert (code, lines, len(err)) == (0, ["done"], 300000)
+
+
+def test_stream_git_pauses_git_for_a_slow_consumer(tmp_path, monkeypatch):
+    peak = [0]
+
+    class Tracked(queue.SimpleQueue):
+        def put(self, item, *args, **kwargs):
+            super().put(item, *args, **kwargs)
+            peak[0] = max(peak[0], self.qsize())
+
+    monkeypatch.setattr(git_ops, "STREAM_WINDOW_LINES", 64)
+    monkeypatch.setattr(git_ops, "STREAM_CREDIT_BATCH", 16)
+    monkeypatch.setattr(git_ops.queue, "SimpleQueue", Tracked)
+    lines = []
+
+    def on_line(line):
+        if not lines:
+            time.sleep(0.3)
+        lines.append(line)
+
+    code, _, _ = stream_git(["-c", "alias.count=!seq 20000", "count"], str(tmp_path), on_line)
+    assert (code, len(lines), lines[-1]) == (0, 20000, "20000")
+    assert peak[0] <= 64 + 1
+
+
+def test_git_ops_import_does_not_load_asyncio():
+    code = "import sys, git_ops; sys.exit('asyncio' in sys.modules)"
+    root = Path(__file__).resolve().parent.parent
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
+
+
+def test_telemetry_records_the_calling_thread(tmp_path):
+    from telemetry import TELEMETRY
+
+    worker = threading.Thread(target=lambda: git_ops.run_git(["--version"], str(tmp_path)))
+    worker.start()
+    worker.join()
+    assert TELEMETRY.samples()[-1].thread == worker.ident
@@ -0,0 +1,20 @@
+from maintenance import TASKS, due_tasks, last_reports, run_maintenance
+from storage import StateStore
+
+
+def test_run_maintenance_reports_and_reschedules(tmp_path, repo, git):
+    git(repo, "commit", "-q", "--allow-empty", "-m", "init")
+    store = StateStore(str(tmp_path / "state.sqlite3"))
+    assert due_tasks(store, str(repo)) == list(TASKS)
+
+    seen = []
+    reports = run_maintenance(store, [str(repo)], on_report=seen.append)
+    assert [report["task"] for report in reports] == list(TASKS)
+    assert seen == reports
+    assert all(report["ok"] for report in reports), [r["error"] for r in reports]
+    assert set(reports[0]["before"]) == {"status", "history", "branches"}
+    assert reports[1]["before"] == reports[0]["after"]
+    assert due_tasks(store, str(repo)) == []
+    assert [report["task"] for report in last_reports(store, str(repo))] == list(TASKS)
+    assert run_maintenance(store, [str(repo)], should_continue=lambda: False, force=True) == []
+    store.close()
@@ -1,6 +1,19 @@
 import pytest
 
-from openrouter import CRYPTO_AVAILABLE, decrypt_api_key, encrypt_api_key
+import openrouter
+from openrouter import (
+    CRYPTO_AVAILABLE,
+    KDF_PBKDF2,
+    KDF_SCRYPT,
+    LEGACY_PBKDF2_ITERATIONS,
+    SCRYPT_MAX_N,
+    InvalidToken,
+    KeyStore,
+    calibrate_kdf,
+    decrypt_api_key,
+    encrypt_api_key,
+    kdf_params,
+)
 
 pytestmark = pytest.mark.skipif(not CRYPTO_AVAILABLE, reason="cryptography not installed")
 
@@ -8,3 +21,50 @@ pytestmark = pytest.mark.skipif(not CRYPTO_AVAILABLE, reason="cryptography not i
 def test_encrypt_decrypt_roundtrip():
     payload = encrypt_api_key("secret-key", "password")
     assert decrypt_api_key(payload, "password") == "secret-key"
+
+
+def test_decrypt_legacy_unversioned_payload():
+    payload = encrypt_api_key("secret-key", "password", kdf_params(iterations=200_000))
+    legacy = {"salt": payload["salt"], "token": payload["token"]}
+    assert decrypt_api_key(legacy, "password") == "secret-key"
+
+
+def test_key_store_derives_once_and_locks(monkeypatch):
+    derive = openrouter._derive_fernet_key
+    calls = []
+
+    def counting(password, salt, params=None):
+        calls.append(params)
+        return derive(password, salt, params)
+
+    monkeypatch.setattr(openrouter, "_derive_fernet_key", counting)
+    store = KeyStore(idle_timeout=0)
+    store.set_api_key("secret-key", "password", kdf_params(KDF_PBKDF2, iterations=1000))
+    for _ in range(3):
+        assert store.api_key() == "secret-key"
+    assert len(calls) == 1
+
+    calls.clear()
+    payload = store.set_api_key("secret-key", "password", kdf_params(KDF_SCRYPT, n=2**10))
+    assert payload["version"] == 2
+    assert payload["kdf"]["kdf"] == KDF_SCRYPT
+    assert store.api_key() == "secret-key"
+    store.lock()
+    assert store.api_key() is None
+    store.unlock(payload, "password")
+    assert store.api_key() == "secret-key"
+    assert store.api_key() == "secret-key"
+    assert len(calls) == 2
+    with pytest.raises(InvalidToken):
+        KeyStore().unlock(payload, "wrong")
+
+
+def test_calibrate_kdf_respects_floors_and_roundtrips():
+    pbkdf2 = calibrate_kdf(KDF_PBKDF2, target_seconds=0.001)
+    assert pbkdf2 == kdf_params(KDF_PBKDF2, iterations=LEGACY_PBKDF2_ITERATIONS)
+    scrypt = calibrate_kdf(KDF_SCRYPT, target_seconds=0.001)
+    assert scrypt["kdf"] == KDF_SCRYPT
+    assert 2**12 <= scrypt["n"] <= SCRYPT_MAX_N
+    assert scrypt["n"] & (scrypt["n"] - 1) == 0
+    payload = encrypt_api_key("secret-key", "password", scrypt)
+    assert decrypt_api_key(payload, "password") == "secret-key"
@@ -0,0 +1,17 @@
+from output_log import OutputLog
+
+
+def test_output_log_evicts_and_spills(tmp_path):
+    log = OutputLog(capacity=3, log_path=str(tmp_path / "output.log"))
+    log.append("one\ntwo")
+    log.append("three\nfour\nfive")
+    assert (log.start, log.end) == (2, 5)
+    assert log.slice(0, 10) == ["three", "four", "five"]
+    assert log.slice(3, 4) == ["four"]
+    matches = log.search("O")
+    assert [(source == "memory", text) for source, _, text in matches] == [
+        (False, "one"),
+        (False, "two"),
+        (True, "four"),
+    ]
+    log.close()
@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from preview import PreviewCancelled, push_command, push_preview, rebase_preview
+
+
+@pytest.fixture
+def diverged(tmp_path, repo, git):
+    def _commit_file(repo, name, content, message):
+        (repo / name).write_text(content)
+        git(repo, "add", name)
+        git(repo, "commit", "-q", "-m", message)
+
+    origin = repo
+    _commit_file(origin, "shared.txt", "base\n", "base")
+    git(tmp_path, "clone", "-q", str(origin), "clone")
+    clone = tmp_path / "clone"
+    _commit_file(clone, "shared.txt", "ours\n", "ours")
+    _commit_file(origin, "shared.txt", "theirs\n", "theirs")
+    git(clone, "fetch", "-q")
+    return clone
+
+
+def test_push_preview_reports_commits_and_divergence(diverged):
+    sections = dict(push_preview(str(diverged), "origin"))
+    assert sections["Commits to push"] == "1"
+    assert "rejected" in sections["Warning"]
+    assert "M\tshared.txt" in sections["Files touched (1)"]
+
+
+def test_rebase_preview_predicts_conflict(diverged):
+    sections = dict(rebase_preview(str(diverged), "origin/main"))
+    assert sections["Predicted conflicts (1)"] == "shared.txt"
+    assert (diverged / "shared.txt").read_text() == "ours\n"
+
+
+def test_preview_cancel(diverged):
+    cancel = threading.Event()
+    cancel.set()
+    steps = rebase_preview(str(diverged), "origin/main", cancel)
+    with pytest.raises(PreviewCancelled):
+        list(steps)
+
+
+def test_push_command_matches_preview_target(diverged, git):
+    assert push_command(str(diverged), "origin") == ["push"]
+    git(diverged, "checkout", "-q", "-b", "topic")
+    sections = dict(push_preview(str(diverged), "origin"))
+    assert "No push destination" in sections["Target"]
+    assert push_command(str(diverged), "origin") == ["push", "origin", "HEAD"]
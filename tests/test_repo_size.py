@@ -0,0 +1,29 @@
+import os
+
+from repo_size import analyze
+from storage import StateStore
+
+
+def test_analyze_reports_blobs_directories_and_caches(tmp_path, repo, git):
+    (repo / "assets" / "img").mkdir(parents=True)
+    (repo / "assets" / "img" / "huge.bin").write_bytes(os.urandom(200_000))
+    (repo / "small.txt").write_text("hi\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", "Add assets")
+    git(repo, "rm", "-q", "assets/img/huge.bin")
+    git(repo, "commit", "-qm", "Drop asset")
+    store = StateStore(str(tmp_path / "state.db"))
+
+    code, report, err = analyze(str(repo), store)
+    assert (code, err, report["cached"]) == (0, "", False)
+    largest = report["blobs"][0]
+    assert largest["path"] == "assets/img/huge.bin"
+    assert largest["subject"] == "Add assets"
+    assert {d["path"] for d in report["directories"]} == {"assets", "assets/img"}
+    assert report["types"]["commit"]["count"] == 2
+
+    assert analyze(str(repo), store)[1]["cached"] is True
+    (repo / "new.txt").write_text("new\n")
+    git(repo, "add", "-A")
+    assert analyze(str(repo), store)[1]["cached"] is False
+    store.close()
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from git_ops import run_git
+from reword import RateLimiter, rewrite_messages, suggest_range
+from storage import StateStore
+
+
+@pytest.fixture
+def wip_repo(repo, git):
+    for number in range(4):
+        (repo / f"f{number}.txt").write_text(f"v{number}\n")
+        git(repo, "add", "-A")
+        git(repo, "commit", "-qm", f"wip {number}")
+    return str(repo)
+
+
+def test_suggest_range_streams_prompts_and_uses_cache(tmp_path, wip_repo):
+    repo = wip_repo
+    store = StateStore(str(tmp_path / "state.db"))
+    calls = []
+    lock = threading.Lock()
+
+    def request(prompt):
+        with lock:
+            calls.append(prompt)
+        return "Reword " + prompt.split("Current message:\n")[1].split("\n")[0]
+
+    results = []
+    code, _ = suggest_range(repo, "HEAD~3", request, "m", lambda *r: results.append(r), store)
+    assert code == 0
+    assert sorted(message for _, message, _, _ in results) == [
+        "Reword wip 1",
+        "Reword wip 2",
+        "Reword wip 3",
+    ]
+    assert all("diff --git" in prompt for prompt in calls)
+    results.clear()
+    suggest_range(repo, "HEAD~3", request, "m", lambda *r: results.append(r), store)
+    assert len(calls) == 3
+    assert all(cached for _, _, cached, _ in results)
+    store.close()
+
+
+def test_rewrite_messages_keeps_trees_and_authors(wip_repo):
+    repo = wip_repo
+    _, before, _ = run_git(["log", "--format=%T %an %ad", "-4"], repo)
+    _, target, _ = run_git(["rev-parse", "HEAD~1"], repo)
+    code, head, err = rewrite_messages(repo, "HEAD~3", {target: "Add f2"})
+    assert (code, err) == (0, "")
+    _, subjects, _ = run_git(["log", "--format=%s", "-4"], repo)
+    _, after, _ = run_git(["log", "--format=%T %an %ad", "-4"], repo)
+    assert subjects.splitlines() == ["wip 3", "Add f2", "wip 1", "wip 0"]
+    assert after == before
+    assert run_git(["rev-parse", "HEAD"], repo)[1] == head
+    assert run_git(["status", "--porcelain"], repo)[1] == ""
+
+
+def test_rewrite_keeps_body_trailers_and_encoding(repo, git):
+    (repo / "a.txt").write_text("a\n")
+    git(repo, "add", "a.txt")
+    git(repo, "commit", "-qm", "base")
+    (repo / "a.txt").write_text("b\n")
+    git(repo, "add", "a.txt")
+    message = "wip\n\nWhy it changed.\n\nSigned-off-by: T <t@t>\n"
+    git(repo, "commit", "-q", "-m", message)
+    (repo / "a.txt").write_text("c\n")
+    git(repo, "add", "a.txt")
+    message_file = repo.parent / "latin1.txt"
+    message_file.write_bytes("caf\u00e9 fix\n\nBody \u00e9t\u00e9.\n".encode("latin-1"))
+    git(repo, "-c", "i18n.commitEncoding=ISO-8859-1", "commit", "-q", "-F", str(message_file))
+    _, raw_before, _ = run_git(["cat-file", "commit", "HEAD"], str(repo), text=False)
+    _, target, _ = run_git(["rev-parse", "HEAD~1"], str(repo))
+
+    suggestion = "Explain the change\nstray second line\n"
+    code, _, err = rewrite_messages(str(repo), "HEAD~2", {target: suggestion})
+    assert (code, err) == (0, "")
+    _, body, _ = run_git(["log", "-1", "--format=%B", "HEAD~1"], str(repo))
+    assert body == "Explain the change\n\nWhy it changed.\n\nSigned-off-by: T <t@t>"
+    _, raw_after, _ = run_git(["cat-file", "commit", "HEAD"], str(repo), text=False)
+    # The untouched latin-1 descendant only gets a new parent.
+    assert raw_after.split(b"\n", 2)[2] == raw_before.split(b"\n", 2)[2]
+    assert b"encoding ISO-8859-1" in raw_after and b"caf\xe9" in raw_after
+
+
+def test_rate_limiter_spaces_calls_after_the_burst():
+    limiter = RateLimiter(per_minute=1200, burst=1)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.wait()
+    assert time.monotonic() - started >= 0.14
+
+
+def test_rate_limiter_bursts_a_batch():
+    # Eight calls at 60/minute used to take seven one-second intervals.
+    limiter = RateLimiter(per_minute=60, burst=8)
+    started = time.monotonic()
+    for _ in range(8):
+        limiter.wait()
+    assert time.monotonic() - started < 0.5
@@ -0,0 +1,30 @@
+from stash import apply_check, drop_stash, list_stashes, stash_diff
+
+
+def test_stash_list_diff_check_and_drop(repo, git):
+    (repo / "a.txt").write_text("base\n")
+    (repo / "b.txt").write_text("base\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "base")
+    (repo / "a.txt").write_text("stashed a\n")
+    git(repo, "stash", "push", "-q", "-m", "touches a")
+    (repo / "b.txt").write_text("stashed b\n")
+    git(repo, "stash", "push", "-q", "-m", "touches b")
+    (repo / "a.txt").write_text("committed a\n")
+    git(repo, "commit", "-q", "-am", "edit a")
+
+    code, stashes, _ = list_stashes(str(repo))
+    assert code == 0
+    assert [s.ref for s in stashes] == ["stash@{0}", "stash@{1}"]
+    assert stashes[0].subject.endswith("touches b")
+    newest, oldest = stashes
+    code, stat, patch = stash_diff(str(repo), newest.commit)
+    assert code == 0 and "b.txt" in stat and "+stashed b" in patch
+
+    assert apply_check(str(repo), newest) == ("clean", [])
+    assert apply_check(str(repo), oldest) == ("conflicts", ["a.txt"])
+
+    assert drop_stash(str(repo), newest)[0] == 0
+    # The remaining entry moved to stash@{0}; dropping it by commit still works.
+    assert drop_stash(str(repo), oldest)[0] == 0
+    assert list_stashes(str(repo))[1] == []
@@ -1,4 +1,13 @@
-from storage import load_list, load_profiles, save_list, save_profiles
+from storage import (
+    MIGRATIONS,
+    StateStore,
+    load_json,
+    load_list,
+    load_profiles,
+    save_json,
+    save_list,
+    save_profiles,
+)
 
 
 def test_save_and_load_list(tmp_path):
@@ -12,3 +21,32 @@ def test_save_and_load_profiles(tmp_path):
     data = {"main": {"path": "/tmp/repo", "remote": "origin", "branch": "main"}}
     save_profiles(str(path), data)
     assert load_profiles(str(path)) == data
+
+
+def test_save_json_is_atomic(tmp_path):
+    path = tmp_path / "data.json"
+    save_json(str(path), {"a": 1})
+    save_json(str(path), {"a": 2})
+    assert load_json(str(path), None) == {"a": 2}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.json"]
+
+
+def test_state_store_migrates_legacy_json(tmp_path):
+    favorites = tmp_path / "favorites.json"
+    profiles = tmp_path / "profiles.json"
+    save_list(str(favorites), ["/repo/a", "/repo/b"])
+    save_profiles(str(profiles), {"main": {"path": "/repo/a", "branch": "main"}})
+    legacy = {"favorites": str(favorites), "profiles": str(profiles)}
+
+    store = StateStore(str(tmp_path / "state.sqlite3"), legacy)
+    assert store.schema_version == len(MIGRATIONS)
+    assert store.favorites() == ["/repo/a", "/repo/b"]
+    assert store.profiles_for_path("/repo/a") == {"main": {"path": "/repo/a", "branch": "main"}}
+    store.remove_favorite("/repo/a")
+    store.close()
+
+    reopened = StateStore(str(tmp_path / "state.sqlite3"), legacy)
+    assert reopened.favorites() == ["/repo/b"]
+    reopened.cache_put("history", "/repo/b", "HEAD", ["abc"])
+    assert reopened.cache_get("history", "/repo/b", "HEAD") == ["abc"]
+    reopened.close()
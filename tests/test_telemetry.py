@@ -0,0 +1,31 @@
+from git_ops import run_git
+from telemetry import TELEMETRY, GitTelemetry, argv_class
+
+
+def test_argv_class_groups_subcommands():
+    assert argv_class(["status", "-s"]) == "status"
+    assert argv_class(["stash", "list"]) == "stash list"
+    assert argv_class(["stash", "--include-untracked"]) == "stash"
+
+
+def test_summary_and_chrome_trace():
+    telemetry = GitTelemetry()
+    for runtime in (0.001, 0.002, 0.003, 0.1):
+        telemetry.record(
+            ["log"], "/repo", 0, started=0.0, spawn=0.001, runtime=runtime, bytes_out=10
+        )
+    telemetry.record(["status"], "/repo", 1, started=0.0, spawn=0.001, runtime=0.001, bytes_out=0)
+    rows = {row["command"]: row for row in telemetry.summary()}
+    assert rows["log"]["count"] == 4
+    assert rows["log"]["bytes_out"] == 40
+    assert rows["log"]["p50_ms"] <= rows["log"]["p99_ms"] <= rows["log"]["max_ms"]
+    assert rows["status"]["failures"] == 1
+    events = telemetry.to_chrome_trace()["traceEvents"]
+    assert {event["ph"] for event in events} == {"X"}
+    assert len(events) == 10
+
+
+def test_run_git_is_recorded(tmp_path):
+    TELEMETRY.reset()
+    run_git(["--version"], str(tmp_path))
+    assert TELEMETRY.samples()[-1].command == "--version"
@@ -0,0 +1,78 @@
+import time
+
+from ui_dispatch import WAKE_EVENT, Dispatcher, percentile
+
+
+class FakeTk:
+    def call(self, *args):
+        return 1
+
+
+class FakeWidget:
+    def __init__(self):
+        self.tk = FakeTk()
+        self.bindings = {}
+        self.generated = []
+        self.scheduled = []
+
+    def bind(self, sequence, func, add=None):
+        self.bindings[sequence] = func
+
+    def event_generate(self, sequence, when=None):
+        self.generated.append(sequence)
+
+    def after(self, ms, func):
+        self.scheduled.append(func)
+        return f"after#{len(self.scheduled)}"
+
+
+def test_dispatcher_wakes_once_and_drains_in_order():
+    widget = FakeWidget()
+    dispatcher = Dispatcher(widget)
+    results = []
+    dispatcher.post(results.append, 1)
+    dispatcher.post(results.append, 2)
+    assert widget.generated == [WAKE_EVENT]
+    widget.bindings[WAKE_EVENT](None)
+    assert results == [1, 2]
+    assert dispatcher.stats()["handled"] == 2
+    assert widget.scheduled == []
+
+
+def test_dispatcher_respects_frame_budget():
+    widget = FakeWidget()
+    dispatcher = Dispatcher(widget, budget_ms=1)
+    for _ in range(5):
+        dispatcher.post(time.sleep, 0.002)
+    widget.bindings[WAKE_EVENT](None)
+    assert dispatcher.handled == 1
+    while widget.scheduled:
+        widget.scheduled.pop(0)()
+    assert dispatcher.handled == 5
+
+
+def test_dispatcher_recovers_from_failed_wake_and_callback():
+    widget = FakeWidget()
+    dispatcher = Dispatcher(widget)
+    fail = [True]
+
+    def event_generate(sequence, when=None):
+        if fail[0]:
+            raise RuntimeError("main thread is not in main loop")
+        widget.generated.append(sequence)
+
+    widget.event_generate = event_generate
+    results = []
+    dispatcher.post(lambda: 1 / 0)
+    fail[0] = False
+    dispatcher.post(results.append, 1)
+    assert widget.generated == [WAKE_EVENT]
+    widget.bindings[WAKE_EVENT](None)
+    assert results == [1]
+    assert dispatcher.handled == 2
+
+
+def test_percentile():
+    assert percentile([], 50) == 0.0
+    assert percentile([3, 1, 2, 4], 50) == 2
+    assert percentile(range(1, 101), 95) == 95
@@ -0,0 +1,124 @@
+"""Hand results from worker threads to the Tk event loop on demand."""
+
+import logging
+import queue
+import threading
+import time
+import tkinter as tk
+
+WAKE_EVENT = "<<DispatcherWake>>"
+DRAIN_BUDGET_MS = 8
+POLL_MS = 200
+LATENCY_SAMPLES = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0 for an empty sequence)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def tcl_is_threaded(widget) -> bool:
+    return bool(int(widget.tk.call("info", "exists", "tcl_platform(threaded)")))
+
+
+class Dispatcher:
+    """Run callbacks posted from any thread on the Tk main thread.
+
+    In "event" mode the first post after a drain generates a virtual event,
+    so the loop sleeps until there is work. Each drain handles queued
+    callbacks until `budget_ms` is used up and reschedules itself for the
+    rest, so a flood of results cannot stall redraws. "poll" mode is the
+    old fixed-interval loop; it is also the fallback when Tcl is built
+    without thread support, where event_generate from a worker is unsafe.
+    """
+
+    def __init__(self, widget, mode="event", budget_ms=DRAIN_BUDGET_MS, poll_ms=POLL_MS):
+        self.widget = widget
+        self.budget = budget_ms / 1000
+        self.poll_ms = poll_ms
+        self.mode = mode if mode == "poll" or tcl_is_threaded(widget) else "poll"
+        self.wakeups = 0
+        self.handled = 0
+        self.latencies: list[float] = []
+        self._queue = queue.SimpleQueue()
+        self._wake_lock = threading.Lock()
+        self._wake_pending = False
+        self._drain_job = None
+        if self.mode == "event":
+            widget.bind(WAKE_EVENT, self._on_wake, add="+")
+        else:
+            self._poll()
+
+    def post(self, callback, *args) -> None:
+        """Queue `callback(*args)` for the main thread. Safe from any thread."""
+        self._queue.put((time.perf_counter(), callback, args))
+        if self.mode != "event":
+            return
+        with self._wake_lock:
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        try:
+            self.widget.event_generate(WAKE_EVENT, when="tail")
+        except (tk.TclError, RuntimeError):
+            # Window destroyed or main loop not running: no wake is in flight,
+            # so let the next post try again instead of waiting forever.
+            with self._wake_lock:
+                self._wake_pending = False
+
+    def _on_wake(self, _event=None):
+        with self._wake_lock:
+            self._wake_pending = False
+        self.wakeups += 1
+        self._drain()
+
+    def _poll(self):
+        self.wakeups += 1
+        self._drain()
+        self.widget.after(self.poll_ms, self._poll)
+
+    def _drain(self):
+        self._drain_job = None
+        deadline = time.perf_counter() + self.budget
+        while True:
+            try:
+                posted, callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._record(time.perf_counter() - posted)
+            try:
+                callback(*args)
+            except Exception:
+                # One failing callback must not strand the rest of the queue.
+                logger.exception("Dispatcher callback %r failed", callback)
+            if time.perf_counter() >= deadline and not self._queue.empty():
+                if self._drain_job is None:
+                    self._drain_job = self.widget.after(1, self._drain)
+                return
+
+    def _record(self, latency: float) -> None:
+        self.handled += 1
+        self.latencies.append(latency)
+        if len(self.latencies) > LATENCY_SAMPLES:
+            del self.latencies[: len(self.latencies) - LATENCY_SAMPLES]
+
+    def stats(self) -> dict:
+        """Wakeup/handled counters and completion latency in milliseconds."""
+        samples = [value * 1000 for value in self.latencies]
+        return {
+            "mode": self.mode,
+            "wakeups": self.wakeups,
+            "handled": self.handled,
+            "latency_p50_ms": percentile(samples, 50),
+            "latency_p95_ms": percentile(samples, 95),
+            "latency_max_ms": max(samples, default=0.0),
+        }
+
+
+__all__ = ["WAKE_EVENT", "DRAIN_BUDGET_MS", "Dispatcher", "percentile", "tcl_is_threaded"]